@@ -0,0 +1,164 @@
+"""
+Compares rendering pages with a fresh browser per page, as the dynamic scraper
+used to, against the pooled browser, sequentially and concurrently. Pages are
+local HTML files served by an in-process HTTP server; without --pages-dir a set
+of pages that build their content with JavaScript is generated.
+
+    python -m benchmarks.browser_pool_benchmark --pages 30
+    python -m benchmarks.browser_pool_benchmark --pages-dir benchmarks/fixtures/nfl
+
+Requires the Chromium build used by Playwright: python -m playwright install chromium
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+from src.services.scrapers.browser_pool import AsyncBrowserPool, BrowserPool
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def generate_pages(path: Path, num_pages: int) -> None:
+    for n in range(num_pages):
+        (path / f"page_{n}.html").write_text(
+            f"""<html><body><div id="teams"></div><script>
+            const teams = document.getElementById("teams");
+            for (let i = 0; i < 32; i++) {{
+                const figure = document.createElement("figure");
+                figure.className = "nfl-c-custom-promo__figure";
+                figure.innerHTML = `<img alt="Team ${{i}}" data-src="/{n}/${{i}}.png">`;
+                teams.appendChild(figure);
+            }}
+            </script></body></html>"""
+        )
+
+
+def serve(path: Path) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(_QuietHandler, directory=str(path))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def render_unpooled(urls: list[str]) -> list[bytes]:
+    contents = []
+    for url in urls:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            page = browser.new_page()
+            page.goto(url)
+            contents.append(page.content().encode("utf-8"))
+            browser.close()
+    return contents
+
+
+def render_pooled(urls: list[str], pool: BrowserPool) -> list[bytes]:
+    with pool:
+        return [pool.content(url) for url in urls]
+
+
+async def render_pooled_async(urls: list[str], pool: AsyncBrowserPool) -> list[bytes]:
+    async with pool:
+        return await asyncio.gather(*(pool.content(url) for url in urls))
+
+
+def _timed(label: str, render, stats=None) -> tuple[dict, list[bytes]]:
+    start = time.perf_counter()
+    contents = render()
+    elapsed = time.perf_counter() - start
+    result = {
+        "mode": label,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(len(contents) / elapsed, 2),
+    }
+    if stats is not None:
+        result.update(stats.to_dict())
+    return result, contents
+
+
+def run(
+    pages_dir: Path, pool_size: int, max_pages_per_browser: int, skip_unpooled: bool
+) -> dict:
+    server = serve(pages_dir)
+    host, port = server.server_address
+    urls = [
+        f"http://{host}:{port}/{page.name}" for page in sorted(pages_dir.glob("*.html"))
+    ]
+
+    try:
+        modes, outputs = [], []
+        if not skip_unpooled:
+            result, contents = _timed("browser per page", lambda: render_unpooled(urls))
+            modes.append(result)
+            outputs.append(contents)
+
+        pool = BrowserPool()
+        pool.pool_size, pool.max_pages_per_browser = pool_size, max_pages_per_browser
+        result, contents = _timed(
+            "pooled", lambda: render_pooled(urls, pool), stats=pool.stats
+        )
+        modes.append(result)
+        outputs.append(contents)
+
+        async_pool = AsyncBrowserPool(
+            pool_size=pool_size, max_pages_per_browser=max_pages_per_browser
+        )
+        result, contents = _timed(
+            f"pooled async x{pool_size}",
+            lambda: asyncio.run(render_pooled_async(urls, async_pool)),
+            stats=async_pool.stats,
+        )
+        modes.append(result)
+        outputs.append(contents)
+    finally:
+        server.shutdown()
+
+    return {
+        "benchmark": "browser_pool",
+        "pages": len(urls),
+        "pool_size": pool_size,
+        "max_pages_per_browser": max_pages_per_browser,
+        "modes": modes,
+        "identical": all(output == outputs[0] for output in outputs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--pages-dir", type=Path)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--max-pages-per-browser", type=int, default=50)
+    parser.add_argument("--skip-unpooled", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages_dir = args.pages_dir
+        if pages_dir is None:
+            pages_dir = Path(tmp)
+            generate_pages(pages_dir, num_pages=args.pages)
+
+        result = run(
+            pages_dir=pages_dir,
+            pool_size=args.pool_size,
+            max_pages_per_browser=args.max_pages_per_browser,
+            skip_unpooled=args.skip_unpooled,
+        )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Compares the sequential and concurrent ESPN season scrape against recorded
+schedule pages. Pages are served through an in-memory transport that adds a
+fixed latency per request, standing in for the round trip to espn.com.
+
+    python -m benchmarks.espn_scrape_benchmark --year 2024 --record
+    python -m benchmarks.espn_scrape_benchmark --year 2024 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.fixtures import fixture_path, load_pages, record_page
+from src.services.scrapers.espn_scraper import EspnScraper
+from src.services.throttled_client import ThrottledClient
+
+
+class FixtureEspnScraper(EspnScraper):
+    def __init__(self, pages: dict[str, bytes], latency: float):
+        super().__init__()
+        self.pages = pages
+        self.latency = latency
+        self.requests = 0
+        self.http = ThrottledClient(
+            transport=httpx.MockTransport(self._serve),
+            async_transport=httpx.MockTransport(self._serve_async),
+        )
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        url = request.url.path.removeprefix(httpx.URL(self.base_url).path + "/")
+        if url not in self.pages:
+            return httpx.Response(404)
+        return httpx.Response(200, content=self.pages[url])
+
+    def _serve(self, request: httpx.Request) -> httpx.Response:
+        time.sleep(self.latency)
+        return self._respond(request)
+
+    async def _serve_async(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        return self._respond(request)
+
+
+def week_fixtures(year: int, num_weeks: int) -> dict:
+    return {
+        EspnScraper._week_url(week=week, year=year): fixture_path(
+            "espn", str(year), f"week_{week}.html"
+        )
+        for week in range(1, num_weeks + 1)
+    }
+
+
+def run(year: int, num_weeks: int, latency: float, concurrency: int, rps: float):
+    pages = load_pages(week_fixtures(year=year, num_weeks=num_weeks))
+
+    scraper = FixtureEspnScraper(pages=pages, latency=latency)
+    start = time.perf_counter()
+    sequential = scraper._scrape_season(year=year, num_weeks=num_weeks)
+    sequential_s = time.perf_counter() - start
+
+    scraper = FixtureEspnScraper(pages=pages, latency=latency)
+    start = time.perf_counter()
+    concurrent = asyncio.run(
+        scraper._scrape_season_async(
+            year=year,
+            num_weeks=num_weeks,
+            concurrency=concurrency,
+            requests_per_second=rps,
+        )
+    )
+    concurrent_s = time.perf_counter() - start
+
+    return {
+        "benchmark": "espn_scrape",
+        "year": year,
+        "weeks": num_weeks,
+        "games": sum(len(games) for games in sequential.values()),
+        "latency_s": latency,
+        "concurrency": concurrency,
+        "requests_per_second": rps,
+        "sequential_s": round(sequential_s, 3),
+        "concurrent_s": round(concurrent_s, 3),
+        "speedup": round(sequential_s / concurrent_s, 2) if concurrent_s else None,
+        "identical": sequential == concurrent,
+        "http": scraper.http.metrics(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--weeks", type=int, default=18)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--rps", type=float, default=4)
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    if args.record:
+        for url, path in week_fixtures(year=args.year, num_weeks=args.weeks).items():
+            record_page(base_url="https://www.espn.com/nfl", url=url, path=path)
+
+    result = run(
+        year=args.year,
+        num_weeks=args.weeks,
+        latency=args.latency,
+        concurrency=args.concurrency,
+        rps=args.rps,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
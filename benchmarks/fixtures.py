@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import httpx
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures"
+
+
+def fixture_path(*parts: str) -> Path:
+    return FIXTURES_PATH.joinpath(*parts)
+
+
+def record_page(base_url: str, url: str, path: Path) -> Path:
+    """
+    Download a page once and save it as a fixture.
+    :param base_url: site the page belongs to
+    :param url: the endpoint to record [full url is base_url/url]
+    :param path: where to write the page
+    :return: the written path
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with httpx.Client(base_url=base_url, timeout=60, follow_redirects=True) as client:
+        response = client.get(url)
+        response.raise_for_status()
+        path.write_bytes(response.content)
+    return path
+
+
+def load_pages(paths: dict[str, Path]) -> dict[str, bytes]:
+    missing = [str(path) for path in paths.values() if not path.exists()]
+    if missing:
+        raise SystemExit(
+            f"missing {len(missing)} fixture(s), e.g. {missing[0]}; rerun with --record"
+        )
+    return {url: path.read_bytes() for url, path in paths.items()}
@@ -0,0 +1,338 @@
+"""
+Sends concurrent traffic to the app in process, through httpx's ASGI transport,
+and reports per route throughput, latency percentiles and errors, plus how busy
+the database pool was. A scenario is a weighted mix of requests modelled on one
+of our traffic peaks, every virtual user sends them with its own player token.
+
+    python -m benchmarks.load_test --scenario pick-rush --concurrency 50
+    python -m benchmarks.load_test --scenario leaderboard --duration 60
+
+The app uses the database and secrets it is configured with, a synthetic league is
+seeded into the database for the run and dropped again, so it must be empty. With
+the local backends it runs offline, though the pool is only sampled on Postgres:
+
+    DB_BACKEND=sqlite-memory SECRET_BACKEND=local DB_NAME=pickem_load \\
+        python -m benchmarks.load_test --scenario pick-rush
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel
+
+from playhouse.pool import PooledDatabase
+
+from benchmarks.league import LeagueConfig, league_tables, seed_league
+from benchmarks.service_benchmark import _commit
+from src.app import app
+from src.components.pick.pick_models import PickRequest, SubmitPicksRequestDto
+from src.models.new_db_models import (
+    GameModel,
+    SeasonModel,
+    UserModel,
+    WeekModel,
+    database,
+)
+from src.services.oauth_service import OAuthService
+
+SCENARIOS = ("pick-rush", "leaderboard")
+
+
+class Target(BaseModel):
+    route: str
+    method: str
+    url: str
+    weight: int
+    body: dict | None = None
+
+
+class RouteStats(BaseModel):
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    errors: int = 0
+
+
+def targets(scenario: str, config: LeagueConfig, games: list) -> list[Target]:
+    year, week = config.current_year, config.completed_weeks
+    if scenario == "pick-rush":
+        # sunday 12:55pm, everyone locks in picks for the open week before kickoff
+        week += 1
+        picks = SubmitPicksRequestDto(
+            year=year,
+            week=week,
+            picks=[
+                PickRequest(
+                    game_id=game.id,
+                    team_id=game.home_team_id,
+                    spread_value=-3,
+                    confidence=confidence,
+                )
+                for confidence, game in enumerate(games, start=1)
+            ],
+        )
+        return [
+            Target(
+                route="PUT /pick",
+                method="PUT",
+                url="/pick",
+                weight=5,
+                body=picks.model_dump(mode="json", by_alias=True),
+            ),
+            Target(
+                route="GET /pick/{year}/{week}",
+                method="GET",
+                url=f"/pick/{year}/{week}",
+                weight=2,
+            ),
+            Target(
+                route="GET /dashboard",
+                method="GET",
+                url=f"/dashboard?year={year}&week={week}",
+                weight=2,
+            ),
+            Target(
+                route="GET /results/{year}/{week}/nfl-games",
+                method="GET",
+                url=f"/results/{year}/{week}/nfl-games?page_size=16",
+                weight=1,
+            ),
+        ]
+
+    # monday night, the week is final and everyone refreshes the leaderboard
+    return [
+        Target(
+            route="GET /standings/{year}/{week}",
+            method="GET",
+            url=f"/standings/{year}/{week}",
+            weight=4,
+        ),
+        Target(
+            route="GET /standings/{year}/{week}/history",
+            method="GET",
+            url=f"/standings/{year}/{week}/history",
+            weight=2,
+        ),
+        Target(
+            route="GET /results/{year}/{week}/league-picks",
+            method="GET",
+            url=f"/results/{year}/{week}/league-picks",
+            weight=2,
+        ),
+        Target(
+            route="GET /results/{year}/{week}/user-picks",
+            method="GET",
+            url=f"/results/{year}/{week}/user-picks",
+            weight=1,
+        ),
+        Target(
+            route="GET /dashboard",
+            method="GET",
+            url=f"/dashboard?year={year}&week={week}",
+            weight=1,
+        ),
+    ]
+
+
+def percentile(latencies: list[float], n: int) -> float:
+    if len(latencies) < 2:
+        return round(latencies[0], 2) if latencies else 0
+    return round(statistics.quantiles(latencies, n=100, method="inclusive")[n - 1], 2)
+
+
+async def sample_pool(database, samples: list[int], stop: asyncio.Event):
+    # the connections leased from peewee's pool, sampled while the load runs
+    if not isinstance(database, PooledDatabase):
+        return
+    while not stop.is_set():
+        samples.append(len(database._in_use))
+        await asyncio.sleep(0.01)
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    token: str,
+    mix: list[Target],
+    stats: dict[str, RouteStats],
+    deadline: float,
+    rng: random.Random,
+):
+    weights = [target.weight for target in mix]
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        target = rng.choices(mix, weights=weights)[0]
+        route = stats.setdefault(target.route, RouteStats())
+        start = time.perf_counter()
+        try:
+            response = await client.request(
+                target.method, target.url, json=target.body, headers=headers
+            )
+            status = response.status_code
+        except Exception:
+            status = 599
+        route.latencies.append((time.perf_counter() - start) * 1000)
+        route.statuses[status] = route.statuses.get(status, 0) + 1
+        if status >= 400:
+            route.errors += 1
+
+
+async def drive(
+    app, database, tokens: list[str], mix, concurrency: int, duration: float, seed
+):
+    stats, pool_samples, stop = {}, [], asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://load-test/api"
+    ) as client:
+        sampler = asyncio.create_task(sample_pool(database, pool_samples, stop))
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                virtual_user(
+                    client,
+                    tokens[n % len(tokens)],
+                    mix,
+                    stats,
+                    start + duration,
+                    random.Random(seed + n),
+                )
+                for n in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+    return stats, pool_samples, elapsed
+
+
+def report(stats: dict[str, RouteStats], pool_samples, elapsed, database) -> dict:
+    routes = {
+        name: {
+            "requests": len(route.latencies),
+            "rps": round(len(route.latencies) / elapsed, 1),
+            "p50_ms": percentile(route.latencies, 50),
+            "p95_ms": percentile(route.latencies, 95),
+            "p99_ms": percentile(route.latencies, 99),
+            "max_ms": round(max(route.latencies), 2),
+            "error_rate": round(route.errors / len(route.latencies), 4),
+            "statuses": route.statuses,
+        }
+        for name, route in sorted(stats.items())
+    }
+    requests = sum(len(route.latencies) for route in stats.values())
+    errors = sum(route.errors for route in stats.values())
+    pool = None
+    if pool_samples:
+        max_connections = database._max_connections
+        pool = {
+            "max_connections": max_connections,
+            "peak_in_use": max(pool_samples),
+            "mean_in_use": round(statistics.fmean(pool_samples), 2),
+            "saturated": round(
+                sum(1 for n in pool_samples if n >= max_connections)
+                / len(pool_samples),
+                4,
+            ),
+        }
+    return {
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "error_rate": round(errors / max(requests, 1), 4),
+        "routes": routes,
+        "pool": pool,
+    }
+
+
+def run(
+    scenario: str,
+    config: LeagueConfig,
+    concurrency: int,
+    duration: float,
+    keep: bool = False,
+) -> dict:
+    oauth_service = OAuthService.create()
+    with league_tables(database, keep=keep):
+        rows = seed_league(config, database)
+        tokens = [
+            oauth_service.generate_tokens(user.username, roles=["player"]).access_token
+            for user in UserModel.select(UserModel.username)
+        ]
+        games = list(
+            GameModel.select()
+            .join(WeekModel, on=(GameModel.week == WeekModel.id))
+            .join(SeasonModel, on=(GameModel.season == SeasonModel.id))
+            .where(
+                (SeasonModel.year == config.current_year)
+                & (WeekModel.week_number == config.completed_weeks + 1)
+            )
+            .limit(config.picks_per_week)
+        )
+        database.close()
+
+        stats, pool_samples, elapsed = asyncio.run(
+            drive(
+                app,
+                database,
+                tokens,
+                targets(scenario, config, games),
+                concurrency,
+                duration,
+                config.seed,
+            )
+        )
+
+    return {
+        "benchmark": "load",
+        "commit": _commit(),
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "duration_seconds": round(elapsed, 2),
+        "league": config.model_dump(),
+        "rows": rows,
+        **report(stats, pool_samples, elapsed, database),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scenario", choices=SCENARIOS, default=SCENARIOS[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--completed-weeks", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded tables")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    config = LeagueConfig(
+        users=args.users,
+        seasons=args.seasons,
+        completed_weeks=args.completed_weeks,
+        seed=args.seed,
+    )
+    result = json.dumps(
+        run(
+            scenario=args.scenario,
+            config=config,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            keep=args.keep,
+        ),
+        indent=2,
+    )
+    if args.output:
+        args.output.write_text(result)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
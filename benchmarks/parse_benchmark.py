@@ -0,0 +1,173 @@
+"""
+Measures HTML parse throughput and peak memory of the scraper parsing layer
+over recorded ESPN, PFR and NFL pages, for each parser backend with and
+without the scrapers' strainers.
+
+    python -m benchmarks.parse_benchmark --year 2024 --record
+    python -m benchmarks.parse_benchmark --year 2024 --rounds 3
+
+Peak memory is measured with tracemalloc, which sees the Python tree objects
+that dominate a BeautifulSoup document but not libxml2's own buffers.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from benchmarks.fixtures import fixture_path, load_pages, record_page
+from src.services.scrapers.base_scraper import HTML_PARSER
+from src.services.scrapers.espn_scraper import EspnScraper, SCHEDULE_STRAINER
+from src.services.scrapers.nfl_scraper import FIGURE_STRAINER
+from src.services.scrapers.pfr_scraper import TEAMS_STRAINER
+
+
+def _pfr_teams(soup: BeautifulSoup) -> list:
+    return [
+        team.text.strip()
+        for th in soup.find_all("th", attrs={"data-stat": "team_name"})
+        if (team := th.find("a"))
+    ]
+
+
+def _nfl_thumbnails(soup: BeautifulSoup) -> list:
+    return [
+        (img.get("alt"), img.get("data-src"))
+        for figure in soup.find_all("figure", class_="nfl-c-custom-promo__figure")
+        if (img := figure.find("img"))
+    ]
+
+
+def page_sets(year: int, num_weeks: int) -> dict:
+    espn = EspnScraper()
+    return {
+        "espn": {
+            "base_url": espn.base_url,
+            "pages": {
+                espn._week_url(week=week, year=year): fixture_path(
+                    "espn", str(year), f"week_{week}.html"
+                )
+                for week in range(1, num_weeks + 1)
+            },
+            "strainer": SCHEDULE_STRAINER,
+            "extract": espn._parse_week,
+        },
+        "pfr": {
+            "base_url": "https://www.pro-football-reference.com",
+            "pages": {"teams/": fixture_path("pfr", "teams.html")},
+            "strainer": TEAMS_STRAINER,
+            "extract": _pfr_teams,
+        },
+        "nfl": {
+            "base_url": "https://www.nfl.com",
+            "pages": {"teams/": fixture_path("nfl", "teams.html")},
+            "strainer": FIGURE_STRAINER,
+            "extract": _nfl_thumbnails,
+        },
+    }
+
+
+def _parse_all(
+    pages: list[bytes],
+    parser: str,
+    strainer: SoupStrainer | None,
+    extract: Callable[[BeautifulSoup], list],
+) -> list:
+    results = []
+    for content in pages:
+        soup = BeautifulSoup(content, parser, parse_only=strainer)
+        results.append(extract(soup))
+        soup.decompose()
+    return results
+
+
+def measure(pages: list[bytes], parser: str, strainer, extract, rounds: int) -> dict:
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = _parse_all(pages, parser, strainer, extract)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    _parse_all(pages, parser, strainer, extract)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "parser": parser,
+        "strained": strainer is not None,
+        "pages_per_sec": round(len(pages) * rounds / elapsed, 2),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "results": results,
+    }
+
+
+def run(year: int, num_weeks: int, rounds: int, sites: list[str]) -> list[dict]:
+    variants = [("html.parser", False), (HTML_PARSER, False), (HTML_PARSER, True)]
+    variants = list(dict.fromkeys(variants))
+
+    report = []
+    for site, config in page_sets(year=year, num_weeks=num_weeks).items():
+        if site not in sites:
+            continue
+
+        pages = list(load_pages(config["pages"]).values())
+        baseline = None
+        for parser, strained in variants:
+            result = measure(
+                pages=pages,
+                parser=parser,
+                strainer=config["strainer"] if strained else None,
+                extract=config["extract"],
+                rounds=rounds,
+            )
+            results = result.pop("results")
+            baseline = results if baseline is None else baseline
+            report.append(
+                {
+                    "benchmark": "parse",
+                    "site": site,
+                    "pages": len(pages),
+                    "bytes": sum(len(page) for page in pages),
+                    **result,
+                    "matches_baseline": results == baseline,
+                }
+            )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--weeks", type=int, default=18)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--sites", nargs="+", default=["espn", "pfr", "nfl"])
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    if args.record:
+        for site, config in page_sets(year=args.year, num_weeks=args.weeks).items():
+            if site in args.sites:
+                for url, path in config["pages"].items():
+                    record_page(base_url=config["base_url"], url=url, path=path)
+
+    print(
+        json.dumps(
+            run(
+                year=args.year,
+                num_weeks=args.weeks,
+                rounds=args.rounds,
+                sites=args.sites,
+            ),
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Guards the hot queries against plan regressions. Builds each with representative
+parameters over a synthetic league, captures its plan and compares it with the
+stored baseline, flagging new sequential scans, row estimates that are off by
+more than --row-factor and total costs that grew by more than --cost-jump.
+
+    python -m benchmarks.query_plans            # compare, exits 1 on a regression
+    python -m benchmarks.query_plans --update   # store the current plans
+
+Runs against the configured database backend, which must be empty. On Postgres
+the plans come from EXPLAIN (ANALYZE, BUFFERS), statements that write are rolled
+back. SQLite only has EXPLAIN QUERY PLAN, so there are no costs or estimates to
+compare, but scans are still caught. Baselines are kept per backend in
+benchmarks/plans/.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from peewee import PostgresqlDatabase
+
+from benchmarks.league import MODELS, LeagueConfig, league_tables, seed_league
+from src.components.pick.pick_service import PickService
+from src.components.results.results_service import ResultsService, _week_model
+from src.config.settings import Settings
+from src.models.new_db_models import (
+    GameModel,
+    SeasonModel,
+    UserModel,
+    WeekModel,
+    database,
+)
+from src.services.spread_service import SpreadService
+
+PLANS_PATH = Path(__file__).parent / "plans"
+
+
+def hot_queries(config: LeagueConfig) -> dict:
+    year, week = config.current_year, config.completed_weeks
+    user = UserModel.get(UserModel.username == "player0")
+    week_games = [
+        game.id
+        for game in GameModel.select(GameModel.id)
+        .join(WeekModel, on=(GameModel.week == WeekModel.id))
+        .join(SeasonModel, on=(GameModel.season == SeasonModel.id))
+        .where((SeasonModel.year == year) & (WeekModel.week_number == week))
+    ]
+    picks = [
+        pick.id
+        for pick in PickService._existing_picks_query(
+            user_id=user.id, game_ids=week_games
+        )
+    ]
+    return {
+        "SpreadService._matchup_query": SpreadService._matchup_query(
+            year=year, week=week, bookmaker=Settings().closing_line_bookmaker
+        ),
+        "ResultsService._pick_results_query": ResultsService._pick_results_query(
+            year=year, week_condition=_week_model.week_number <= week
+        ),
+        "PickService._existing_picks_query": PickService._existing_picks_query(
+            user_id=user.id, game_ids=week_games
+        ),
+        "PickService._delete_picks_query": PickService._delete_picks_query(
+            pick_ids=picks
+        ),
+    }
+
+
+def _postgres_nodes(node: dict, depth: int = 0):
+    yield depth, node
+    for child in node.get("Plans", []):
+        yield from _postgres_nodes(child, depth + 1)
+
+
+def explain_postgres(query, row_factor: float) -> dict:
+    sql, params = query.sql()
+    with database.atomic() as transaction:
+        cursor = database.execute_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params
+        )
+        (explained,) = cursor.fetchone()
+        transaction.rollback()
+    if isinstance(explained, str):
+        explained = json.loads(explained)
+    plan = explained[0]["Plan"]
+
+    nodes, seq_scans, misestimates = [], [], {}
+    for depth, node in _postgres_nodes(plan):
+        label = node["Node Type"]
+        if relation := node.get("Relation Name"):
+            label += f" on {relation}"
+        if index := node.get("Index Name"):
+            label += f" using {index}"
+        nodes.append("  " * depth + label)
+        if node["Node Type"] == "Seq Scan":
+            seq_scans.append(relation)
+
+        # the estimate is per loop, so is the actual row count
+        estimated = max(node["Plan Rows"], 1)
+        actual = max(node.get("Actual Rows", 0), 1)
+        if max(estimated / actual, actual / estimated) > row_factor:
+            misestimates[label] = f"estimated {estimated}, actual {actual}"
+
+    return {
+        "nodes": nodes,
+        "seq_scans": sorted(set(seq_scans)),
+        "misestimates": misestimates,
+        "cost": plan["Total Cost"],
+        "execution_ms": explained[0].get("Execution Time"),
+        "shared_buffers": {
+            "hit": plan.get("Shared Hit Blocks"),
+            "read": plan.get("Shared Read Blocks"),
+        },
+    }
+
+
+def explain_sqlite(query) -> dict:
+    sql, params = query.sql()
+    rows = database.execute_sql(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+
+    depths, nodes, seq_scans = {0: -1}, [], []
+    for node_id, parent, _, detail in rows:
+        depths[node_id] = depths.get(parent, -1) + 1
+        nodes.append("  " * depths[node_id] + detail)
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            seq_scans.append(detail.split()[1])
+
+    return {
+        "nodes": nodes,
+        "seq_scans": sorted(set(seq_scans)),
+        "misestimates": {},
+        "cost": None,
+    }
+
+
+def regressions(
+    name: str, plan: dict, baseline: dict | None, cost_jump: float
+) -> list[str]:
+    if baseline is None:
+        return [f"{name}: no baseline, store one with --update"]
+
+    found = [
+        f"{name}: new sequential scan on {relation}"
+        for relation in plan["seq_scans"]
+        if relation not in baseline["seq_scans"]
+    ]
+    found += [
+        f"{name}: row estimate of {label} is off, {misestimate}"
+        for label, misestimate in plan["misestimates"].items()
+        if label not in baseline["misestimates"]
+    ]
+    if plan["cost"] and baseline["cost"]:
+        if plan["cost"] > baseline["cost"] * (1 + cost_jump):
+            found.append(f"{name}: cost went from {baseline['cost']} to {plan['cost']}")
+    return found
+
+
+def run(
+    config: LeagueConfig, update: bool, row_factor: float, cost_jump: float
+) -> list[str]:
+    backend = Settings().db_backend
+    baseline_path = PLANS_PATH / f"{backend}.json"
+    baselines = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+
+    with league_tables(database):
+        seed_league(config, database)
+        if isinstance(database, PostgresqlDatabase):
+            # fresh statistics, so the plans reflect the league and not empty tables
+            tables = ", ".join(f'"{model._meta.table_name}"' for model in MODELS)
+            database.execute_sql(f"ANALYZE {tables}")
+            plans = {
+                name: explain_postgres(query, row_factor)
+                for name, query in hot_queries(config).items()
+            }
+        else:
+            plans = {
+                name: explain_sqlite(query)
+                for name, query in hot_queries(config).items()
+            }
+
+    if update:
+        PLANS_PATH.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(plans, indent=2) + "\n")
+        return []
+
+    found = []
+    for name, plan in plans.items():
+        found += regressions(name, plan, baselines.get(name), cost_jump)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--row-factor", type=float, default=10)
+    parser.add_argument("--cost-jump", type=float, default=0.5)
+    parser.add_argument("--update", action="store_true", help="store the plans")
+    args = parser.parse_args()
+
+    found = run(
+        config=LeagueConfig(users=args.users, seasons=args.seasons, seed=args.seed),
+        update=args.update,
+        row_factor=args.row_factor,
+        cost_jump=args.cost_jump,
+    )
+    for regression in found:
+        print(regression)
+    raise SystemExit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
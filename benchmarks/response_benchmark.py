@@ -0,0 +1,228 @@
+"""
+Measures the cost of returning the large result payloads, per endpoint: FastAPI's
+response_model path against DtoResponse, the raw and gzipped body sizes, and the
+serializer alone (FastAPI's encoder, orjson over model_dump, pydantic's to_json).
+Payloads are generated for a league of --users players over --weeks weeks.
+
+    python -m benchmarks.response_benchmark --users 40 --weeks 18
+"""
+
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from starlette.middleware.gzip import GZipMiddleware
+
+from src.components.results.results_dto import PickDto, TeamDto, UserPickResultsDto
+from src.components.standings.standings_dtos import (
+    StandingsHistoryDto,
+    UserHistoryDto,
+)
+from src.util.dto_response import DtoResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PICKS_PER_WEEK = 16
+
+
+def _team(team_id: int) -> TeamDto:
+    return TeamDto(
+        team_id=team_id,
+        team_name=f"Team {team_id}",
+        team_city=f"City {team_id}",
+        thumbnail=f"https://static.example.com/teams/{team_id}.png",
+        primary_color="#013369",
+        secondary_color="#D50A0A",
+    )
+
+
+def _user_results(users: int, weeks: int, rng: random.Random) -> list:
+    results = []
+    for user in range(users):
+        picks = [
+            PickDto(
+                id=user * 10_000 + n,
+                team=_team(rng.randint(1, 32)),
+                confidence=n % PICKS_PER_WEEK + 1,
+                spread_value=rng.choice([-7.5, -3, -1.5, 1.5, 3, 7.5]),
+                status="SUBMITTED",
+                score=rng.choice([0, 0.5, 1]) * (n % PICKS_PER_WEEK + 1),
+                pick_status=rng.choice(["COVERED", "FAILED", "PUSHED"]),
+            )
+            for n in range(weeks * PICKS_PER_WEEK)
+        ]
+        results.append(
+            UserPickResultsDto(
+                username=f"player{user}",
+                picks=picks,
+                total_score=sum(pick.score for pick in picks),
+                rank=user + 1,
+            )
+        )
+    return results
+
+
+def _standings_history(users: int, weeks: int, rng: random.Random):
+    return StandingsHistoryDto(
+        year=2024,
+        weeks=list(range(1, weeks + 1)),
+        users=[
+            UserHistoryDto(
+                username=f"player{user}",
+                ranks=[rng.randint(1, users) for _ in range(weeks)],
+                scores=[rng.randint(0, 136) for _ in range(weeks)],
+                pcts=[rng.random() for _ in range(weeks)],
+            )
+            for user in range(users)
+        ],
+    )
+
+
+def payloads(users: int, weeks: int) -> dict[str, tuple[type, object]]:
+    rng = random.Random(7)
+    return {
+        "/results/{year}/{week}/history": (
+            list[UserPickResultsDto],
+            _user_results(users, weeks, rng),
+        ),
+        "/results/{year}/{week}/league-picks": (
+            list[UserPickResultsDto],
+            _user_results(users, 1, rng),
+        ),
+        "/standings/{year}/{week}/history": (
+            StandingsHistoryDto,
+            _standings_history(users, weeks, rng),
+        ),
+    }
+
+
+def build_app(response_model, payload, fast: bool, compresslevel: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=compresslevel)
+
+    @app.get("/payload", response_model=response_model)
+    async def endpoint():
+        return DtoResponse(payload) if fast else payload
+
+    return app
+
+
+def _time(fn, rounds: int) -> dict:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def serializers(response_model, payload) -> dict[str, callable]:
+    adapter = TypeAdapter(response_model)
+
+    def fastapi_default():
+        # what serialize_response does with a response_model
+        validated = adapter.validate_python(payload, from_attributes=True)
+        content = adapter.dump_python(validated, mode="json", by_alias=True)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    modes = {"fastapi response_model": fastapi_default}
+    if orjson is not None:
+        modes["orjson of model_dump"] = lambda: orjson.dumps(
+            adapter.dump_python(payload, by_alias=True)
+        )
+    modes["pydantic to_json"] = lambda: to_json(payload, by_alias=True)
+    return modes
+
+
+def run(users: int, weeks: int, rounds: int, compresslevel: int) -> dict:
+    endpoints = []
+    for path, (response_model, payload) in payloads(users, weeks).items():
+        bodies, requests = {}, {}
+        for mode, fast in (("response_model", False), ("DtoResponse", True)):
+            client = TestClient(build_app(response_model, payload, fast, compresslevel))
+            plain = client.get("/payload", headers={"Accept-Encoding": "identity"})
+            zipped = client.get("/payload", headers={"Accept-Encoding": "gzip"})
+            bodies[mode] = plain.json()
+            requests[mode] = {
+                **_time(
+                    lambda: client.get(
+                        "/payload", headers={"Accept-Encoding": "identity"}
+                    ),
+                    rounds,
+                ),
+                "gzip": _time(
+                    lambda: client.get("/payload", headers={"Accept-Encoding": "gzip"}),
+                    rounds,
+                ),
+                "encoding": zipped.headers.get("content-encoding"),
+            }
+
+        serialized = {
+            mode: (fn(), _time(fn, rounds))
+            for mode, fn in serializers(response_model, payload).items()
+        }
+        raw = next(iter(serialized.values()))[0]
+        endpoints.append(
+            {
+                "endpoint": path,
+                "bytes": len(raw),
+                "gzip_bytes": len(gzip.compress(raw, compresslevel=compresslevel)),
+                "requests": requests,
+                "serializers": {
+                    mode: timing for mode, (_, timing) in serialized.items()
+                },
+                "identical": bodies["response_model"] == bodies["DtoResponse"]
+                and all(
+                    json.loads(body) == json.loads(raw)
+                    for body, _ in serialized.values()
+                ),
+            }
+        )
+
+    return {
+        "benchmark": "response",
+        "users": users,
+        "weeks": weeks,
+        "rounds": rounds,
+        "compresslevel": compresslevel,
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--weeks", type=int, default=18)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--compresslevel", type=int, default=6)
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            run(
+                users=args.users,
+                weeks=args.weeks,
+                rounds=args.rounds,
+                compresslevel=args.compresslevel,
+            ),
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
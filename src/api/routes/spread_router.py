@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 
 from src.components.auth.permission_checker import PermissionChecker
 from src.components.results.results_dto import MatchupDto
+from src.models.dto.spread_dtos import LineHistoryDto
 from src.services.spread_service import SpreadService
 
 spread_service = SpreadService()
@@ -21,3 +22,14 @@ async def get_spreads_for_week(
     return await spread_service.get_matchup_data(
         year=year, week=week, bookmaker=bookmaker
     )
+
+
+@spread_router.get(
+    "/{year}/{week}/{bookmaker}/history", response_model=list[LineHistoryDto]
+)
+async def get_line_history_for_week(
+    year: int,
+    week: int,
+    bookmaker: str,
+):
+    return spread_service.get_line_history(year=year, week=week, bookmaker=bookmaker)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, FastAPI, Request
 from fastapi.responses import JSONResponse
 from mangum import Mangum
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from src.api.routes.ping_router import ping_router
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -13,6 +14,9 @@ from src.api.routes.scrape_router import scrape_router
 from src.api.routes.spread_router import spread_router
 from src.api.routes.team_router import team_router
 from src.components.auth.auth_router import auth_router
+from src.components.dashboard.dashboard_router import dashboard_router
+from src.components.live.live_router import live_router
+from src.components.metrics.metrics_router import metrics_router
 from src.components.results.results_router import results_router
 from src.components.roles.roles_router import roles_router
 from src.components.standings.standings_router import standings_router
@@ -20,7 +24,11 @@ from src.components.user.user_router import user_router
 from src.components.season.season_router import season_router
 from src.components.user.users_router import users_router
 from src.config.logger import Logger
+from src.config.settings import Settings
 from src.models.new_db_models import database
+from src.util.metrics_middleware import MetricsMiddleware
+from src.util.profiling_middleware import ProfilingMiddleware
+from src.util.week_cache_middleware import WeekCacheMiddleware
 
 app = FastAPI(title="PickEm Api", version="0.0.1", root_path="/api")
 logger = Logger()
@@ -32,6 +40,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=True,
+    expose_headers=["X-Next-Cursor"],
+)
+# inside gzip, so ETags are computed over the uncompressed body
+app.add_middleware(WeekCacheMiddleware)
+# small bodies are not worth the cpu, large result payloads shrink 20-30x
+settings = Settings()
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_compress_level,
 )
 
 
@@ -63,6 +81,15 @@ async def exception_handling_middleware(request: Request, call_next):
     return response
 
 
+# outermost, so a profile covers every middleware and the database connection
+app.add_middleware(
+    ProfilingMiddleware,
+    database=database,
+    interval=settings.profile_sample_interval_seconds,
+)
+# around the profiler, so profiled requests are counted like any other
+app.add_middleware(MetricsMiddleware)
+
 # api = APIRouter(prefix="/api")
 
 # new component structure
@@ -73,6 +100,9 @@ app.include_router(users_router)
 app.include_router(roles_router)
 app.include_router(results_router)
 app.include_router(standings_router)
+app.include_router(live_router)
+app.include_router(dashboard_router)
+app.include_router(metrics_router)
 
 # old route structure
 # api.include_router(auth_router)
@@ -6,6 +6,7 @@ from src.config.base_service import BaseService
 from src.models.dto.action_dto import CreateActionRequest, ActionType
 from src.models.dto.week_dto import WeekDto
 from src.util.injection import dependency, inject
+from src.util.metrics import OUTBOUND_ERRORS, OUTBOUND_SECONDS
 from src.services.property_service import PropertyService
 from src.models.new_db_models import PropertyModel, WeekModel, SeasonModel
 
@@ -68,12 +69,13 @@ class AdminService(BaseService):
         client = boto3.client("stepfunctions")
         paginator = client.get_paginator("list_state_machines")
 
-        for page in paginator.paginate():
-            for state_machine in page.get("stateMachines", []):
-                tags_response = client.list_tags_for_resource(
-                    resourceArn=state_machine.get("stateMachineArn")
-                )
-                actions.append({**state_machine, "tags": tags_response.get("tags")})
+        with OUTBOUND_SECONDS.time(("step_functions",), errors=OUTBOUND_ERRORS):
+            for page in paginator.paginate():
+                for state_machine in page.get("stateMachines", []):
+                    tags_response = client.list_tags_for_resource(
+                        resourceArn=state_machine.get("stateMachineArn")
+                    )
+                    actions.append({**state_machine, "tags": tags_response.get("tags")})
 
         return actions
 
@@ -83,8 +85,9 @@ class AdminService(BaseService):
         client = boto3.client("stepfunctions")
         paginator = client.get_paginator("list_executions")
 
-        for page in paginator.paginate(stateMachineArn=state_machine_arn):
-            executions.extend(page.get("executions", []))
+        with OUTBOUND_SECONDS.time(("step_functions",), errors=OUTBOUND_ERRORS):
+            for page in paginator.paginate(stateMachineArn=state_machine_arn):
+                executions.extend(page.get("executions", []))
 
         return executions
 
@@ -99,10 +102,11 @@ class AdminService(BaseService):
         )
 
         client = boto3.client("stepfunctions")
-        response = client.get_execution_history(
-            executionArn=execution_arn,
-            **pagination_options.model_dump(by_alias=True, exclude_none=True),
-        )
+        with OUTBOUND_SECONDS.time(("step_functions",), errors=OUTBOUND_ERRORS):
+            response = client.get_execution_history(
+                executionArn=execution_arn,
+                **pagination_options.model_dump(by_alias=True, exclude_none=True),
+            )
 
         return {
             "events": response.get("events", []),
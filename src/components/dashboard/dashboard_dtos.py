@@ -0,0 +1,13 @@
+from src.components.pick.pick_models import UserPicksDto
+from src.components.results.results_dto import MatchupDto
+from src.components.standings.standings_dtos import StandingsDto
+from src.models.base_models import BaseDto
+
+
+class DashboardDto(BaseDto):
+    year: int
+    week: int
+    matchups: list[MatchupDto]
+    picks: UserPicksDto
+    standings: list[StandingsDto]
+    timings: dict[str, float]  # milliseconds per section, plus the total
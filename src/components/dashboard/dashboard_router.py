@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query
+
+from src.components.auth.auth_models import DecodedToken
+from src.components.auth.permission_checker import PermissionChecker
+from src.components.dashboard.dashboard_dtos import DashboardDto
+from src.components.dashboard.dashboard_service import DashboardService
+from src.util.dto_response import DtoResponse
+
+dashboard_router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@dashboard_router.get("", response_model=DashboardDto)
+async def get_dashboard(
+    year: int | None = Query(default=None, description="Defaults to the current year"),
+    week: int | None = Query(default=None, description="Defaults to the current week"),
+    bookmaker: str | None = Query(default=None, description="Bookmaker of the lines"),
+    dashboard_service: DashboardService = Depends(DashboardService.create),
+    token: DecodedToken = Depends(PermissionChecker.player),
+):
+    """
+    The current week, its matchups, the user's picks and the standings in one call,
+    replacing the four requests the main page used to make.
+    """
+    return DtoResponse(
+        await dashboard_service.get_dashboard(
+            username=token.sub, year=year, week=week, bookmaker=bookmaker
+        )
+    )
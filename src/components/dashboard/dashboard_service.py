@@ -0,0 +1,104 @@
+import time
+from contextlib import contextmanager
+
+from src.components.dashboard.dashboard_dtos import DashboardDto
+from src.components.pick.pick_service import PickService
+from src.components.season.season_service import SeasonService
+from src.components.standings.standings_service import StandingsService
+from src.config.base_service import BaseService
+from src.models.new_db_models import UserModel
+from src.services.spread_service import SpreadService
+from src.util.injection import dependency, inject
+
+
+@dependency
+class DashboardService(BaseService):
+    """
+    Builds everything the main page needs in one request: the current week, its
+    matchups, the user's picks and the standings. The week is resolved once and
+    every section runs on the request's database connection.
+
+    Sections run one after the other. Our queries are synchronous, so gathering
+    them on the event loop would not overlap them, and running them on threads
+    would lease a connection per section, which costs more than the queries on a
+    cold Lambda.
+    """
+
+    @inject
+    def __init__(
+        self,
+        season_service: SeasonService,
+        spread_service: SpreadService,
+        pick_service: PickService,
+        standings_service: StandingsService,
+    ):
+        """
+        Initializes the DashboardService.
+        """
+        self.season_service = season_service
+        self.spread_service = spread_service
+        self.pick_service = pick_service
+        self.standings_service = standings_service
+
+    @staticmethod
+    @contextmanager
+    def _timed(timings: dict[str, float], section: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[section] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def get_dashboard(
+        self,
+        username: str,
+        year: int | None = None,
+        week: int | None = None,
+        bookmaker: str | None = None,
+    ) -> DashboardDto:
+        """
+        :param username: The user whose picks are returned.
+        :param year: The season year, defaults to the current one.
+        :param week: The week number, defaults to the current one.
+        :param bookmaker: The bookmaker of the lines, defaults to the closing line one.
+        :return: DashboardDto with per section timings in milliseconds.
+        """
+        timings = {}
+        start = time.perf_counter()
+
+        with self._timed(timings, "week"):
+            if year is None or week is None:
+                current = self.season_service.get_current_week_and_year()
+                year = year or current["year"]
+                week = week or current["week"]
+
+        with self._timed(timings, "matchups"):
+            matchups = await self.spread_service.get_matchup_data(
+                year=year,
+                week=week,
+                bookmaker=bookmaker or self.settings.closing_line_bookmaker,
+            )
+
+        with self._timed(timings, "picks"):
+            user = UserModel.get(UserModel.username == username)
+            picks = self.pick_service.get_user_picks_for_week(
+                user=user, year=year, week_number=week
+            )
+
+        with self._timed(timings, "standings"):
+            standings = await self.standings_service.get_standings_for_week(
+                year=year, week=week
+            )
+
+        timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        self.logger.info(
+            f"built dashboard for {username}, {year} week {week}: {timings}"
+        )
+        return DashboardDto(
+            year=year,
+            week=week,
+            matchups=matchups,
+            picks=picks,
+            standings=standings,
+            timings=timings,
+        )
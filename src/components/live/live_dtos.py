@@ -0,0 +1,22 @@
+from pydantic import Field
+
+from src.models.base_models import BaseDto
+from src.models.dto.event_dtos import ScoreEventPayload
+
+
+class StandingsDeltaDto(BaseDto):
+    username: str
+    rank: int
+    previous_rank: int | None = Field(default=None)
+    score: float
+    previous_score: float | None = Field(default=None)
+    correct_picks: float
+    total_picks: int
+
+
+class LiveUpdateDto(BaseDto):
+    year: int
+    week: int
+    event_id: int
+    scores: list[ScoreEventPayload] = Field(default_factory=list)
+    standings: list[StandingsDeltaDto] = Field(default_factory=list)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Path, Request
+from fastapi.responses import StreamingResponse
+
+from src.components.auth.auth_models import DecodedToken
+from src.components.auth.permission_checker import PermissionChecker
+from src.components.live.live_service import LiveService
+
+live_router = APIRouter(prefix="/live", tags=["Live"])
+
+# one instance per process, so every stream shares the same poller
+live_service = LiveService()
+
+
+@live_router.get(
+    "/{year}/{week}",
+    summary="Stream live scores and standings changes for a week",
+    response_class=StreamingResponse,
+)
+async def stream_live_updates(
+    request: Request,
+    year: int = Path(description="The year of the NFL season."),
+    week: int = Path(description="The week number within the NFL season."),
+    token: DecodedToken = Depends(PermissionChecker.player),
+):
+    """
+    Server-Sent Events stream. The first `snapshot` event carries the week's
+    standings, each `update` event carries the scores that changed and the
+    standings entries that moved. Requires a streaming capable deployment; API
+    Gateway buffers Lambda responses.
+    """
+    return StreamingResponse(
+        live_service.stream(year=year, week=week, request=request),
+        media_type="text/event-stream",
+        # identity keeps the gzip middleware from buffering events
+        headers={
+            "Cache-Control": "no-cache",
+            "Content-Encoding": "identity",
+            "X-Accel-Buffering": "no",
+        },
+    )
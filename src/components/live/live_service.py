@@ -0,0 +1,218 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import Request
+
+from src.components.live.live_dtos import LiveUpdateDto, StandingsDeltaDto
+from src.components.standings.standings_dtos import StandingsDto
+from src.components.standings.standings_service import StandingsService
+from src.config.base_service import BaseService
+from src.models.dto.event_dtos import EventDto, EventTopic, ScoreEventPayload
+from src.models.new_db_models import database
+from src.services.event_service import EventService
+from src.util.injection import dependency, inject
+
+
+@dependency
+class LiveService(BaseService):
+    """
+    Fans score events out to Server-Sent Events streams. One poller per process reads
+    the event table forward from a cursor while anyone is subscribed, and standings
+    are only recomputed when a game goes final, once per subscribed week, whatever
+    the number of connected clients.
+
+    Database work runs on worker threads with their own pooled connection, since the
+    request middleware closes the event loop thread's connection once a streaming
+    response has started.
+    """
+
+    @inject
+    def __init__(
+        self, event_service: EventService, standings_service: StandingsService
+    ):
+        """
+        Initializes the LiveService.
+
+        :param event_service: Source of the score events.
+        :param standings_service: Used to recompute standings after a game goes final.
+        """
+        self.event_service = event_service
+        self.standings_service = standings_service
+        self.poll_seconds = self.settings.live_poll_seconds
+        self.heartbeat_seconds = self.settings.live_heartbeat_seconds
+        self.queue_size = self.settings.live_queue_size
+        self._subscribers: dict[tuple[int, int], set[asyncio.Queue]] = {}
+        self._standings: dict[tuple[int, int], dict[str, StandingsDto]] = {}
+        self._locks: dict[tuple[int, int], asyncio.Lock] = {}
+        self._cursor: int | None = None
+        self._poller: asyncio.Task | None = None
+
+    def _latest_id(self) -> int:
+        with database.connection_context():
+            return self.event_service.latest_id()
+
+    def _fetch_events(self, after_id: int) -> list[EventDto]:
+        with database.connection_context():
+            return self.event_service.fetch_since(
+                after_id=after_id,
+                topics=[EventTopic.ScoreUpdated, EventTopic.GameFinal],
+                limit=500,
+            )
+
+    def _compute_standings(self, year: int, week: int) -> list[StandingsDto]:
+        with database.connection_context():
+            return asyncio.run(
+                self.standings_service.get_standings_for_week(year=year, week=week)
+            )
+
+    async def _standings_delta(self, year: int, week: int) -> list[StandingsDeltaDto]:
+        """
+        Recomputes a week's standings, returning only the entries that moved.
+        """
+        standings = await asyncio.to_thread(self._compute_standings, year, week)
+        previous = self._standings.get((year, week), {})
+        self._standings[(year, week)] = {s.username: s for s in standings}
+
+        deltas = []
+        for standing in standings:
+            before = previous.get(standing.username)
+            if before is not None and before == standing:
+                continue
+            deltas.append(
+                StandingsDeltaDto(
+                    username=standing.username,
+                    rank=standing.rank,
+                    previous_rank=before.rank if before else None,
+                    score=standing.score,
+                    previous_score=before.score if before else None,
+                    correct_picks=standing.correct_picks,
+                    total_picks=standing.total_picks,
+                )
+            )
+        return deltas
+
+    async def snapshot(self, year: int, week: int) -> LiveUpdateDto:
+        """
+        The current standings of a week, sent when a client connects.
+        """
+        # clients connecting together share one computation
+        async with self._locks.setdefault((year, week), asyncio.Lock()):
+            if (year, week) not in self._standings:
+                await self._standings_delta(year=year, week=week)
+        return LiveUpdateDto(
+            year=year,
+            week=week,
+            event_id=self._cursor or 0,
+            standings=[
+                StandingsDeltaDto(**standing.model_dump())
+                for standing in self._standings[(year, week)].values()
+            ],
+        )
+
+    def subscribe(self, year: int, week: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault((year, week), set()).add(queue)
+
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, year: int, week: int, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get((year, week), set())
+        subscribers.discard(queue)
+        if not subscribers:
+            # nobody is watching, cached standings would go stale
+            self._subscribers.pop((year, week), None)
+            self._standings.pop((year, week), None)
+            self._locks.pop((year, week), None)
+
+    async def _poll(self) -> None:
+        self.logger.info("starting live event poller")
+        # only events published from now on are streamed, subscribers start from a
+        # snapshot, so a restarted poller reseeds rather than resuming a stale cursor
+        self._cursor = await asyncio.to_thread(self._latest_id)
+        try:
+            while self._subscribers:
+                try:
+                    await self._poll_once()
+                except Exception as e:
+                    self.logger.exception(f"live event poll failed : {e}")
+                await asyncio.sleep(self.poll_seconds)
+        finally:
+            self._cursor = None
+        self.logger.info("stopping live event poller, no subscribers left")
+
+    async def _poll_once(self) -> None:
+        events = await asyncio.to_thread(self._fetch_events, self._cursor)
+        if not events:
+            return
+        self._cursor = events[-1].id
+
+        # keep the latest score per game, and the earliest week that went final
+        scores: dict[tuple[int, int], dict[int, ScoreEventPayload]] = {}
+        final_weeks: dict[int, int] = {}
+        for event in events:
+            payload = ScoreEventPayload.model_validate(event.payload)
+            scores.setdefault((payload.year, payload.week), {})[
+                payload.game_id
+            ] = payload
+            if event.topic == EventTopic.GameFinal:
+                final_weeks[payload.year] = min(
+                    payload.week, final_weeks.get(payload.year, payload.week)
+                )
+
+        for year, week in list(self._subscribers):
+            # standings are cumulative, a final changes every later week too
+            standings = []
+            if year in final_weeks and week >= final_weeks[year]:
+                standings = await self._standings_delta(year=year, week=week)
+
+            week_scores = list(scores.get((year, week), {}).values())
+            if week_scores or standings:
+                self._publish(
+                    key=(year, week),
+                    update=LiveUpdateDto(
+                        year=year,
+                        week=week,
+                        event_id=self._cursor,
+                        scores=week_scores,
+                        standings=standings,
+                    ),
+                )
+
+    def _publish(self, key: tuple[int, int], update: LiveUpdateDto) -> None:
+        for queue in self._subscribers.get(key, ()):
+            if queue.full():
+                # a slow client skips its oldest update rather than holding up the rest
+                queue.get_nowait()
+            queue.put_nowait(update)
+
+    @staticmethod
+    def _format(update: LiveUpdateDto, event: str) -> str:
+        return (
+            f"id: {update.event_id}\n"
+            f"event: {event}\n"
+            f"data: {update.model_dump_json(by_alias=True)}\n\n"
+        )
+
+    async def stream(
+        self, year: int, week: int, request: Request
+    ) -> AsyncIterator[str]:
+        """
+        Server-Sent Events stream of a week: a snapshot of the standings, then an
+        update whenever scores or standings change, with a heartbeat in between.
+        """
+        queue = self.subscribe(year=year, week=week)
+        try:
+            yield self._format(await self.snapshot(year=year, week=week), "snapshot")
+            while not await request.is_disconnected():
+                try:
+                    update = await asyncio.wait_for(
+                        queue.get(), timeout=self.heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield self._format(update, "update")
+        finally:
+            self.unsubscribe(year=year, week=week, queue=queue)
@@ -0,0 +1,10 @@
+from fastapi import HTTPException, status
+
+
+class MetricsTokenException(HTTPException):
+    def __init__(self, detail: str = "Invalid metrics token"):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=detail,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import PlainTextResponse
+
+from src.components.metrics.metrics_service import MetricsService
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_router.get("", response_class=PlainTextResponse)
+def get_metrics(
+    authorization: str | None = Header(default=None),
+    metrics_service: MetricsService = Depends(MetricsService.create),
+):
+    """
+    Route latencies and statuses, database pool and query timings, cache hit
+    ratios, and the latency and quota of the services we call, in the Prometheus
+    text format. Requires the metrics token as a bearer token when one is set.
+    """
+    metrics_service.authorize(authorization=authorization)
+    return PlainTextResponse(
+        metrics_service.exposition(),
+        media_type=CONTENT_TYPE,
+        headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,79 @@
+import hmac
+import threading
+import time
+
+from playhouse.pool import PooledDatabase
+
+from src.components.metrics.metrics_exceptions import MetricsTokenException
+from src.config.base_service import BaseService
+from src.models.new_db_models import database
+from src.util.injection import dependency, inject
+from src.util.metrics import DB_POOL_CONNECTIONS, registry
+
+
+@registry.collector
+def collect_pool() -> None:
+    if isinstance(database, PooledDatabase):
+        DB_POOL_CONNECTIONS.set(len(database._in_use), ("in_use",))
+        DB_POOL_CONNECTIONS.set(len(database._connections), ("idle",))
+        DB_POOL_CONNECTIONS.set(database._max_connections, ("max",))
+
+
+@dependency
+class MetricsService(BaseService):
+    """
+    Exposes the metrics of every worker on the host. With settings.metrics_dir
+    set, workers write their snapshot there at most every metrics_flush_seconds,
+    and a scrape merges the snapshots, so whichever worker answers it reports the
+    totals, those of exited workers included. Without it only the worker answering
+    is reported.
+    """
+
+    @inject
+    def __init__(self):
+        self.directory = self.settings.metrics_dir
+        self.flush_seconds = self.settings.metrics_flush_seconds
+        self._next_flush = 0
+        self._lock = threading.Lock()
+
+    def flush(self, force: bool = False) -> None:
+        """
+        Writes this worker's snapshot when it is due, called after every request.
+        """
+        if self.directory is None:
+            return
+        now = time.monotonic()
+        if not force and now < self._next_flush:
+            return
+        # a request finishing while another one writes skips its turn
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_flush = now + self.flush_seconds
+            registry.write_snapshot(self.directory)
+        except OSError as e:
+            self.logger.warning(f"failed to write metrics snapshot : {e}")
+        finally:
+            self._lock.release()
+
+    def authorize(self, authorization: str | None) -> None:
+        """
+        Checks the bearer token of a scrape when settings.metrics_token is set.
+        """
+        if self.settings.metrics_token is None:
+            return
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(
+            token.encode(), self.settings.metrics_token.encode()
+        ):
+            raise MetricsTokenException()
+
+    def exposition(self) -> str:
+        """
+        :return: The metrics in the Prometheus text format, merged across workers.
+        """
+        if self.directory is None:
+            return registry.render(registry.snapshot())
+
+        self.flush(force=True)
+        return registry.render(registry.merge(registry.read_snapshots(self.directory)))
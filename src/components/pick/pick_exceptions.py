@@ -38,3 +38,11 @@ class InvalidGameWeekException(HTTPException):
             status_code=400,
             detail=f"Game ID {game_id} does not belong to the expected year {expected_year} and week {expected_week}.",
         )
+
+
+class GameStartedException(HTTPException):
+    def __init__(self, game_id: int):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Game ID {game_id} has already started, its pick can no longer be changed.",
+        )
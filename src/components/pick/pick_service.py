@@ -1,4 +1,5 @@
 from src.components.pick.pick_models import (
+    PickRequest,
     PickStatus,
     SubmitPicksRequestDto,
     PickDto,
@@ -14,8 +15,9 @@ from src.models.new_db_models import (
     WeekModel,
     SeasonModel,
     GameResultModel,
+    TeamModel,
 )
-from peewee import DoesNotExist
+from peewee import JOIN
 from src.components.pick.pick_exceptions import (
     InvalidGameIDException,
     InvalidTeamIDException,
@@ -23,8 +25,14 @@ from src.components.pick.pick_exceptions import (
     InvalidWeekException,
     LockedPickException,
     InvalidGameWeekException,
+    GameStartedException,
 )
-from src.util.injection import dependency
+from src.services.kickoff_index import KickoffIndex
+from src.util.injection import dependency, inject
+
+_team = TeamModel.alias()
+_home_team = TeamModel.alias()
+_away_team = TeamModel.alias()
 
 
 @dependency
@@ -33,6 +41,15 @@ class PickService(BaseService):
     Service class for handling operations related to picks in the PickEm application.
     """
 
+    @inject
+    def __init__(self, kickoff_index: KickoffIndex):
+        """
+        Initializes the PickService.
+
+        :param kickoff_index: Tells which games have started.
+        """
+        self.kickoff_index = kickoff_index
+
     def validate_picks(self, picks_data: SubmitPicksRequestDto) -> None:
         """
         Validates the picks provided by the user, ensuring that all game IDs and team IDs are valid.
@@ -45,24 +62,23 @@ class PickService(BaseService):
 
         game_ids = [pick.game_id for pick in picks_data.picks]
 
-        # Fetch all relevant games
-        games = GameModel.select().where(GameModel.id << game_ids)
+        # Fetch all relevant games in one query
+        games = {
+            game.id: game
+            for game in GameModel.select(
+                GameModel.id, GameModel.home_team, GameModel.away_team
+            ).where(GameModel.id << game_ids)
+        }
         if len(games) != len(game_ids):
             raise InvalidGameIDException("One or more game IDs are invalid.")
 
         # Validate each pick
         for pick in picks_data.picks:
-            try:
-                game = GameModel.get_by_id(pick.game_id)
-                if (
-                    pick.team_id != game.home_team.id
-                    and pick.team_id != game.away_team.id
-                ):
-                    raise InvalidTeamIDException(
-                        f"Team ID {pick.team_id} is not valid for Game ID {pick.game_id}."
-                    )
-            except DoesNotExist:
-                raise InvalidGameIDException(f"Game ID {pick.game_id} does not exist.")
+            game = games[pick.game_id]
+            if pick.team_id not in (game.home_team_id, game.away_team_id):
+                raise InvalidTeamIDException(
+                    f"Team ID {pick.team_id} is not valid for Game ID {pick.game_id}."
+                )
 
     def create_or_update_picks(
         self, picks_data: SubmitPicksRequestDto, user: UserModel, status: PickStatus
@@ -105,6 +121,24 @@ class PickService(BaseService):
                         f"and user ID {user.id}"
                     )
 
+    @staticmethod
+    def _is_unchanged(pick: PickRequest, existing: PickModel | None) -> bool:
+        return existing is not None and (
+            existing.team_id,
+            existing.confidence,
+            float(existing.spread_value),
+        ) == (pick.team_id, pick.confidence, pick.spread_value)
+
+    @staticmethod
+    def _existing_picks_query(user_id: int, game_ids: list[int]):
+        return PickModel.select().where(
+            (PickModel.user_id == user_id) & (PickModel.game_id << game_ids)
+        )
+
+    @staticmethod
+    def _delete_picks_query(pick_ids: list[int]):
+        return PickModel.delete().where(PickModel.id << pick_ids)
+
     async def submit_picks(
         self, pick_data: SubmitPicksRequestDto, user: UserModel
     ) -> PickStatus:
@@ -117,6 +151,7 @@ class PickService(BaseService):
         :return: The status of the submitted picks.
         :raises LockedPickException: If a user attempts to remove a locked pick.
         :raises InvalidGameWeekException: If any pick's game does not belong to the specified year and week.
+        :raises GameStartedException: If a user attempts to change or remove the pick of a started game.
         """
         self.logger.info(
             f"attempting to submit picks {pick_data} for user {user.username}"
@@ -134,155 +169,187 @@ class PickService(BaseService):
         submitted_game_ids = [pick.game_id for pick in pick_data.picks]
 
         # Validate that all games are in the specified year and week
-        games = GameModel.select().where(GameModel.id << submitted_game_ids)
-        for game in games:
-            if (
-                game.season.year != pick_data.year
-                or game.week.week_number != pick_data.week
-            ):
+        kickoffs = self.kickoff_index.kickoffs(year=pick_data.year, week=pick_data.week)
+        for game_id in submitted_game_ids:
+            if game_id not in kickoffs:
                 raise InvalidGameWeekException(
-                    game_id=game.id,
+                    game_id=game_id,
                     expected_year=pick_data.year,
                     expected_week=pick_data.week,
                 )
 
-        # Fetch existing picks that are from the same week and year but not in the current submission
-        existing_picks = (
-            PickModel.select()
-            .join(GameModel, on=(PickModel.game == GameModel.id))
-            .join(WeekModel, on=(GameModel.week == WeekModel.id))
-            .join(SeasonModel, on=(GameModel.season == SeasonModel.id))
-            .where(
-                (PickModel.user_id == user.id)
-                & (WeekModel.week_number == pick_data.week)
-                & (SeasonModel.year == pick_data.year)
-                & ~(PickModel.game_id << submitted_game_ids)
+        # Fetch the user's existing picks for the same week and year
+        existing_picks = {
+            pick.game_id: pick
+            for pick in self._existing_picks_query(
+                user_id=user.id, game_ids=list(kickoffs)
             )
+        }
+        started = self.kickoff_index.started(
+            year=pick_data.year,
+            week=pick_data.week,
+            game_ids=list(kickoffs),
         )
 
-        # Check if any of the existing picks are locked
-        for pick in existing_picks:
+        # Picks of started games may be resubmitted, but not changed
+        for pick in pick_data.picks:
+            if pick.game_id in started and not self._is_unchanged(
+                pick=pick, existing=existing_picks.get(pick.game_id)
+            ):
+                raise GameStartedException(game_id=pick.game_id)
+
+        # Check if any of the picks left out are locked or have started
+        removed_picks = [
+            pick
+            for game_id, pick in existing_picks.items()
+            if game_id not in submitted_game_ids
+        ]
+        for pick in removed_picks:
             if pick.status == PickStatus.Locked:
                 raise LockedPickException(
                     f"Pick for game ID {pick.game_id} is locked and cannot be removed."
                 )
+            if pick.game_id in started:
+                raise GameStartedException(game_id=pick.game_id)
+
+        # Delete picks that are from the same week and year but not in the current submission
+        if removed_picks:
+            self._delete_picks_query(
+                pick_ids=[pick.id for pick in removed_picks]
+            ).execute()
+
+        # Create or update picks with the appropriate status, started ones keep theirs
+        self.create_or_update_picks(
+            picks_data=pick_data.model_copy(
+                update={
+                    "picks": [
+                        pick for pick in pick_data.picks if pick.game_id not in started
+                    ]
+                }
+            ),
+            user=user,
+            status=new_status,
+        )
 
-        # Delete picks that are from the same week and year but not in the current submission (only if they are not locked)
-        PickModel.delete().where(
-            (PickModel.user_id == user.id)
-            & (PickModel.game_id.not_in(submitted_game_ids))
-            & (
-                PickModel.game.in_(
-                    GameModel.select(GameModel.id)
-                    .join(WeekModel)
-                    .join(SeasonModel)
-                    .where(
-                        (WeekModel.week_number == pick_data.week)
-                        & (SeasonModel.year == pick_data.year)
-                    )
-                )
-            )
-        ).execute()
+        return new_status
 
-        # Create or update picks with the appropriate status
-        self.create_or_update_picks(picks_data=pick_data, user=user, status=new_status)
+    def _check_week_exists(self, year: int, week_number: int) -> None:
+        """
+        Tells a week without picks apart from a season or week that does not exist.
+        """
+        week = (
+            WeekModel.select(WeekModel.id)
+            .join(SeasonModel, on=(WeekModel.season == SeasonModel.id))
+            .where((SeasonModel.year == year) & (WeekModel.week_number == week_number))
+        )
+        if week.exists():
+            return
 
-        return new_status
+        if not SeasonModel.select().where(SeasonModel.year == year).exists():
+            self.logger.error(f"Season with year {year} does not exist.")
+            raise InvalidSeasonException(f"Season with year {year} does not exist.")
+        self.logger.error(f"Week {week_number} does not exist for year {year}.")
+        raise InvalidWeekException(
+            f"Week {week_number} does not exist for year {year}."
+        )
+
+    @staticmethod
+    def _team_dto(row: dict, prefix: str) -> TeamDto:
+        return TeamDto(
+            team_id=row[f"{prefix}_id"],
+            team_name=row[f"{prefix}_name"],
+            team_city=row[f"{prefix}_city"],
+            thumbnail=row[f"{prefix}_thumbnail"],
+            abbreviation=row[f"{prefix}_abbreviation"],
+        )
 
     def get_user_picks_for_week(
         self, user: UserModel, year: int, week_number: int
     ) -> UserPicksDto:
-        # Fetch the season based on the year
-        try:
-            season = SeasonModel.get(SeasonModel.year == year)
-        except DoesNotExist:
-            self.logger.error(f"Season with year {year} does not exist.")
-            raise InvalidSeasonException(f"Season with year {year} does not exist.")
-
-        # Fetch the week based on the season and week number
-        try:
-            week = WeekModel.get(
-                (WeekModel.season == season) & (WeekModel.week_number == week_number)
+        # Fetch the user's picks with their game, teams and result in one query
+        picks = (
+            PickModel.select(
+                PickModel.id,
+                PickModel.spread_value,
+                PickModel.confidence,
+                PickModel.status,
+                GameModel.id.alias("game_id"),
+                GameModel.start_date,
+                GameModel.start_time,
+                _team.id.alias("team_id"),
+                _team.name.alias("team_name"),
+                _team.city.alias("team_city"),
+                _team.thumbnail.alias("team_thumbnail"),
+                _team.abbreviation.alias("team_abbreviation"),
+                _home_team.id.alias("home_team_id"),
+                _home_team.name.alias("home_team_name"),
+                _home_team.city.alias("home_team_city"),
+                _home_team.thumbnail.alias("home_team_thumbnail"),
+                _home_team.abbreviation.alias("home_team_abbreviation"),
+                _away_team.id.alias("away_team_id"),
+                _away_team.name.alias("away_team_name"),
+                _away_team.city.alias("away_team_city"),
+                _away_team.thumbnail.alias("away_team_thumbnail"),
+                _away_team.abbreviation.alias("away_team_abbreviation"),
+                GameResultModel.home_score,
+                GameResultModel.away_score,
+            )
+            .join(GameModel, on=(PickModel.game == GameModel.id))
+            .join(WeekModel, on=(GameModel.week == WeekModel.id))
+            .join(SeasonModel, on=(GameModel.season == SeasonModel.id))
+            .join(_team, on=(PickModel.team == _team.id))
+            .join(_home_team, on=(GameModel.home_team == _home_team.id))
+            .join(_away_team, on=(GameModel.away_team == _away_team.id))
+            .join(
+                GameResultModel,
+                JOIN.LEFT_OUTER,
+                on=(GameResultModel.game == GameModel.id),
             )
-        except DoesNotExist:
-            self.logger.error(f"Week {week_number} does not exist for year {year}.")
-            raise InvalidWeekException(
-                f"Week {week_number} does not exist for year {year}."
+            .where(
+                (PickModel.user == user.id)
+                & (SeasonModel.year == year)
+                & (WeekModel.week_number == week_number)
             )
-
-        # Fetch all games for that season and week
-        games = GameModel.select().where(
-            (GameModel.season == season) & (GameModel.week == week)
+            .order_by(PickModel.id)
+            .dicts()
         )
 
-        # Fetch the user's picks for those games
-        picks = PickModel.select().where(
-            (PickModel.user == user.id) & (PickModel.game << games)
-        )
-
-        filtered_games = [pick.game for pick in picks]
-        results = GameResultModel.select().where(
-            (GameResultModel.game << filtered_games)
-        )
-        results_lookup = {result["game"]: result for result in results.dicts()}
+        # Without picks, make sure the season and week exist
+        if not picks:
+            self._check_week_exists(year=year, week_number=week_number)
 
         pick_dto_list = []
         for pick in picks:
-            game = pick.game
-            game_results = results_lookup.get(game.id, {})
+            home_team_name = pick["home_team_name"]
+            away_team_name = pick["away_team_name"]
+            line = f"{pick['spread_value']:.1f}".rstrip("0").rstrip(".")
 
             # Manually map fields to MatchupDto
             matchup_dto = MatchupDto(
-                game_id=game.id,
-                home_team=TeamDto(
-                    team_id=game.home_team.id,
-                    team_city=game.home_team.city,
-                    team_name=game.home_team.name,
-                    thumbnail=game.home_team.thumbnail,
-                    abbreviation=game.home_team.abbreviation,
-                ),
-                away_team=TeamDto(
-                    team_id=game.away_team.id,
-                    team_city=game.away_team.city,
-                    team_name=game.away_team.name,
-                    thumbnail=game.away_team.thumbnail,
-                    abbreviation=game.away_team.abbreviation,
-                ),
-                start_time=game.start_time,
-                start_date=game.start_date,
-                # Add other necessary fields here based on your MatchupDto structure
-                lines={
-                    game.home_team.name: f"{pick.spread_value:.1f}".rstrip("0").rstrip(
-                        "."
-                    ),
-                    game.away_team.name: f"{pick.spread_value:.1f}".rstrip("0").rstrip(
-                        "."
-                    ),
-                },
+                game_id=pick["game_id"],
+                home_team=self._team_dto(pick, prefix="home_team"),
+                away_team=self._team_dto(pick, prefix="away_team"),
+                start_time=pick["start_time"],
+                start_date=pick["start_date"],
+                lines={home_team_name: line, away_team_name: line},
                 results=(
                     {
-                        game.home_team.name: game_results.get("home_score"),
-                        game.away_team.name: game_results.get("away_score"),
+                        home_team_name: pick["home_score"],
+                        away_team_name: pick["away_score"],
                     }
-                    if game_results
+                    if pick["home_score"] is not None
                     else None
                 ),
             )
 
             # Construct the PickDto
             pick_dto = PickDto(
-                id=pick.id,
+                id=pick["id"],
                 game=matchup_dto,
-                team=TeamDto(
-                    team_id=pick.team.id,
-                    team_name=pick.team.name,
-                    team_city=pick.team.city,
-                    thumbnail=pick.team.thumbnail,
-                    abbreviation=pick.team.abbreviation,
-                ),
-                spread_value=float(pick.spread_value),
-                confidence=pick.confidence,
-                status=pick.status,
+                team=self._team_dto(pick, prefix="team"),
+                spread_value=float(pick["spread_value"]),
+                confidence=pick["confidence"],
+                status=pick["status"],
             )
 
             pick_dto_list.append(pick_dto)
@@ -1,6 +1,7 @@
-from datetime import time, date
+import base64
+from datetime import datetime, time, date
 
-from pydantic import Field, field_validator, ValidationError
+from pydantic import BaseModel, Field, field_validator, ValidationError
 from typing import List, Literal
 
 from src.models.base_models import BaseDto
@@ -71,6 +72,23 @@ class MatchupDto(BaseDto):
         return val
 
 
+class MatchupCursor(BaseModel):
+    """
+    Position after the last matchup of a page, games are listed by kickoff then id.
+    Serialized as an opaque url safe token.
+    """
+
+    kickoff: datetime | None
+    game_id: int
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, token: str) -> "MatchupCursor":
+        return cls.model_validate_json(base64.urlsafe_b64decode(token.encode()))
+
+
 class PickDto(BaseDto):
     id: int
     team: TeamDto = Field(alias="team")
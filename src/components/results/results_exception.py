@@ -6,3 +6,8 @@ class ResultsNotFoundException(HTTPException):
         super().__init__(
             status_code=404, detail="Results not found for the specified week and year"
         )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=400, detail="Invalid or expired page cursor")
@@ -7,12 +7,14 @@ from src.components.results.results_dto import (
     UserPickResultsDto,
     LeaguePickResultsDto,
     GameResultDto,
+    MatchupCursor,
     MatchupDto,
-    WeekResultsDto,
 )
+from src.components.results.results_exception import InvalidCursorException
 from src.components.results.results_service import ResultsService
 from src.config.logger import Logger
 from src.services.spread_service import SpreadService
+from src.util.dto_response import DtoResponse
 
 results_router = APIRouter(
     prefix="/results",
@@ -34,7 +36,7 @@ async def get_user_pick_results(
     return UserPickResultsDto(username=token.sub, picks=[], total_score=0, rank=None)
 
 
-@results_router.get("/{year}/{week}/history", response_model=list[WeekResultsDto])
+@results_router.get("/{year}/{week}/history", response_model=list[UserPickResultsDto])
 async def get_user_pick_history(
     year: int,
     week: int,
@@ -42,7 +44,7 @@ async def get_user_pick_history(
     logger: Logger = Depends(Logger),
 ):
     logger.info(f"Getting user pick results for year {year} and week {week}")
-    return await results_service.get_pick_history_for_year(year, week)
+    return DtoResponse(await results_service.get_pick_history_for_year(year, week))
 
 
 @results_router.get(
@@ -57,7 +59,7 @@ async def get_league_pick_results(
 ):
     logger.info(f"Getting league pick results for year {year} and week {week}")
     user_results = await results_service.get_user_pick_results(year, week)
-    return await results_service.get_league_results(user_results)
+    return DtoResponse(await results_service.get_league_results(user_results))
 
 
 @results_router.get("/{year}/{week}/nfl-games", response_model=list[MatchupDto])
@@ -68,13 +70,28 @@ async def get_nfl_game_results(
     page_size: int = Query(
         default=10, ge=1, le=100, description="Number of results per page"
     ),
+    cursor: str | None = Query(
+        default=None,
+        description="X-Next-Cursor header of the previous page, takes precedence over page",
+    ),
     spread_service: SpreadService = Depends(SpreadService.create),
     logger: Logger = Depends(Logger),
 ):
     logger.info(
         f"Getting NFL game results for year {year} and week {week}, page {page}, page_size {page_size}"
     )
-    x = await spread_service.get_matchup_data(
-        year=year, week=week, bookmaker="DraftKings"
+    try:
+        after = MatchupCursor.decode(cursor) if cursor else None
+    except ValueError:
+        raise InvalidCursorException()
+
+    matchups, next_cursor = await spread_service.get_matchup_page(
+        year=year,
+        week=week,
+        bookmaker=spread_service.settings.closing_line_bookmaker,
+        page_size=page_size,
+        cursor=after,
+        page=page,
     )
-    return x
+    headers = {"X-Next-Cursor": next_cursor.encode()} if next_cursor else None
+    return DtoResponse(matchups, headers=headers)
@@ -8,7 +8,6 @@ from src.components.results.results_dto import (
     GameDto,
     PickDto,
     LeaguePickResultsDto,
-    MatchupDto,  # New DTO to encapsulate results by week
 )
 from src.config.base_service import BaseService
 from src.models.new_db_models import (
@@ -39,16 +38,11 @@ class ResultsService(BaseService):
     def __init__(self):
         super().__init__()
 
-    async def _get_pick_results(
-        self, year: int, week_condition, user: str = None
-    ) -> list[UserPickResultsDto]:
+    @staticmethod
+    def _pick_results_query(year: int, week_condition, user: str = None):
         """
-        get list of all picks filtered by user and week
-
-        :param year:
-        :param week_condition:
-        :param user:
-        :return:
+        Every pick of a concluded game in the year's weeks matching week_condition,
+        with the picked team, both teams and the score.
         """
         query = (
             _pick.select(
@@ -97,7 +91,20 @@ class ResultsService(BaseService):
 
         if user:
             query = query.where(_user.username == user)
+        return query
 
+    async def _get_pick_results(
+        self, year: int, week_condition, user: str = None
+    ) -> list[UserPickResultsDto]:
+        """
+        get list of all picks filtered by user and week
+
+        :param year:
+        :param week_condition:
+        :param user:
+        :return:
+        """
+        query = self._pick_results_query(year, week_condition, user)
         self.logger.info(f"Query generated: {query.sql()}")
         picks = query.dicts()
         self.logger.info(f"Number of picks returned: {len(list(picks))}")
@@ -208,86 +215,3 @@ class ResultsService(BaseService):
         self, user_results: list[UserPickResultsDto]
     ) -> list[UserPickResultsDto]:
         return user_results
-
-    async def get_nfl_game_results(
-        self, year: int, week: int, page: int, page_size: int
-    ) -> list[MatchupDto]:
-        query = (
-            _game_result.select(
-                _game.id.alias("game_id"),
-                _game.start_time.alias("start_time"),
-                _home_team.id.alias("home_team_id"),
-                _home_team.name.alias("home_team_name"),
-                _home_team.city.alias("home_team_city"),
-                _home_team.thumbnail.alias("home_team_thumbnail"),
-                _away_team.id.alias("away_team_id"),
-                _away_team.name.alias("away_team_name"),
-                _away_team.city.alias("away_team_city"),
-                _away_team.thumbnail.alias("away_team_thumbnail"),
-                _game_result.home_score.alias("home_team_score"),
-                _game_result.away_score.alias("away_team_score"),
-                _pick.spread_value.alias("spread_value"),
-                # Assuming records, ats, and other data are available in the appropriate tables
-                # Additional fields for records, ATS, etc. would be joined or selected here
-            )
-            .join(_game, on=(_game_result.game == _game.id))
-            .join(_home_team, on=(_game.home_team == _home_team.id))
-            .join(_away_team, on=(_game.away_team == _away_team.id))
-            .join(_season, on=(_game.season == _season.id))
-            .join(_week_model, on=(_game.week == _week_model.id))
-            .join(_pick, on=(_pick.game == _game.id))
-            .where(_season.year == year, _week_model.week_number == week)
-            .paginate(page, page_size)
-        )
-
-        game_results = query.dicts()
-
-        results = []
-        for game in game_results:
-            lines = {
-                game["home_team_name"]: f"{game['spread_value']:.1f}",
-                game["away_team_name"]: f"{-game['spread_value']:.1f}",
-            }
-
-            # Placeholder values for ATS, record, and other fields
-            ats = {
-                game["home_team_name"]: "ATS Home Value",
-                game["away_team_name"]: "ATS Away Value",
-            }
-            record = {
-                game["home_team_name"]: "W-L",
-                game["away_team_name"]: "W-L",
-            }
-            results_dict = {
-                game["home_team_name"]: str(game["home_team_score"]),
-                game["away_team_name"]: str(game["away_team_score"]),
-            }
-            home_record = {"home": "Home W-L"}
-            away_record = {"away": "Away W-L"}
-
-            matchup_data = MatchupDto(
-                game_id=game["game_id"],
-                start_time=game["start_time"],
-                away_team=TeamDto(
-                    team_id=game["away_team_id"],
-                    team_name=game["away_team_name"],
-                    team_city=game["away_team_city"],
-                    thumbnail=game["away_team_thumbnail"],
-                ),
-                home_team=TeamDto(
-                    team_id=game["home_team_id"],
-                    team_name=game["home_team_name"],
-                    team_city=game["home_team_city"],
-                    thumbnail=game["home_team_thumbnail"],
-                ),
-                lines=lines,
-                ats=ats,
-                record=record,
-                results=results_dict,
-                home_record=home_record,
-                away_record=away_record,
-            )
-
-            results.append(matchup_data)
-
-        return results
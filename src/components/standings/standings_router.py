@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Path
 from src.components.standings.standings_dtos import StandingsHistoryDto, StandingsDto
 from src.components.standings.standings_service import StandingsService
+from src.util.dto_response import DtoResponse
 
 
 standings_router = APIRouter(prefix="/standings", tags=["Standings"])
@@ -13,7 +14,7 @@ async def get_standings_history(
     week: int,
     # standings_service: StandingsService = Depends(StandingsService.create),
 ):
-    return await standings_service.get_standings_history(year, week)
+    return DtoResponse(await standings_service.get_standings_history(year, week))
 
 
 @standings_router.get(
@@ -1,26 +1,82 @@
-from peewee import PostgresqlDatabase
+import sqlite3
+from functools import cache
+
+from peewee import Database, PostgresqlDatabase, SqliteDatabase
 from playhouse.pool import PooledPostgresqlDatabase
 from src.config.logger import Logger
-from src.config.settings import Settings
+from src.config.settings import DatabaseBackend, Settings
 from src.services.secret_service import SecretService
+from src.util.dependency_cache import DependencyCache
+from src.util.metrics import DB_QUERY_ERRORS, DB_QUERY_SECONDS, statement
 
 logger = Logger()
 
 
-def get_database() -> PostgresqlDatabase:
+class SharedMemorySqliteDatabase(SqliteDatabase):
+    """
+    An in-memory SQLite database shared by every connection of the process. SQLite
+    drops a memory database with its last connection, and we close ours after each
+    request, so one more is held open for the lifetime of the process.
+    """
+
+    def __init__(self, name: str, **kwargs):
+        uri = f"file:{name}?mode=memory&cache=shared"
+        super().__init__(uri, uri=True, check_same_thread=False, **kwargs)
+        self._keep_alive = sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+class QueryMetricsMixin:
+    """
+    Times every query into the database metrics, up to the cursor being returned.
+    """
+
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        with DB_QUERY_SECONDS.time((statement(sql),), errors=DB_QUERY_ERRORS):
+            return super().execute_sql(sql, params, *args, **kwargs)
+
+
+@cache
+def instrumented(database_class: type[Database]) -> type[Database]:
+    return type(database_class.__name__, (QueryMetricsMixin, database_class), {})
+
+
+def get_database() -> Database:
+    """
+    Builds the database selected by settings.db_backend: the Neon connection pool
+    we deploy with, a plain connection to a local Postgres, or SQLite in memory or
+    in settings.sqlite_path for offline runs. Every backend times its queries.
+    """
     settings = Settings()
-    secret_service = SecretService()
+    backend = settings.db_backend
+    logger.info(f"db backend = {backend}, db name = {settings.db_name}")
 
-    logger.info(f"db name = {settings.db_name}")
-    secret = secret_service.get_secret("dev/db")
+    if backend == DatabaseBackend.SqliteMemory:
+        return instrumented(SharedMemorySqliteDatabase)(
+            settings.db_name, pragmas={"foreign_keys": 1}
+        )
+    if backend == DatabaseBackend.SqliteFile:
+        return instrumented(SqliteDatabase)(
+            settings.sqlite_path,
+            check_same_thread=False,
+            pragmas={"foreign_keys": 1, "journal_mode": "wal"},
+        )
 
-    return PooledPostgresqlDatabase(
-        settings.db_name,
-        thread_safe=True,
+    secret_service = DependencyCache.get(SecretService)
+    secret = secret_service.get_secret("dev/db")
+    connect_params = dict(
         host=settings.db_host,
+        port=settings.db_port,
         user=secret.get("username"),
         password=secret.get("password"),
-        max_connections=20,
+        sslmode=settings.db_sslmode,
+    )
+    if backend == DatabaseBackend.Postgres:
+        return instrumented(PostgresqlDatabase)(settings.db_name, **connect_params)
+
+    return instrumented(PooledPostgresqlDatabase)(
+        settings.db_name,
+        thread_safe=True,
+        max_connections=settings.db_max_connections,
         stale_timeout=900,
-        sslmode="require",
+        **connect_params,
     )
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from strenum import StrEnum
 
 from src.util.injection import dependency
 
@@ -20,6 +21,18 @@ def get_properties_file_path(config_type: str) -> tuple[str, str]:
     )
 
 
+class DatabaseBackend(StrEnum):
+    PostgresPool = "postgres-pool"
+    Postgres = "postgres"
+    SqliteMemory = "sqlite-memory"
+    SqliteFile = "sqlite-file"
+
+
+class SecretBackend(StrEnum):
+    Aws = "aws"
+    Local = "local"
+
+
 @dependency
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -27,8 +40,45 @@ class Settings(BaseSettings):
     )
 
     secret_path: str
+    secret_backend: SecretBackend = SecretBackend.Aws
+    local_secrets_file: str = get_resources_path() + "/secrets.local.json"
+    db_backend: DatabaseBackend = DatabaseBackend.PostgresPool
     db_host: str
     db_name: str
+    db_port: int = 5432
+    db_sslmode: str = "require"
+    db_max_connections: int = 20
+    sqlite_path: str = "/tmp/pickem.sqlite"
+    odds_api_bookmakers: str = "draftkings,fanduel"
+    closing_line_bookmaker: str = "DraftKings"
+    scraper_concurrency: int = 6
+    scraper_requests_per_second: float = 4
+    scraper_cache_dir: str = "/tmp/pickem-scraper-cache"
+    scraper_cache_max_age_hours: float = 24 * 7
+    scraper_cache_max_mb: float = 50
+    browser_pool_size: int = 4
+    browser_max_pages_per_browser: int = 50
+    http_timeout_seconds: float = 60
+    http_requests_per_second: float = 4
+    http_burst: int = 1
+    http_max_in_flight: int = 6
+    http_max_retries: int = 3
+    http_backoff_seconds: float = 0.5
+    http_max_backoff_seconds: float = 30
+    http_queue_workers: int = 8
+    live_poll_seconds: float = 5
+    live_heartbeat_seconds: float = 15
+    live_queue_size: int = 16
+    gzip_minimum_size: int = 1024
+    gzip_compress_level: int = 6
+    cache_final_max_age_seconds: int = 24 * 60 * 60
+    cache_open_max_age_seconds: int = 30
+    kickoff_index_ttl_seconds: int = 5 * 60
+    profile_sample_interval_seconds: float = 0.005
+    # shared by the workers of a host, each one writes its metrics there
+    metrics_dir: str | None = None
+    metrics_flush_seconds: float = 1
+    metrics_token: str | None = None
     # db_user: str = os.getenv("user", "_")
     # db_pass: str = os.getenv("password", "_")
     # odds_api_key: str = os.getenv("odds_api_key", "_")
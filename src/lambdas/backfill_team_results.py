@@ -0,0 +1,30 @@
+from src.components.season.season_service import SeasonService
+from src.config.logger import Logger
+from src.lambdas.utils import connect_db
+from src.services.team_result_service import TeamResultService
+
+logger = Logger()
+
+
+@connect_db
+def handle_event(event, context):
+    logger.info(f"initializing with event={event} and context={context}")
+
+    team_result_service = TeamResultService()
+    season_service = SeasonService()
+
+    try:
+        # defaults to the current season, pass {"years": [...]} to backfill others
+        years = (event or {}).get("years") or [
+            season_service.get_current_year().get("year")
+        ]
+        rows = {year: team_result_service.backfill_season(year=year) for year in years}
+        logger.info(f"backfilled team results: {rows}")
+        return {"rows": rows}
+    except Exception as e:
+        logger.exception(f"failed to backfill team results: {e}")
+        raise e
+
+
+if __name__ == "__main__":
+    handle_event({}, {})
@@ -18,8 +18,20 @@ def handle_event(event, context):
     try:
         year = season_service.get_current_year()
         logger.info(f"loading games and results for year {year}")
-        scraper.scrape_season(year=year.get("year"))
-        logger.info(f"successfully scraped {year} season data")
+        # completed weeks never change, only a forced refresh re-scrapes them
+        full_refresh = bool((event or {}).get("full_refresh", False))
+        report = scraper.scrape_season(
+            year=year.get("year"), concurrent=True, incremental=not full_refresh
+        )
+        logger.info(f"successfully scraped {year} season data, {report}")
+        # unchanged pages were still requested, they are only left out of the save
+        return {
+            "weeks": report.weeks_saved,
+            "weeks_requested": report.weeks_requested,
+            "requests": report.requests,
+            "saved": len(report.weeks_saved),
+            "full_refresh": full_refresh,
+        }
     except Exception as e:
         logger.exception(f"failed to load season: {e}")
         raise e
@@ -0,0 +1,24 @@
+from src.config.logger import Logger
+from src.lambdas.utils import connect_db
+from src.services.score_ingestion_service import ScoreIngestionService
+
+logger = Logger()
+
+
+@connect_db
+def handle_event(event, context):
+    logger.info(f"initializing with event={event} and context={context}")
+
+    score_ingestion_service = ScoreIngestionService()
+
+    try:
+        report = score_ingestion_service.ingest_scores()
+        logger.info(f"loaded live scores: {report}")
+        return report.model_dump()
+    except Exception as e:
+        logger.exception(f"failed to load live scores: {e}")
+        raise e
+
+
+if __name__ == "__main__":
+    handle_event({}, {})
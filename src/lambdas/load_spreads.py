@@ -18,9 +18,14 @@ def handle_event(event, context):
         week = season_service.get_current_week_and_year()
         season = SeasonModel.get(year=week.get("year"))
         week_model = WeekModel.get(week_number=week.get("week"), season=season)
-        spread_service.load_spreads(
+        report = spread_service.load_spreads(
             start_date=week_model.start_date, end_date=week_model.end_date
         )
+        logger.info(f"loaded spreads: {report}")
+        return {
+            **report.model_dump(),
+            "quota_per_change": report.quota_per_change,
+        }
     except Exception as e:
         logger.exception(f"failed to load spreads: {e}")
         raise e
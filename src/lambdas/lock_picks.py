@@ -0,0 +1,24 @@
+from src.config.logger import Logger
+from src.lambdas.utils import connect_db
+from src.services.pick_lock_service import PickLockService
+
+logger = Logger()
+
+
+@connect_db
+def handle_event(event, context):
+    logger.info(f"initializing with event={event} and context={context}")
+
+    pick_lock_service = PickLockService()
+
+    try:
+        report = pick_lock_service.lock_started_picks()
+        logger.info(f"locked started picks: {report}")
+        return report.model_dump()
+    except Exception as e:
+        logger.exception(f"failed to lock started picks: {e}")
+        raise e
+
+
+if __name__ == "__main__":
+    handle_event({}, {})
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from strenum import StrEnum
+
+from src.models.base_models import BaseDto
+
+
+class EventTopic(StrEnum):
+    GameFinal = "game-final"
+    ScoreUpdated = "score-updated"
+
+
+class EventDto(BaseDto):
+    id: int
+    topic: EventTopic
+    payload: dict
+    created_at: datetime
+
+
+class ScoreEventPayload(BaseDto):
+    game_id: int
+    year: int
+    week: int
+    home_team_id: int
+    away_team_id: int
+    home_score: int
+    away_score: int
+    completed: bool
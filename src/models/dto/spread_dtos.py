@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import Field
+
+from src.models.base_models import BaseDto
+
+
+class LineHistoryDto(BaseDto):
+    """
+    Line movement for one game, stored column-wise so the i-th entry of each
+    list belongs to the i-th snapshot.
+    """
+
+    game_id: int
+    home_team_id: int
+    away_team_id: int
+    timestamps: list[datetime] = Field(default_factory=list)
+    home: list[float | None] = Field(default_factory=list)
+    away: list[float | None] = Field(default_factory=list)
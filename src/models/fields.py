@@ -0,0 +1,22 @@
+import json
+
+from peewee import Field, SqliteDatabase
+
+
+class JSONField(Field):
+    """
+    A json column that works on every database backend. Postgres stores it as json
+    and psycopg2 decodes it for us, SQLite stores the text, which we decode here.
+    """
+
+    field_type = "JSON"
+
+    def db_value(self, value):
+        return None if value is None else json.dumps(value)
+
+    def python_value(self, value):
+        if isinstance(value, str) and isinstance(
+            self.model._meta.database, SqliteDatabase
+        ):
+            return json.loads(value)
+        return value
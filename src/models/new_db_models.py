@@ -12,10 +12,11 @@ from peewee import (
     TimeField,
     Check,
 )
-from playhouse.postgres_ext import JSONField
 from playhouse.shortcuts import model_to_dict
 
 from src.config.db_connection import get_database
+from src.config.settings import DatabaseBackend, Settings
+from src.models.fields import JSONField
 
 database = get_database()
 
@@ -55,13 +56,13 @@ class BaseModel(Model):
         return self._update_instance().where(self._pk_expr()).execute()
 
     @classmethod
-    def update(cls, **update_data):
+    def update(cls, __data=None, **update_data):
         """Overrides the default update method."""
         if "updated_at" not in update_data:
             update_data["updated_at"] = datetime.now()
         if "updated_by" not in update_data:
             update_data["updated_by"] = cls.system_user
-        return super().update(**update_data)
+        return super().update(__data, **update_data)
 
 
 class UserModel(BaseModel):
@@ -144,6 +145,8 @@ class GameModel(BaseModel):
     away_team = ForeignKeyField(TeamModel, backref="away_games", on_delete="CASCADE")
     start_date = DateField()  # New field for the start date of the game
     start_time = TimeField()  # New field for the start time of the game
+    kickoff = DateTimeField(null=True, index=True)  # start date and time in UTC
+    oddsapi_id = CharField(null=True, unique=True)  # Odds API event id
 
     class Meta:
         table_name = "game"
@@ -167,6 +170,24 @@ class SpreadModel(BaseModel):
         )
 
 
+class SpreadHistoryModel(BaseModel):
+    game = ForeignKeyField(GameModel, backref="spread_history", on_delete="CASCADE")
+    week = ForeignKeyField(WeekModel, backref="spread_history", on_delete="CASCADE")
+    team = ForeignKeyField(TeamModel, backref="spread_history", on_delete="CASCADE")
+    bookmaker = CharField()
+    spread_value = DecimalField(max_digits=5, decimal_places=2)
+    recorded_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = "spread_history"
+        indexes = (
+            (
+                ("week", "bookmaker", "game", "recorded_at"),
+                False,
+            ),  # Serves a week's movement for one bookmaker in a single range scan
+        )
+
+
 class GameResultModel(BaseModel):
     game = ForeignKeyField(
         GameModel, backref="result", on_delete="CASCADE", unique=True
@@ -222,6 +243,14 @@ class PickModel(BaseModel):
         )
 
 
+class EventModel(BaseModel):
+    topic = CharField(index=True)
+    payload = JSONField()
+
+    class Meta:
+        table_name = "event"
+
+
 class ActionModel(BaseModel):
     name = CharField()
     type = CharField()
@@ -229,3 +258,8 @@ class ActionModel(BaseModel):
 
     class Meta:
         table_name = "action"
+
+
+# a memory database starts out empty in every process
+if Settings().db_backend == DatabaseBackend.SqliteMemory:
+    database.create_tables(BaseModel.__subclasses__())
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from src.config.base_service import BaseService
+from src.models.dto.event_dtos import EventDto, EventTopic
+from src.models.new_db_models import EventModel
+from src.util.injection import dependency, inject
+
+
+@dependency
+class EventService(BaseService):
+    """
+    Append-only event log in the event table. Consumers keep the id of the last
+    event they handled and read forward from it, so no delivery state is stored.
+    """
+
+    @inject
+    def __init__(self):
+        """
+        Initializes the EventService.
+        """
+        pass
+
+    def publish_many(self, events: list[tuple[EventTopic, dict]]) -> int:
+        """
+        Appends events in one statement.
+
+        :param events: (topic, payload) pairs, payloads must be JSON serializable.
+        :return: The number of events published.
+        """
+        if not events:
+            return 0
+        EventModel.insert_many(
+            [
+                {EventModel.topic: topic, EventModel.payload: payload}
+                for topic, payload in events
+            ]
+        ).execute()
+        self.logger.info(f"published {len(events)} events")
+        return len(events)
+
+    def publish(self, topic: EventTopic, payload: dict) -> int:
+        return self.publish_many(events=[(topic, payload)])
+
+    def fetch_since(
+        self,
+        after_id: int = 0,
+        topics: list[EventTopic] | None = None,
+        limit: int = 100,
+    ) -> list[EventDto]:
+        """
+        Reads events published after a cursor, oldest first.
+
+        :param after_id: The id of the last event already handled.
+        :param topics: Only return these topics, defaults to all.
+        :param limit: The maximum number of events returned.
+        :return: List of EventDto.
+        """
+        query = EventModel.select().where(EventModel.id > after_id)
+        if topics:
+            query = query.where(EventModel.topic << [str(topic) for topic in topics])
+        return [
+            EventDto.model_validate(event)
+            for event in query.order_by(EventModel.id).limit(limit)
+        ]
+
+    def fetch_recent(self, topics: list[EventTopic], since: datetime) -> list[EventDto]:
+        """
+        Reads the events of the given topics published since a point in time.
+        """
+        query = (
+            EventModel.select()
+            .where(
+                (EventModel.topic << [str(t) for t in topics])
+                & (EventModel.created_at >= since)
+            )
+            .order_by(EventModel.id)
+        )
+        return [EventDto.model_validate(event) for event in query]
+
+    def latest_id(self) -> int:
+        latest = EventModel.select(EventModel.id).order_by(EventModel.id.desc()).first()
+        return latest.id if latest else 0
@@ -0,0 +1,74 @@
+import time
+from datetime import datetime
+
+from src.config.base_service import BaseService
+from src.models.new_db_models import GameModel, SeasonModel, WeekModel
+from src.util.injection import dependency, inject
+from src.util.kickoff import game_kickoff, utc_now
+from src.util.metrics import CACHE_LOOKUPS
+
+
+@dependency
+class KickoffIndex(BaseService):
+    """
+    In memory kickoff times of a week's games, so pick submissions can tell which
+    games have started without querying per pick. Weeks are reloaded after
+    ttl_seconds, kickoffs only move when the schedule is rescraped.
+    """
+
+    @inject
+    def __init__(self):
+        """
+        Initializes the KickoffIndex.
+        """
+        self.ttl_seconds = self.settings.kickoff_index_ttl_seconds
+        self._weeks: dict[tuple[int, int], tuple[float, dict[int, datetime | None]]] = (
+            {}
+        )
+
+    @staticmethod
+    def _load(year: int, week: int) -> dict[int, datetime | None]:
+        games = (
+            GameModel.select(
+                GameModel.id,
+                GameModel.kickoff,
+                GameModel.start_date,
+                GameModel.start_time,
+            )
+            .join(WeekModel, on=(GameModel.week == WeekModel.id))
+            .join(SeasonModel, on=(GameModel.season == SeasonModel.id))
+            .where((SeasonModel.year == year) & (WeekModel.week_number == week))
+        )
+        return {game.id: game_kickoff(game) for game in games}
+
+    def kickoffs(self, year: int, week: int) -> dict[int, datetime | None]:
+        """
+        :param year: The season year.
+        :param week: The week number.
+        :return: Kickoff in UTC keyed by game id, for every game of the week.
+        """
+        key = (year, week)
+        expires, kickoffs = self._weeks.get(key, (0, {}))
+        if expires <= time.monotonic():
+            CACHE_LOOKUPS.inc(("kickoff_index", "miss"))
+            kickoffs = self._load(year=year, week=week)
+            self._weeks[key] = (time.monotonic() + self.ttl_seconds, kickoffs)
+        else:
+            CACHE_LOOKUPS.inc(("kickoff_index", "hit"))
+        return kickoffs
+
+    def started(
+        self, year: int, week: int, game_ids: list[int], now: datetime | None = None
+    ) -> set[int]:
+        """
+        :param game_ids: The games to check.
+        :param now: The current time as naive UTC, defaults to now.
+        :return: The ids of the given games that have kicked off.
+        """
+        now = now or utc_now()
+        kickoffs = self.kickoffs(year=year, week=week)
+        return {
+            game_id
+            for game_id in game_ids
+            if (kickoff := kickoffs.get(game_id)) is not None and kickoff <= now
+        }
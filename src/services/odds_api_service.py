@@ -1,15 +1,17 @@
 import datetime
 import functools
-from typing import TypeVar
+from typing import Annotated, TypeVar
 
 import httpx
-from pydantic import BaseModel, Field, TypeAdapter
+from pydantic import BaseModel, BeforeValidator, Field, TypeAdapter
 
 from src.components.admin.admin_service import AdminService
 from src.config.base_service import BaseService
 from src.services.property_service import PropertyService
 from src.services.secret_service import SecretService
+from src.services.throttled_client import ThrottledClient
 from src.util.injection import dependency, inject
+from src.util.metrics import ODDS_API_REMAINING, ODDS_API_USED
 
 
 def empty_list(v: any) -> any:
@@ -50,7 +52,9 @@ class ScoreDto(BaseModel):
 class ScoresDto(GameDto):
     completed: bool
     last_updated: datetime.datetime | None = Field(default=None)
-    scores: list[ScoreDto]
+    scores: Annotated[
+        list[ScoreDto], BeforeValidator(empty_list)
+    ]  # null before kickoff
 
 
 class OutcomeDto(BaseModel):
@@ -84,16 +88,17 @@ class OddsApiService(BaseService):
         admin_service: AdminService,
         property_service: PropertyService,
         secret_service: SecretService,
+        http: ThrottledClient,
     ):
         self.base_url = "https://api.the-odds-api.com/v4/sports/americanfootball_nfl"
         self.admin_service = admin_service
         self.property_service = property_service
         self.secret_service = secret_service
+        self.http = http
 
-    @property
-    def client(self) -> httpx.Client:
-        return httpx.Client(
-            timeout=60, base_url=self.base_url, headers={"accept": "*/*"}
+    def _get(self, url: str, params: dict) -> httpx.Response:
+        return self.http.get(
+            f"{self.base_url}/{url}", params=params, headers={"accept": "*/*"}
         )
 
     @property
@@ -103,10 +108,17 @@ class OddsApiService(BaseService):
 
     def save_remaining(self, response: httpx.Response):
         try:
+            for gauge, header in (
+                (ODDS_API_USED, "x-requests-used"),
+                (ODDS_API_REMAINING, "x-requests-remaining"),
+            ):
+                if (value := response.headers.get(header)) is not None:
+                    gauge.set(float(value))
             self.admin_service.set_oddsapi_quota(
                 quota={
                     "used": response.headers.get("x-requests-used"),
                     "remaining": response.headers.get("x-requests-remaining"),
+                    "last": response.headers.get("x-requests-last"),
                 }
             )
         except Exception as e:
@@ -114,7 +126,11 @@ class OddsApiService(BaseService):
 
     @validate_response(model=list[OddsDto])
     def fetch_odds(
-        self, start_date: datetime.datetime, end_date: datetime.datetime
+        self,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+        bookmakers: list[str] | None = None,
+        event_ids: list[str] | None = None,
     ) -> list[OddsDto]:
         start_time = (
             datetime.datetime.combine(start_date, datetime.time()).isoformat() + "Z"
@@ -125,24 +141,28 @@ class OddsApiService(BaseService):
             ).isoformat()
             + "Z"
         )
-        response = self.client.get(
-            url="odds",
-            params={
-                "regions": "us",
-                "markets": "spreads",
-                "oddsFormat": "american",
-                "apiKey": self.api_key,
-                "commenceTimeFrom": start_time,
-                "commenceTimeTo": end_time,
-            },
-        )
+        params = {
+            "regions": "us",
+            "markets": "spreads",
+            "oddsFormat": "american",
+            "apiKey": self.api_key,
+            "commenceTimeFrom": start_time,
+            "commenceTimeTo": end_time,
+        }
+        if bookmakers:
+            # bookmakers take precedence over regions, every 10 books cost 1 region
+            params["bookmakers"] = ",".join(bookmakers)
+        if event_ids:
+            params["eventIds"] = ",".join(event_ids)
+
+        response = self._get(url="odds", params=params)
         self.save_remaining(response=response)
         response.raise_for_status()
         return response.json()
 
     @validate_response(model=list[ScoresDto])
     def fetch_scores(self) -> list[ScoresDto]:
-        response = self.client.get(
+        response = self._get(
             url="scores",
             params={
                 "daysFrom": "1",
@@ -0,0 +1,196 @@
+from datetime import datetime, timedelta
+
+import pytz
+from pydantic import BaseModel, Field
+
+from src.components.admin.admin_service import AdminService
+from src.config.base_service import BaseService
+from src.config.settings import Settings
+from src.models.new_db_models import GameModel
+from src.services.property_service import PropertyService
+from src.util.injection import dependency, inject
+from src.util.kickoff import game_kickoff
+
+# (time to kickoff, polling interval) pairs, the first matching window wins
+_POLL_WINDOWS = (
+    (timedelta(hours=3), timedelta(minutes=15)),
+    (timedelta(hours=24), timedelta(hours=1)),
+    (timedelta(days=3), timedelta(hours=4)),
+)
+_DEFAULT_POLL_INTERVAL = timedelta(hours=12)
+
+# remaining requests at which polling starts backing off, and the floor at
+# which only games about to kick off are refreshed
+_QUOTA_COMFORT = 200
+_QUOTA_RESERVE = 10
+_MAX_BACKOFF = 8
+
+
+class FetchPlan(BaseModel):
+    fetch: bool
+    reason: str
+    bookmakers: list[str]
+    due_game_ids: list[int] = Field(default_factory=list)
+    event_ids: list[str] | None = Field(default=None)  # None requests every event
+
+
+@dependency
+class OddsFetchPlanner(BaseService):
+    """
+    Decides which games are worth spending Odds API quota on, and remembers the
+    last seen ``last_update`` per (game, bookmaker) so unchanged lines are skipped.
+    """
+
+    _category = "odds-api"
+    _state_key = "fetch-state"
+
+    @inject
+    def __init__(
+        self,
+        admin_service: AdminService,
+        property_service: PropertyService,
+        settings: Settings,
+    ):
+        """
+        Initializes the OddsFetchPlanner.
+
+        :param admin_service: Used to read the last recorded odds API quota.
+        :param property_service: Used to persist the per game fetch state.
+        :param settings: Provides the bookmakers the app displays.
+        """
+        self.admin_service = admin_service
+        self.property_service = property_service
+        self.settings = settings
+        self._state: dict | None = None
+
+    @property
+    def bookmakers(self) -> list[str]:
+        return [
+            key.strip()
+            for key in self.settings.odds_api_bookmakers.split(",")
+            if key.strip()
+        ]
+
+    @property
+    def state(self) -> dict:
+        if self._state is None:
+            prop = self.property_service.get_property(
+                key=self._state_key, category=self._category
+            )
+            self._state = prop.value if prop else {}
+            self._state.setdefault("games", {})
+        return self._state
+
+    def save_state(self) -> None:
+        self.property_service.set_property(
+            key=self._state_key, value=self.state, category=self._category
+        )
+
+    def _game_state(self, game_id: int) -> dict:
+        return self.state["games"].setdefault(str(game_id), {"bookmakers": {}})
+
+    def remaining_quota(self) -> int | None:
+        try:
+            prop = self.admin_service.get_oddsapi_quota()
+            return int(float(prop.value.get("remaining")))
+        except Exception as e:
+            self.logger.info(f"odds api quota unavailable : {e}")
+            return None
+
+    @staticmethod
+    def _backoff(remaining: int | None) -> float:
+        if remaining is None or remaining >= _QUOTA_COMFORT:
+            return 1
+        return min(_MAX_BACKOFF, _QUOTA_COMFORT / max(remaining, 1))
+
+    def poll_interval(self, time_to_kickoff: timedelta, remaining: int | None):
+        interval = _DEFAULT_POLL_INTERVAL
+        for window, window_interval in _POLL_WINDOWS:
+            if time_to_kickoff <= window:
+                interval = window_interval
+                break
+        return interval * self._backoff(remaining)
+
+    def is_due(self, game: GameModel, now: datetime, remaining: int | None) -> bool:
+        kickoff = game_kickoff(game)
+        if kickoff is None:
+            return True
+        kickoff = kickoff.replace(tzinfo=pytz.utc)
+        if kickoff <= now:
+            # keep the closing line once the game has started
+            return False
+
+        time_to_kickoff = kickoff - now
+        if (
+            remaining is not None
+            and remaining <= _QUOTA_RESERVE
+            and time_to_kickoff > _POLL_WINDOWS[0][0]
+        ):
+            return False
+
+        fetched_at = self._game_state(game.id).get("fetched_at")
+        if not fetched_at:
+            return True
+        elapsed = now - datetime.fromisoformat(fetched_at)
+        return elapsed >= self.poll_interval(time_to_kickoff, remaining)
+
+    def plan(self, games: list[GameModel], now: datetime | None = None) -> FetchPlan:
+        """
+        Builds the fetch plan for the given games.
+
+        :param games: The games in the fetch window.
+        :param now: The current time, defaults to now in UTC.
+        :return: FetchPlan describing whether and what to request.
+        """
+        now = now or datetime.now(tz=pytz.utc)
+        self._state = None  # reload, other runs may have written since
+        remaining = self.remaining_quota()
+        self.logger.info(f"planning odds fetch, remaining quota = {remaining}")
+
+        if remaining is not None and remaining <= 0:
+            return FetchPlan(
+                fetch=False, reason="odds api quota exhausted", bookmakers=[]
+            )
+
+        due = [game for game in games if self.is_due(game, now, remaining)]
+        if not due:
+            return FetchPlan(
+                fetch=False, reason="no games due for refresh", bookmakers=[]
+            )
+
+        # events can only be filtered once every due game has been matched to an id
+        event_ids = [game.oddsapi_id for game in due]
+        return FetchPlan(
+            fetch=True,
+            reason=f"{len(due)} of {len(games)} games due for refresh",
+            bookmakers=self.bookmakers,
+            due_game_ids=[game.id for game in due],
+            event_ids=event_ids if all(event_ids) else None,
+        )
+
+    def has_changed(
+        self, game_id: int, bookmaker: str, last_update: datetime | None
+    ) -> bool:
+        if last_update is None:
+            return True
+        seen = self._game_state(game_id)["bookmakers"].get(bookmaker)
+        return seen != last_update.isoformat()
+
+    def mark_seen(
+        self, game_id: int, bookmaker: str, last_update: datetime | None
+    ) -> None:
+        if last_update is not None:
+            self._game_state(game_id)["bookmakers"][bookmaker] = last_update.isoformat()
+
+    def mark_fetched(self, game_ids: list[int], now: datetime | None = None) -> None:
+        fetched_at = (now or datetime.now(tz=pytz.utc)).isoformat()
+        for game_id in game_ids:
+            self._game_state(game_id)["fetched_at"] = fetched_at
+
+    def requests_spent(self) -> int:
+        try:
+            prop = self.admin_service.get_oddsapi_quota()
+            return int(float(prop.value.get("last") or 0))
+        except Exception as e:
+            self.logger.info(f"odds api request cost unavailable : {e}")
+            return 0
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from src.components.pick.pick_models import PickStatus
+from src.config.base_service import BaseService
+from src.models.new_db_models import GameModel, PickModel
+from src.util.injection import dependency, inject
+from src.util.kickoff import kickoff_utc, utc_now
+
+
+class PickLockReport(BaseModel):
+    kickoffs_backfilled: int = 0
+    slots_locked: int = 0
+    picks_locked: int = 0
+
+
+@dependency
+class PickLockService(BaseService):
+    """
+    Locks the picks of games that have kicked off. Games share a handful of kickoff
+    slots per week, so locking is one set based UPDATE per slot, driven by the
+    indexed game.kickoff column.
+    """
+
+    @inject
+    def __init__(self):
+        """
+        Initializes the PickLockService.
+        """
+        pass
+
+    def backfill_kickoffs(self) -> int:
+        """
+        Derives kickoff from the start date and time of games saved without one.
+
+        :return: The number of games updated.
+        """
+        games = list(
+            GameModel.select(
+                GameModel.id, GameModel.start_date, GameModel.start_time
+            ).where(GameModel.kickoff.is_null() & GameModel.start_time.is_null(False))
+        )
+        for game in games:
+            game.kickoff = kickoff_utc(game.start_date, game.start_time)
+        games = [game for game in games if game.kickoff is not None]
+        if games:
+            GameModel.bulk_update(games, fields=[GameModel.kickoff], batch_size=100)
+            self.logger.info(f"backfilled kickoff of {len(games)} games")
+        return len(games)
+
+    def lock_started_picks(self, now: datetime | None = None) -> PickLockReport:
+        """
+        Locks every pick whose game has kicked off.
+
+        :param now: The current time as naive UTC, defaults to now.
+        :return: PickLockReport counting what was locked.
+        """
+        now = now or utc_now()
+        report = PickLockReport(kickoffs_backfilled=self.backfill_kickoffs())
+
+        slots = (
+            GameModel.select(GameModel.kickoff)
+            .join(PickModel, on=(PickModel.game == GameModel.id))
+            .where((GameModel.kickoff <= now) & (PickModel.status != PickStatus.Locked))
+            .distinct()
+            .order_by(GameModel.kickoff)
+            .tuples()
+        )
+        for (kickoff,) in slots:
+            locked = (
+                PickModel.update(status=PickStatus.Locked)
+                .where(
+                    (PickModel.status != PickStatus.Locked)
+                    & PickModel.game.in_(
+                        GameModel.select(GameModel.id).where(
+                            GameModel.kickoff == kickoff
+                        )
+                    )
+                )
+                .execute()
+            )
+            self.logger.info(f"locked {locked} picks of games kicking off at {kickoff}")
+            report.slots_locked += 1
+            report.picks_locked += locked
+        return report
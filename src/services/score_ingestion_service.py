@@ -0,0 +1,220 @@
+from datetime import datetime, timedelta
+
+import pytz
+from peewee import JOIN
+from pydantic import BaseModel
+
+from src.config.base_service import BaseService
+from src.models.dto.event_dtos import EventTopic, ScoreEventPayload
+from src.models.new_db_models import (
+    GameModel,
+    GameResultModel,
+    SeasonModel,
+    TeamModel,
+    WeekModel,
+)
+from src.services.event_service import EventService
+from src.services.odds_api_service import OddsApiService, ScoresDto
+from src.services.team_result_service import TeamResultService
+from src.util.injection import dependency, inject
+from src.util.kickoff import game_kickoff, new_york
+
+# how long after kickoff a game without a result is still polled
+_LIVE_WINDOW = timedelta(hours=5)
+
+
+class ScoreIngestionReport(BaseModel):
+    fetched: bool
+    reason: str
+    games_live: int = 0
+    scores_received: int = 0
+    unmatched: int = 0
+    results_created: int = 0
+    results_updated: int = 0
+    results_unchanged: int = 0
+    team_results_derived: int = 0
+    events_published: int = 0
+
+
+@dependency
+class ScoreIngestionService(BaseService):
+    """
+    Polls the Odds API scores endpoint while games are being played. Final scores
+    are upserted into the game results and announced with a game-final event, live
+    scores are only published as score-updated events, so a game result row keeps
+    meaning the game is over.
+    """
+
+    @inject
+    def __init__(
+        self,
+        oddsapi_service: OddsApiService,
+        event_service: EventService,
+        team_result_service: TeamResultService,
+    ):
+        self.oddsapi_service = oddsapi_service
+        self.event_service = event_service
+        self.team_result_service = team_result_service
+
+    @staticmethod
+    def _live_games(now: datetime) -> list[GameModel]:
+        """
+        Games that have kicked off and have no result yet, or kicked off recently.
+        """
+        today = now.astimezone(new_york).date()
+        games = (
+            GameModel.select(GameModel, GameResultModel.id.alias("result_id"))
+            .join(
+                GameResultModel,
+                JOIN.LEFT_OUTER,
+                on=(GameResultModel.game == GameModel.id),
+            )
+            .where(
+                (GameModel.start_date >= today - timedelta(days=1))
+                & (GameModel.start_date <= today)
+            )
+            .objects()
+        )
+        live = []
+        for game in games:
+            kickoff = game_kickoff(game)
+            if kickoff is None:
+                continue
+            kickoff = kickoff.replace(tzinfo=pytz.utc)
+            if kickoff > now:
+                continue
+            if game.result_id is None or now - kickoff <= _LIVE_WINDOW:
+                live.append(game)
+        return live
+
+    @staticmethod
+    def _resolve_games(event_ids: list[str]) -> dict[str, GameModel]:
+        """
+        Maps the games matched by load_spreads by their Odds API event id.
+        """
+        games = (
+            GameModel.select(GameModel, WeekModel.week_number, SeasonModel.year)
+            .join(WeekModel, on=(GameModel.week == WeekModel.id))
+            .join(SeasonModel, on=(GameModel.season == SeasonModel.id))
+            .where(GameModel.oddsapi_id << event_ids)
+            .objects()
+        )
+        return {game.oddsapi_id: game for game in games}
+
+    def _last_published(self, now: datetime) -> dict[int, tuple[EventTopic, dict]]:
+        """
+        The last score event published per game over the polled window.
+        """
+        events = self.event_service.fetch_recent(
+            topics=[EventTopic.ScoreUpdated, EventTopic.GameFinal],
+            since=(now - timedelta(days=3)).replace(tzinfo=None),
+        )
+        return {
+            event.payload["game_id"]: (event.topic, event.payload) for event in events
+        }
+
+    @staticmethod
+    def _to_payload(
+        item: ScoresDto, game: GameModel, team_names: dict[int, str]
+    ) -> ScoreEventPayload | None:
+        scores = {score.name: score.score for score in item.scores}
+        home = scores.get(team_names.get(game.home_team_id))
+        away = scores.get(team_names.get(game.away_team_id))
+        if home is None or away is None:
+            return None
+        return ScoreEventPayload(
+            game_id=game.id,
+            year=game.year,
+            week=game.week_number,
+            home_team_id=game.home_team_id,
+            away_team_id=game.away_team_id,
+            home_score=home,
+            away_score=away,
+            completed=item.completed,
+        )
+
+    def ingest_scores(self, now: datetime | None = None) -> ScoreIngestionReport:
+        """
+        Fetches the latest scores and applies the changes.
+
+        :param now: The current time, defaults to now in UTC.
+        :return: ScoreIngestionReport describing what changed.
+        """
+        now = now or datetime.now(tz=pytz.utc)
+        live = self._live_games(now=now)
+        if not live:
+            return ScoreIngestionReport(fetched=False, reason="no games in progress")
+
+        report = ScoreIngestionReport(
+            fetched=True, reason=f"{len(live)} games in progress", games_live=len(live)
+        )
+        items = [item for item in self.oddsapi_service.fetch_scores() if item.scores]
+        report.scores_received = len(items)
+
+        games = self._resolve_games(event_ids=[item.game_id for item in items])
+        team_names = {team.id: team.full_name for team in TeamModel.select()}
+        results = {
+            result.game_id: result
+            for result in GameResultModel.select().where(
+                GameResultModel.game << [game.id for game in games.values()]
+            )
+        }
+        last_published = self._last_published(now=now)
+
+        new_results, changed_results, events = [], [], []
+        for item in items:
+            game = games.get(item.game_id)
+            payload = game and self._to_payload(item, game, team_names)
+            if payload is None:
+                self.logger.warning(
+                    f"no game for {item.away_team} at {item.home_team} ({item.game_id})"
+                )
+                report.unmatched += 1
+                continue
+
+            scores = (payload.home_score, payload.away_score)
+            last_topic, last_payload = last_published.get(game.id, (None, {}))
+            last_scores = (
+                last_payload.get("home_score"),
+                last_payload.get("away_score"),
+            )
+
+            if payload.completed:
+                if (result := results.get(game.id)) is None:
+                    new_results.append(
+                        {
+                            GameResultModel.game: game.id,
+                            GameResultModel.home_score: payload.home_score,
+                            GameResultModel.away_score: payload.away_score,
+                        }
+                    )
+                elif (result.home_score, result.away_score) != scores:
+                    result.home_score, result.away_score = scores
+                    changed_results.append(result)
+                else:
+                    report.results_unchanged += 1
+
+                if last_topic != EventTopic.GameFinal or last_scores != scores:
+                    events.append((EventTopic.GameFinal, payload.model_dump()))
+            elif last_scores != scores:
+                events.append((EventTopic.ScoreUpdated, payload.model_dump()))
+
+        # results and their events land together, consumers never see one without the other
+        with GameResultModel._meta.database.atomic():
+            if new_results:
+                GameResultModel.insert_many(new_results).execute()
+            if changed_results:
+                GameResultModel.bulk_update(
+                    changed_results,
+                    fields=[GameResultModel.home_score, GameResultModel.away_score],
+                )
+            report.team_results_derived = self.team_result_service.derive_for_games(
+                game_ids=[row[GameResultModel.game] for row in new_results]
+                + [result.game_id for result in changed_results]
+            )
+            report.events_published = self.event_service.publish_many(events=events)
+
+        report.results_created = len(new_results)
+        report.results_updated = len(changed_results)
+        self.logger.info(f"ingested scores : {report.model_dump()}")
+        return report
@@ -1,63 +1,265 @@
-from functools import cached_property
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, TypeVar
 
 import httpx
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from bs4 import BeautifulSoup, SoupStrainer
 
 from src.config.base_service import BaseService
+from src.services.scrapers.browser_pool import BrowserPool
+from src.services.scrapers.response_cache import CacheResult, ResponseCache
+from src.services.throttled_client import ThrottledClient
 from src.util.injection import dependency, inject
 
+T = TypeVar("T")
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+def class_strainer(name: str, css_class: str) -> SoupStrainer:
+    """
+    Strainer for ``name`` tags carrying ``css_class``. Strainers see the raw class
+    attribute while parsing, so the class is matched as a whitespace separated token.
+    """
+    return SoupStrainer(name, class_=re.compile(rf"(^|\s){re.escape(css_class)}(\s|$)"))
+
 
 @dependency
 class BaseScraper(BaseService):
     @inject
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        response_cache: ResponseCache,
+        browser_pool: BrowserPool,
+        http: ThrottledClient,
+    ):
         self.base_url = base_url
+        self.response_cache = response_cache
+        self.browser_pool = browser_pool
+        self.http = http
+        self._pending: list[CacheResult] | None = None
+
+    @contextmanager
+    def saving_pages(self):
+        """
+        Holds back the response cache entries of the pages fetched in the block and
+        commits them once it completes. When parsing or saving raises, the entries
+        are dropped, so the next incremental scrape fetches those pages again.
+        """
+        self._pending = []
+        try:
+            yield
+            self.response_cache.commit(self._pending)
+        finally:
+            self._pending = None
+
+    def _hold(self, result: CacheResult) -> CacheResult:
+        # outside saving_pages the entry is written right away
+        if self._pending is None:
+            self.response_cache.commit([result])
+        else:
+            self._pending.append(result)
+        return result
 
-    @cached_property
-    def client(self):
-        self.logger.info(f"creating client for: {self.base_url}")
-        return httpx.Client(base_url=self.base_url, timeout=60)
+    def _store(self, url: str, page: httpx.Response) -> CacheResult:
+        return self._hold(self.response_cache.store(url, page))
 
-    def _get_static_soup(self, url: str) -> BeautifulSoup:
+    def _store_content(self, url: str, content: bytes) -> CacheResult:
+        return self._hold(self.response_cache.store_content(url, content))
+
+    def _full_url(self, url: str) -> str:
+        return f"{self.base_url}/{url}"
+
+    @staticmethod
+    def parse_html(
+        content: bytes | str, parse_only: SoupStrainer | None = None
+    ) -> BeautifulSoup:
+        """
+        Parse a page with the fastest available backend (lxml when installed).
+        :param content: the page body
+        :param parse_only: only build the tree for elements matching the strainer
+        :return: BeautifulSoup for the page, or for the strained subtrees
+        """
+        return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only)
+
+    def _get_static_soup(
+        self,
+        url: str,
+        skip_unchanged: bool = False,
+        parse_only: SoupStrainer | None = None,
+    ) -> BeautifulSoup | None:
         """
         Generate BeautifulSoup for a static HTML site. Fetch site using httpx client and parse response with BS4.
+        The request is revalidated against the response cache.
         :param url: the endpoint to init BeautifulSoup [full url is base_url/url]
+        :param skip_unchanged: return None instead of parsing a page that has not changed
+        :param parse_only: only build the tree for elements matching the strainer
         :return: BeautifulSoup object setup with the url param
         """
         self.logger.info(f"generating static soup: {url}")
 
-        page = self.client.get(url)
-        soup = BeautifulSoup(page.content, "html.parser")
+        full_url = self._full_url(url)
+        page = self.http.get(
+            full_url, headers=self.response_cache.conditional_headers(full_url)
+        )
+        result = self._store(full_url, page)
+        if skip_unchanged and not result.changed:
+            self.logger.info(f"page unchanged since last scrape: {url}")
+            return None
+
+        soup = self.parse_html(result.content, parse_only=parse_only)
         return soup
 
+    def _parse_static_page(
+        self,
+        content: bytes,
+        parse: Callable[[BeautifulSoup], T],
+        parse_only: SoupStrainer | None = None,
+    ) -> T:
+        soup = self.parse_html(content, parse_only=parse_only)
+        try:
+            return parse(soup)
+        finally:
+            # release the tree now rather than waiting on the garbage collector
+            soup.decompose()
+
+    async def get_static_soups_async(
+        self,
+        urls: list[str],
+        parse: Callable[[BeautifulSoup], T],
+        concurrency: int = 6,
+        requests_per_second: float = 4,
+        skip_unchanged: bool = False,
+        parse_only: SoupStrainer | None = None,
+    ) -> list[T | None]:
+        """
+        Fetch several static pages concurrently and parse each one on a worker thread
+        as soon as it arrives, so parsing overlaps with the remaining downloads.
+        Threads rather than processes are used because Lambda has no /dev/shm.
+        :param urls: the endpoints to fetch [full url is base_url/url]
+        :param parse: callable turning the page's BeautifulSoup into a result
+        :param concurrency: maximum number of requests in flight
+        :param requests_per_second: rate limit applied to the host by the throttled client
+        :param skip_unchanged: yield None instead of parsing pages that have not changed
+        :param parse_only: only build the tree for elements matching the strainer
+        :return: parse results in the same order as urls
+        """
+        self.http.configure_host(
+            host=httpx.URL(self.base_url).host,
+            requests_per_second=requests_per_second,
+            max_in_flight=concurrency,
+        )
+        loop = asyncio.get_running_loop()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            async with self.http.async_session() as session:
+
+                async def fetch_and_parse(url: str) -> T | None:
+                    full_url = self._full_url(url)
+                    self.logger.info(f"generating static soup: {url}")
+                    page = await session.get(
+                        full_url,
+                        headers=self.response_cache.conditional_headers(full_url),
+                    )
+
+                    result = self._store(full_url, page)
+                    if skip_unchanged and not result.changed:
+                        self.logger.info(f"page unchanged since last scrape: {url}")
+                        return None
+
+                    return await loop.run_in_executor(
+                        pool, self._parse_static_page, result.content, parse, parse_only
+                    )
+
+                return await asyncio.gather(*(fetch_and_parse(url) for url in urls))
+
     # TODO: This may not work with proxy
-    def _get_dynamic_soup(self, url: str) -> BeautifulSoup:
+    def _get_dynamic_soup(
+        self,
+        url: str,
+        skip_unchanged: bool = False,
+        parse_only: SoupStrainer | None = None,
+    ) -> BeautifulSoup | None:
         """
-        Generate BeautifulSoup for a dynamic JS site. Open site in Chromium browser
-        then init BeautifulSoup with page contents, closing the browser on exit.
+        Generate BeautifulSoup for a dynamic JS site. The page is rendered in a page
+        borrowed from the shared browser pool, so the browser outlives the request.
+        Rendered pages cannot be revalidated, so only the body hash is compared.
         :param url: the endpoint to init BeautifulSoup [full url is base_url/url]
+        :param skip_unchanged: return None instead of parsing a page that has not changed
+        :param parse_only: only build the tree for elements matching the strainer
         :return: BeautifulSoup object setup with the url param
         """
         self.logger.info(f"generating dynamic soup: {url}")
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page()
-            page.goto(f"{self.base_url}/{url}")
-            soup = BeautifulSoup(page.content(), "html.parser")
-            browser.close()
-            return soup
+        full_url = self._full_url(url)
+        content = self.browser_pool.content(full_url)
 
-    def get_soup(self, url: str, dynamic: bool = False) -> BeautifulSoup:
+        result = self._store_content(full_url, content)
+        if skip_unchanged and not result.changed:
+            self.logger.info(f"page unchanged since last scrape: {url}")
+            return None
+        return self.parse_html(result.content, parse_only=parse_only)
+
+    async def get_dynamic_soups_async(
+        self,
+        urls: list[str],
+        parse: Callable[[BeautifulSoup], T],
+        skip_unchanged: bool = False,
+        parse_only: SoupStrainer | None = None,
+    ) -> list[T | None]:
+        """
+        Render several dynamic pages concurrently in one pooled browser, at most
+        browser_pool_size pages at a time.
+        :param urls: the endpoints to render [full url is base_url/url]
+        :param parse: callable turning the page's BeautifulSoup into a result
+        :param skip_unchanged: yield None instead of parsing pages that have not changed
+        :param parse_only: only build the tree for elements matching the strainer
+        :return: parse results in the same order as urls
+        """
+        async with self.browser_pool.async_pool() as browser_pool:
+
+            async def render_and_parse(url: str) -> T | None:
+                self.logger.info(f"generating dynamic soup: {url}")
+                full_url = self._full_url(url)
+                content = await browser_pool.content(full_url)
+
+                result = self._store_content(full_url, content)
+                if skip_unchanged and not result.changed:
+                    self.logger.info(f"page unchanged since last scrape: {url}")
+                    return None
+                return self._parse_static_page(result.content, parse, parse_only)
+
+            return await asyncio.gather(*(render_and_parse(url) for url in urls))
+
+    def get_soup(
+        self,
+        url: str,
+        dynamic: bool = False,
+        skip_unchanged: bool = False,
+        parse_only: SoupStrainer | None = None,
+    ) -> BeautifulSoup | None:
         """
         Generate BeautifulSoup for given URL and dynamic flag.
         :param url: the endpoint to init BeautifulSoup [full url is base_url/url]
         :param dynamic: flag to indicate dynamic site
+        :param skip_unchanged: return None when the page has not changed since the last scrape
+        :param parse_only: only build the tree for elements matching the strainer
         :return: BeautifulSoup object setup with the url param
         """
         self.logger.info(
             f"generating soup for request, url = {url}, dynamic = {dynamic}"
         )
         if dynamic:
-            return self._get_dynamic_soup(url=url)
-        return self._get_static_soup(url=url)
+            return self._get_dynamic_soup(
+                url=url, skip_unchanged=skip_unchanged, parse_only=parse_only
+            )
+        return self._get_static_soup(
+            url=url, skip_unchanged=skip_unchanged, parse_only=parse_only
+        )
@@ -0,0 +1,251 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from playwright.async_api import async_playwright
+from playwright.sync_api import sync_playwright
+
+from src.config.base_service import BaseService
+from src.config.settings import Settings
+from src.util.injection import dependency, inject
+
+
+class BrowserPoolStats:
+    def __init__(self):
+        self.launches = 0
+        self.pages_created = 0
+        self.pages_reused = 0
+        self.loads = 0
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+@dependency
+class BrowserPool(BaseService):
+    """
+    Keeps one Chromium browser and context alive across dynamic scrapes and hands
+    out reusable pages. The browser is recycled after max_pages_per_browser page
+    loads, which bounds the memory Chromium accumulates over a long scrape.
+
+    Playwright's sync API is bound to the thread that started it, so a pool must
+    only be used from that thread; use AsyncBrowserPool for concurrent scrapes.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        """
+        Initializes the BrowserPool, the browser is launched on first use.
+
+        :param settings: Provides the pool size and recycle policy.
+        """
+        self.max_pages_per_browser = settings.browser_max_pages_per_browser
+        self.pool_size = settings.browser_pool_size
+        self.stats = BrowserPoolStats()
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._idle = []
+        self._in_use = 0
+        self._loads = 0
+        self._owner = None
+
+    def _start(self):
+        if self._owner is None:
+            self._owner = threading.get_ident()
+        elif self._owner != threading.get_ident():
+            raise RuntimeError("BrowserPool used from a thread that did not start it")
+
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        if self._browser is None:
+            self.logger.info("launching pooled chromium browser")
+            self._browser = self._playwright.chromium.launch()
+            self._context = self._browser.new_context()
+            self._loads = 0
+            self.stats.launches += 1
+
+    def _recycle(self):
+        self.logger.info(f"recycling browser after {self._loads} page loads")
+        for page in self._idle:
+            page.close()
+        self._idle.clear()
+        self._context.close()
+        self._browser.close()
+        self._browser, self._context = None, None
+
+    @contextmanager
+    def page(self):
+        """
+        Lends a page from the pool, returning it for reuse on exit. A page whose
+        caller raised is closed rather than reused.
+        """
+        if (
+            self._browser is not None
+            and self._in_use == 0
+            and self._loads >= self.max_pages_per_browser
+        ):
+            self._recycle()
+        self._start()
+
+        if self._idle:
+            page = self._idle.pop()
+            self.stats.pages_reused += 1
+        else:
+            page = self._context.new_page()
+            self.stats.pages_created += 1
+
+        self._in_use += 1
+        self._loads += 1
+        try:
+            yield page
+        except Exception:
+            page.close()
+            page = None
+            raise
+        finally:
+            self._in_use -= 1
+            if page is not None:
+                if len(self._idle) < self.pool_size:
+                    self._idle.append(page)
+                else:
+                    page.close()
+
+    def content(self, url: str) -> bytes:
+        """
+        Renders the url in a pooled page.
+        :param url: the full url of the page
+        :return: the rendered html
+        """
+        with self.page() as page:
+            page.goto(url)
+            self.stats.loads += 1
+            return page.content().encode("utf-8")
+
+    def async_pool(self) -> "AsyncBrowserPool":
+        """
+        Builds an async pool with the same policy, it must be created and closed
+        inside the event loop that uses it.
+        """
+        return AsyncBrowserPool(
+            pool_size=self.pool_size, max_pages_per_browser=self.max_pages_per_browser
+        )
+
+    def close(self):
+        if self._browser is not None:
+            self._recycle()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+        self._owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncBrowserPool(BaseService):
+    """
+    Async counterpart of BrowserPool, lending up to pool_size pages concurrently
+    from one browser. Once the browser is due for recycling, new loans wait until
+    every page has come back.
+    """
+
+    def __init__(self, pool_size: int, max_pages_per_browser: int):
+        self.max_pages_per_browser = max_pages_per_browser
+        self.pool_size = pool_size
+        self.stats = BrowserPoolStats()
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._idle = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self._condition = asyncio.Condition()
+        self._in_use = 0
+        self._loads = 0
+
+    async def _start(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        if self._browser is None:
+            self.logger.info("launching pooled chromium browser")
+            self._browser = await self._playwright.chromium.launch()
+            self._context = await self._browser.new_context()
+            self._loads = 0
+            self.stats.launches += 1
+
+    async def _recycle(self):
+        self.logger.info(f"recycling browser after {self._loads} page loads")
+        for page in self._idle:
+            await page.close()
+        self._idle.clear()
+        await self._context.close()
+        await self._browser.close()
+        self._browser, self._context = None, None
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Lends a page from the pool, returning it for reuse on exit. A page whose
+        caller raised is closed rather than reused.
+        """
+        async with self._slots:
+            async with self._condition:
+                while (
+                    self._browser is not None
+                    and self._loads >= self.max_pages_per_browser
+                ):
+                    if self._in_use:
+                        await self._condition.wait()
+                    else:
+                        await self._recycle()
+                await self._start()
+
+                if self._idle:
+                    page = self._idle.pop()
+                    self.stats.pages_reused += 1
+                else:
+                    page = await self._context.new_page()
+                    self.stats.pages_created += 1
+                self._in_use += 1
+                self._loads += 1
+
+            try:
+                yield page
+            except Exception:
+                await page.close()
+                page = None
+                raise
+            finally:
+                async with self._condition:
+                    self._in_use -= 1
+                    if page is not None:
+                        self._idle.append(page)
+                    self._condition.notify_all()
+
+    async def content(self, url: str) -> bytes:
+        """
+        Renders the url in a pooled page.
+        :param url: the full url of the page
+        :return: the rendered html
+        """
+        async with self.page() as page:
+            await page.goto(url)
+            self.stats.loads += 1
+            return (await page.content()).encode("utf-8")
+
+    async def close(self):
+        async with self._condition:
+            if self._browser is not None:
+                await self._recycle()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -1,6 +1,10 @@
-from datetime import datetime, timezone
+import asyncio
+from datetime import date, datetime, timezone, timedelta
 
 import pytz
+from bs4 import BeautifulSoup
+from peewee import JOIN, fn
+from pydantic import BaseModel
 
 from src.models.new_db_models import (
     GameModel,
@@ -9,13 +13,43 @@ from src.models.new_db_models import (
     TeamModel,
     GameResultModel,
 )
-from src.services.scrapers.base_scraper import BaseScraper
+from src.services.scrapers.base_scraper import BaseScraper, class_strainer
+from src.services.team_result_service import TeamResultService
+from src.util.injection import inject
+from src.util.kickoff import kickoff_utc
+
+# the schedule tables are all scrape_week reads from a very heavy page
+SCHEDULE_STRAINER = class_strainer("div", "ScheduleTables--nfl")
+REGULAR_SEASON_WEEKS = 18
+
+
+class ScheduleSaveReport(BaseModel):
+    weeks_created: int = 0
+    games_created: int = 0
+    games_updated: int = 0
+    games_unchanged: int = 0
+    games_skipped: int = 0
+    results_created: int = 0
+    results_updated: int = 0
+    results_unchanged: int = 0
+    team_results_derived: int = 0
+
+
+class SeasonScrapeReport(BaseModel):
+    weeks_requested: list[int] = []
+    weeks_saved: list[int] = []
+
+    @property
+    def requests(self) -> int:
+        return len(self.weeks_requested)
 
 
 class EspnScraper(BaseScraper):
-    def __init__(self):
+    @inject
+    def __init__(self, team_result_service: TeamResultService):
         # init scraper with corresponding url
         super().__init__(base_url="https://www.espn.com/nfl")
+        self.team_result_service = team_result_service
 
     def _parse_team_name(self, team_str: str) -> (str, str):
         if team_str is None:
@@ -31,10 +65,28 @@ class EspnScraper(BaseScraper):
 
         return city, name
 
-    def scrape_week(self, week: int, year: int) -> list:
-        home_city, away_city, date, time = None, None, None, None
+    @staticmethod
+    def _week_url(week: int, year: int) -> str:
+        return f"schedule/_/week/{week}/year/{year}/seasontype/2"
+
+    def scrape_week(
+        self, week: int, year: int, skip_unchanged: bool = False
+    ) -> list | None:
+        soup = self.get_soup(
+            url=self._week_url(week=week, year=year),
+            skip_unchanged=skip_unchanged,
+            parse_only=SCHEDULE_STRAINER,
+        )
+        if soup is None:
+            return None
 
-        soup = self.get_soup(url=f"schedule/_/week/{week}/year/{year}/seasontype/2")
+        try:
+            return self._parse_week(soup=soup)
+        finally:
+            soup.decompose()
+
+    def _parse_week(self, soup: BeautifulSoup) -> list:
+        home_city, away_city, date, time = None, None, None, None
 
         # This scrapes a table for each game day that season
         game_days = soup.select("div.ScheduleTables--nfl div.ResponsiveTable")
@@ -102,14 +154,53 @@ class EspnScraper(BaseScraper):
                 )
         return games_info
 
-    def _scrape_season(self, year: int, num_weeks: int = 18):
+    def _scrape_season(
+        self,
+        year: int,
+        num_weeks: int = REGULAR_SEASON_WEEKS,
+        weeks: list[int] | None = None,
+        skip_unchanged: bool = False,
+    ):
         season = {}
-        for i in range(num_weeks):
-            week = self.scrape_week(week=i + 1, year=year)
+        for week_number in weeks or range(1, num_weeks + 1):
+            week = self.scrape_week(
+                week=week_number, year=year, skip_unchanged=skip_unchanged
+            )
+            if week is None:
+                # unchanged pages are left out so nothing is re-saved for them
+                continue
             self.logger.info(week)
-            season[i + 1] = week
-            self.logger.info(f"Finished Loading Week {i + 1}".center(80, "-"))
+            season[week_number] = week
+            self.logger.info(f"Finished Loading Week {week_number}".center(80, "-"))
+
+        self.logger.info(f"Finished Loading Season {year}".center(80, "-"))
+        return season
 
+    async def _scrape_season_async(
+        self,
+        year: int,
+        num_weeks: int = REGULAR_SEASON_WEEKS,
+        concurrency: int = 6,
+        requests_per_second: float = 4,
+        weeks: list[int] | None = None,
+        skip_unchanged: bool = False,
+    ) -> dict:
+        """
+        Concurrent variant of _scrape_season, returning the same season dict.
+        """
+        weeks = weeks or list(range(1, num_weeks + 1))
+        results = await self.get_static_soups_async(
+            urls=[self._week_url(week=week, year=year) for week in weeks],
+            parse=self._parse_week,
+            concurrency=concurrency,
+            requests_per_second=requests_per_second,
+            skip_unchanged=skip_unchanged,
+            parse_only=SCHEDULE_STRAINER,
+        )
+
+        season = {
+            week: games for week, games in zip(weeks, results) if games is not None
+        }
         self.logger.info(f"Finished Loading Season {year}".center(80, "-"))
         return season
 
@@ -142,14 +233,30 @@ class EspnScraper(BaseScraper):
             print(f"Error parsing result text: {result_text}, Error: {e}")
             return {}
 
-    def _save_schedule(self, year: int, season: dict):
+    @staticmethod
+    def _as_date(value) -> date | None:
+        return value.date() if isinstance(value, datetime) else value
+
+    def _save_schedule(self, year: int, season: dict) -> ScheduleSaveReport:
+        """
+        Saves the scraped season in bulk. Existing weeks, teams, games and results are
+        loaded up front and diffed against the scrape, so only new and changed rows are
+        written, inside a single transaction.
+
+        :param year: The season year.
+        :param season: The scraped games keyed by week number, see _parse_week.
+        :return: ScheduleSaveReport counting what changed.
+        """
+        report = ScheduleSaveReport()
         season_model, created = SeasonModel.get_or_create(year=year)
         if created:
             self.logger.info(f"created season {year}")
 
+        # stage 1: resolve the teams and parse the scores before anything is written
+        teams = {(team.city, team.name): team for team in TeamModel.select()}
+        scraped = []
         for week, games in season.items():
             for game in games:
-                self.logger.info(f"saving game {game}")
                 (
                     home_city,
                     home_team,
@@ -159,64 +266,249 @@ class EspnScraper(BaseScraper):
                     start_date,
                     start_time,
                 ) = game
-
-                # load season model
-                week_model, created = WeekModel.get_or_create(
-                    season=season_model,
-                    week_number=week,
-                )
-                if created:
-                    self.logger.info(f"week created {week}")
-
-                # load team models
-                home_team_model, _ = TeamModel.get_or_create(
-                    city=home_city, name=home_team
-                )
-                away_team_model, _ = TeamModel.get_or_create(
-                    city=away_city, name=away_team
+                home = teams.get((home_city, home_team))
+                away = teams.get((away_city, away_team))
+                if home is None or away is None:
+                    self.logger.warning(
+                        f"skipping game {away_city} at {home_city}, unknown team"
+                    )
+                    report.games_skipped += 1
+                    continue
+
+                scores = None
+                if parsed := self._parse_result_to_dict(result_text=results):
+                    try:
+                        scores = (parsed[home.abbreviation], parsed[away.abbreviation])
+                    except KeyError as e:
+                        self.logger.exception(f"failed to parse scores {e}")
+                        raise e
+
+                scraped.append(
+                    (
+                        week,
+                        home.id,
+                        away.id,
+                        self._as_date(start_date),
+                        start_time,
+                        scores,
+                    )
                 )
 
-                # create the game model
-                game, created = GameModel.get_or_create(
-                    season=season_model,
-                    week=week_model,
-                    home_team=home_team_model,
-                    away_team=away_team_model,
-                )
-                if start_date:
-                    game.start_date = start_date
-                    if start_time:
-                        game.start_time = start_time
-                        game.save()
-
-                if results := self._parse_result_to_dict(result_text=results):
-                    if result := GameResultModel.get_or_none(game=game):
-                        try:
-                            result.home_score = results[home_team_model.abbreviation]
-                            result.away_score = results[away_team_model.abbreviation]
-                            result.save()
-                        except KeyError as e:
-                            self.logger.exception(f"failed to parse scores {e}")
-                            raise e
-                    else:
-                        model = GameResultModel.create(
-                            game=game,
-                            home_score=results[home_team_model.abbreviation],
-                            away_score=results[away_team_model.abbreviation],
-                        )
-                        self.logger.info(f"created game results entry {model}")
-
-                if created:
-                    self.logger.info(f"created game {home_city} vs {away_city}")
+        with GameModel._meta.database.atomic():
+            # stage 2: weeks, so new games have a week to point at
+            weeks = self._load_weeks(season_model=season_model)
+            new_weeks = sorted({week for week, *_ in scraped} - weeks.keys())
+            if new_weeks:
+                WeekModel.insert_many(
+                    [
+                        {WeekModel.season: season_model, WeekModel.week_number: week}
+                        for week in new_weeks
+                    ]
+                ).execute()
+                weeks = self._load_weeks(season_model=season_model)
+                report.weeks_created = len(new_weeks)
+
+            # stage 3: games, keyed the way get_or_create used to match them
+            games = self._load_games(season_model=season_model)
+            new_games, changed_games = [], []
+            for week, home_id, away_id, start_date, start_time, _ in scraped:
+                key = (weeks[week].id, home_id, away_id)
+                if (game := games.get(key)) is None:
+                    new_games.append(
+                        {
+                            GameModel.season: season_model,
+                            GameModel.week: key[0],
+                            GameModel.home_team: home_id,
+                            GameModel.away_team: away_id,
+                            GameModel.start_date: start_date,
+                            GameModel.start_time: start_date and start_time,
+                            GameModel.kickoff: kickoff_utc(start_date, start_time),
+                        }
+                    )
+                    continue
 
                 # some games don't have a start time yet (season 18)
+                start_date = start_date or game.start_date
+                start_time = (start_date and start_time) or game.start_time
+                kickoff = kickoff_utc(start_date, start_time)
+                if (start_date, start_time, kickoff) != (
+                    game.start_date,
+                    game.start_time,
+                    game.kickoff,
+                ):
+                    game.start_date, game.start_time = start_date, start_time
+                    game.kickoff = kickoff
+                    changed_games.append(game)
+                else:
+                    report.games_unchanged += 1
+
+            if new_games:
+                GameModel.insert_many(new_games).execute()
+                games = self._load_games(season_model=season_model)
+            if changed_games:
+                GameModel.bulk_update(
+                    changed_games,
+                    fields=[
+                        GameModel.start_date,
+                        GameModel.start_time,
+                        GameModel.kickoff,
+                    ],
+                    batch_size=100,
+                )
+            report.games_created = len(new_games)
+            report.games_updated = len(changed_games)
+
+            # stage 4: results of finished games
+            results = {
+                result.game_id: result
+                for result in GameResultModel.select()
+                .join(GameModel)
+                .where(GameModel.season == season_model)
+            }
+            new_results, changed_results = [], []
+            for week, home_id, away_id, _, _, scores in scraped:
+                if scores is None:
+                    continue
+                game = games[(weeks[week].id, home_id, away_id)]
+                if (result := results.get(game.id)) is None:
+                    new_results.append(
+                        {
+                            GameResultModel.game: game.id,
+                            GameResultModel.home_score: scores[0],
+                            GameResultModel.away_score: scores[1],
+                        }
+                    )
+                elif (result.home_score, result.away_score) != scores:
+                    result.home_score, result.away_score = scores
+                    changed_results.append(result)
+                else:
+                    report.results_unchanged += 1
+
+            if new_results:
+                GameResultModel.insert_many(new_results).execute()
+            if changed_results:
+                GameResultModel.bulk_update(
+                    changed_results,
+                    fields=[GameResultModel.home_score, GameResultModel.away_score],
+                    batch_size=100,
+                )
+            report.results_created = len(new_results)
+            report.results_updated = len(changed_results)
+            report.team_results_derived = self.team_result_service.derive_for_games(
+                game_ids=[row[GameResultModel.game] for row in new_results]
+                + [result.game_id for result in changed_results]
+            )
+
+        self.logger.info(f"saved {year} schedule : {report.model_dump()}")
+        return report
+
+    @staticmethod
+    def _load_weeks(season_model: SeasonModel) -> dict[int, WeekModel]:
+        return {
+            week.week_number: week
+            for week in WeekModel.select().where(WeekModel.season == season_model)
+        }
+
+    @staticmethod
+    def _load_games(season_model: SeasonModel) -> dict[tuple, GameModel]:
+        return {
+            (game.week_id, game.home_team_id, game.away_team_id): game
+            for game in GameModel.select().where(GameModel.season == season_model)
+        }
+
+    def _weeks_to_refresh(
+        self, year: int, num_weeks: int = REGULAR_SEASON_WEEKS, lookahead_weeks: int = 1
+    ) -> list[int]:
+        """
+        Finds the weeks worth re-scraping: weeks never saved, plus weeks that still
+        have games without a result and whose first game is no further out than
+        the look-ahead window. Completed weeks never change on ESPN.
+        """
+        all_weeks = list(range(1, num_weeks + 1))
+        season_model = SeasonModel.get_or_none(year=year)
+        if season_model is None:
+            return all_weeks
+
+        saved_weeks = {
+            week.week_number
+            for week in WeekModel.select(WeekModel.week_number).where(
+                WeekModel.season == season_model
+            )
+        }
+
+        open_weeks = (
+            GameModel.select(
+                WeekModel.week_number,
+                fn.MIN(GameModel.start_date).alias("first_game"),
+            )
+            .join(WeekModel, on=(GameModel.week == WeekModel.id))
+            .join(
+                GameResultModel,
+                JOIN.LEFT_OUTER,
+                on=(GameResultModel.game == GameModel.id),
+            )
+            .where((GameModel.season == season_model) & GameResultModel.id.is_null())
+            .group_by(WeekModel.week_number)
+        )
+
+        horizon = datetime.now(tz=pytz.utc).date() + timedelta(weeks=lookahead_weeks)
+        refresh = {week for week in all_weeks if week not in saved_weeks}
+        for row in open_weeks.dicts():
+            if row["first_game"] is None or row["first_game"] <= horizon:
+                refresh.add(row["week_number"])
+
+        return sorted(refresh)
 
     def _calculate_start_end_dates(self, year: int, week: int):
         pass
 
-    def scrape_season(self, year: int):
-        season = self._scrape_season(year=year)
-        return self._save_schedule(year=year, season=season)
+    def scrape_season(
+        self,
+        year: int,
+        concurrent: bool = False,
+        incremental: bool = False,
+        lookahead_weeks: int = 1,
+    ):
+        """
+        Scrapes and saves the season's schedule and results.
+
+        :param year: The season year.
+        :param concurrent: Fetch the weeks concurrently, must not be called from a running event loop.
+        :param incremental: Only refresh unfinished weeks, see _weeks_to_refresh, and
+            skip pages the response cache reports unchanged.
+        :param lookahead_weeks: How far ahead of today unfinished weeks are refreshed.
+        :return: SeasonScrapeReport with the weeks whose page was requested, and those
+            saved, which leaves out the pages the response cache reports unchanged.
+        """
+        weeks = (
+            self._weeks_to_refresh(year=year, lookahead_weeks=lookahead_weeks)
+            if incremental
+            else list(range(1, REGULAR_SEASON_WEEKS + 1))
+        )
+        if weeks == []:
+            self.logger.info(f"every week of {year} is final, nothing to scrape")
+            return SeasonScrapeReport()
+
+        # pages are only recorded as seen once their weeks are saved
+        with self.saving_pages():
+            if concurrent:
+                season = asyncio.run(
+                    self._scrape_season_async(
+                        year=year,
+                        weeks=weeks,
+                        concurrency=self.settings.scraper_concurrency,
+                        requests_per_second=self.settings.scraper_requests_per_second,
+                        skip_unchanged=incremental,
+                    )
+                )
+            else:
+                season = self._scrape_season(
+                    year=year, weeks=weeks, skip_unchanged=incremental
+                )
+
+            self.response_cache.log_stats()
+            self._save_schedule(year=year, season=season)
+        return SeasonScrapeReport(weeks_requested=weeks, weeks_saved=list(season))
 
 
 if __name__ == "__main__":
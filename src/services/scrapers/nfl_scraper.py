@@ -1,26 +1,40 @@
 from src.models.new_db_models import TeamModel
-from src.services.scrapers.base_scraper import BaseScraper
+from src.services.scrapers.base_scraper import BaseScraper, class_strainer
+
+FIGURE_STRAINER = class_strainer("figure", "nfl-c-custom-promo__figure")
 
 
 class NflScraper(BaseScraper):
     def __init__(self):
         super().__init__(base_url="https://www.nfl.com")
 
-    def scrape_thumbnails(self):
+    def scrape_thumbnails(self, skip_unchanged: bool = True):
         self.logger.info("scraping nfl thumbnails from nfl.com")
-        soup = self.get_soup("teams/")
-        figures = soup.find_all("figure", class_="nfl-c-custom-promo__figure")
-        for figure in figures:
-            img = figure.find("img")
-            team, src = img.get("alt"), img.get("data-src")
-            city, name = team.rsplit(" ", 1)
-
-            if team_model := TeamModel.get_or_none(city=city, name=name):
-                self.logger.info(f"saving thumbnail for team {team}")
-                team_model.thumbnail = src
-                team_model.save()
-            else:
-                self.logger.info(f"cannot find team {team}")
+        with self.saving_pages():
+            soup = self.get_soup(
+                "teams/", skip_unchanged=skip_unchanged, parse_only=FIGURE_STRAINER
+            )
+            if soup is None:
+                return
+
+            thumbnails = [
+                (img.get("alt"), img.get("data-src"))
+                for figure in soup.find_all(
+                    "figure", class_="nfl-c-custom-promo__figure"
+                )
+                if (img := figure.find("img"))
+            ]
+            soup.decompose()
+
+            for team, src in thumbnails:
+                city, name = team.rsplit(" ", 1)
+
+                if team_model := TeamModel.get_or_none(city=city, name=name):
+                    self.logger.info(f"saving thumbnail for team {team}")
+                    team_model.thumbnail = src
+                    team_model.save()
+                else:
+                    self.logger.info(f"cannot find team {team}")
 
 
 if __name__ == "__main__":
@@ -1,29 +1,44 @@
+from bs4 import SoupStrainer
 from playhouse.shortcuts import model_to_dict
 
 from src.models.new_db_models import TeamModel, SeasonModel
 from src.services.scrapers.base_scraper import BaseScraper
 
+TEAMS_STRAINER = SoupStrainer("th", attrs={"data-stat": "team_name"})
+
 
 class PfrScraper(BaseScraper):
     def __init__(self):
         # init scraper with corresponding url
         super().__init__(base_url="https://www.pro-football-reference.com")
 
-    def scrape_teams(self):
+    def scrape_teams(self, skip_unchanged: bool = True):
         self.logger.info(f"scraping NFL teams from {self.base_url}/teams/")
-        soup = self.get_soup(url="teams/")
-        team_elements = soup.find_all("th", attrs={"data-stat": "team_name"})
-        for team_element in team_elements:
-            if team := team_element.find("a"):
+        with self.saving_pages():
+            soup = self.get_soup(
+                url="teams/", skip_unchanged=skip_unchanged, parse_only=TEAMS_STRAINER
+            )
+            if soup is None:
+                return
+
+            teams = [
+                (team.text.strip(), team.get("href"))
+                for team_element in soup.find_all(
+                    "th", attrs={"data-stat": "team_name"}
+                )
+                if (team := team_element.find("a"))
+            ]
+            soup.decompose()
+
+            for full_team_name, reference in teams:
                 # create model for team
-                full_team_name = team.text.strip()
                 self.logger.info(f"loading team {full_team_name}")
 
                 city, team_name = full_team_name.rsplit(" ", 1)
                 self.logger.info(f"found city {city} and team {team_name}")
 
                 model, _ = TeamModel.get_or_create(name=team_name, city=city)
-                model.reference = team.get("href")
+                model.reference = reference
                 model.save()
 
     def scrape_scores(self, year: str = "2023"):
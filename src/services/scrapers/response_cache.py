@@ -0,0 +1,207 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel, Field
+
+from src.config.base_service import BaseService
+from src.config.settings import Settings
+from src.util.injection import dependency, inject
+from src.util.metrics import CACHE_LOOKUPS
+
+
+class CacheEntry(BaseModel):
+    url: str
+    body_hash: str
+    stored_at: float
+    size: int
+    etag: str | None = Field(default=None)
+    last_modified: str | None = Field(default=None)
+
+
+class CacheResult(BaseModel):
+    url: str
+    content: bytes
+    changed: bool
+    # written by ResponseCache.commit once the page's data is saved
+    entry: CacheEntry | None = Field(default=None)
+
+
+class ResponseCacheStats(BaseModel):
+    not_modified: int = 0  # server answered 304
+    unchanged: int = 0  # server answered 200 with the body we already had
+    misses: int = 0  # new or changed body
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.not_modified + self.unchanged
+
+
+@dependency
+class ResponseCache(BaseService):
+    """
+    On-disk cache of scraped pages, shared by every scraper. Pages are revalidated
+    with If-None-Match / If-Modified-Since and compared by body hash, so callers can
+    tell when a page has not changed since the last scrape.
+    """
+
+    @inject
+    def __init__(self, settings: Settings):
+        """
+        Initializes the ResponseCache.
+
+        :param settings: Provides the cache directory and eviction limits.
+        """
+        self.path = Path(settings.scraper_cache_dir)
+        self.max_age = settings.scraper_cache_max_age_hours * 3600
+        self.max_bytes = settings.scraper_cache_max_mb * 1024 * 1024
+        self.stats = ResponseCacheStats()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, url: str) -> Path:
+        return self.path / f"{self._key(url)}.json"
+
+    def _body_path(self, url: str) -> Path:
+        return self.path / f"{self._key(url)}.body"
+
+    def get_entry(self, url: str) -> CacheEntry | None:
+        try:
+            return CacheEntry.model_validate_json(self._entry_path(url).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url: str) -> dict:
+        """
+        Builds the revalidation headers for a previously cached page.
+        :param url: the full url of the page
+        :return: headers to send with the request, empty when nothing is cached
+        """
+        entry = self.get_entry(url)
+        if entry is None or not self._body_path(url).exists():
+            return {}
+
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, response: httpx.Response) -> CacheResult:
+        """
+        Compares a response with the cache, answering whether the page changed since
+        it was last seen. Nothing is written, the entry to write is returned for
+        commit, so a page whose data fails to save is not reported unchanged later.
+        :param url: the full url of the page
+        :param response: the response to a request sent with conditional_headers
+        :return: the page body, whether it changed and its pending entry
+        :raises httpx.HTTPStatusError: when the response is not a success
+        """
+        entry = self.get_entry(url)
+        body_path = self._body_path(url)
+
+        if response.status_code == 304 and entry is not None and body_path.exists():
+            self.stats.not_modified += 1
+            CACHE_LOOKUPS.inc(("scraper_response", "hit"))
+            return CacheResult(
+                url=url,
+                content=body_path.read_bytes(),
+                changed=False,
+                # revalidated, so it is as fresh as a new copy
+                entry=entry.model_copy(update={"stored_at": time.time()}),
+            )
+
+        # an error page is neither a change nor worth caching
+        response.raise_for_status()
+
+        content = response.content
+        body_hash = hashlib.sha256(content).hexdigest()
+        changed = entry is None or entry.body_hash != body_hash
+        if changed:
+            self.stats.misses += 1
+            CACHE_LOOKUPS.inc(("scraper_response", "miss"))
+        else:
+            self.stats.unchanged += 1
+            CACHE_LOOKUPS.inc(("scraper_response", "hit"))
+
+        return CacheResult(
+            url=url,
+            content=content,
+            changed=changed,
+            entry=CacheEntry(
+                url=url,
+                body_hash=body_hash,
+                stored_at=time.time(),
+                size=len(content),
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+            ),
+        )
+
+    def store_content(self, url: str, content: bytes) -> CacheResult:
+        """
+        Records a page that was not fetched over HTTP, e.g. rendered in a browser.
+        """
+        return self.store(url=url, response=httpx.Response(200, content=content))
+
+    def commit(self, results: list[CacheResult]) -> None:
+        """
+        Writes the pending entries of stored responses, the bodies of changed pages
+        with them, then evicts once for the lot.
+        :param results: what store returned for the pages whose data was saved
+        """
+        for result in results:
+            if result.entry is not None:
+                self._write(
+                    url=result.url,
+                    content=result.content if result.changed else None,
+                    entry=result.entry,
+                )
+        if results:
+            try:
+                self.evict()
+            except OSError as e:
+                self.logger.warning(f"failed to evict cached pages : {e}")
+
+    def _write(self, url: str, content: bytes | None, entry: CacheEntry) -> None:
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            if content is not None:
+                self._body_path(url).write_bytes(content)
+            self._entry_path(url).write_text(entry.model_dump_json())
+        except OSError as e:
+            self.logger.warning(f"failed to cache {url} : {e}")
+
+    def evict(self) -> None:
+        """
+        Drops entries older than the max age, then the oldest entries until the
+        cache fits in the max size.
+        """
+        entries = []
+        for entry_path in self.path.glob("*.json"):
+            try:
+                entries.append(
+                    (entry_path, CacheEntry.model_validate_json(entry_path.read_text()))
+                )
+            except (OSError, ValueError):
+                entry_path.unlink(missing_ok=True)
+
+        now, total = time.time(), sum(entry.size for _, entry in entries)
+        for entry_path, entry in sorted(entries, key=lambda item: item[1].stored_at):
+            if now - entry.stored_at <= self.max_age and total <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            entry_path.with_suffix(".body").unlink(missing_ok=True)
+            total -= entry.size
+            self.stats.evictions += 1
+
+    def log_stats(self) -> None:
+        self.logger.info(
+            f"scraper cache stats: hits={self.stats.hits} {json.dumps(self.stats.model_dump())}"
+        )
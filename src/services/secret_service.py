@@ -1,9 +1,12 @@
 import json
+from functools import cached_property
 
 import boto3
 
 from src.config.base_service import BaseService
+from src.config.settings import SecretBackend
 from src.util.injection import dependency, inject
+from src.util.metrics import OUTBOUND_ERRORS, OUTBOUND_SECONDS
 
 
 @dependency
@@ -16,10 +19,22 @@ class SecretService(BaseService):
     def client(self):
         return boto3.client(service_name="secretsmanager")
 
+    @cached_property
+    def local_secrets(self) -> dict:
+        """
+        Secrets by path from settings.local_secrets_file, used in place of Secrets
+        Manager when settings.secret_backend is local.
+        """
+        with open(self.settings.local_secrets_file) as file:
+            return json.load(file)
+
     def get_secret(self, secret_path):
-        secret_string = self.client.get_secret_value(SecretId=secret_path).get(
-            "SecretString"
-        )
+        if self.settings.secret_backend == SecretBackend.Local:
+            return self.local_secrets[secret_path]
+
+        with OUTBOUND_SECONDS.time(("secrets_manager",), errors=OUTBOUND_ERRORS):
+            secret = self.client.get_secret_value(SecretId=secret_path)
+        secret_string = secret.get("SecretString")
         try:
             return json.loads(secret_string)
         except json.JSONDecodeError:
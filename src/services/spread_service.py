@@ -1,30 +1,64 @@
-from datetime import datetime
+from datetime import datetime, date
+from decimal import Decimal
 
-import pytz
-from peewee import fn, Case, JOIN
+from peewee import fn, Case, JOIN, EXCLUDED, Tuple
+from pydantic import BaseModel
 
-from src.components.results.results_dto import MatchupDto, TeamDto
+from src.components.results.results_dto import MatchupCursor, MatchupDto, TeamDto
 from src.config.base_service import BaseService
 from src.models.new_db_models import (
     SpreadModel,
     GameModel,
     TeamModel,
     SeasonModel,
+    SpreadHistoryModel,
     TeamResultModel,
     WeekModel,
 )
+from src.models.dto.spread_dtos import LineHistoryDto
 from src.services.odds_api_service import (
     OddsApiService,
     OddsDto,
 )
+from src.services.odds_fetch_planner import OddsFetchPlanner
+from src.services.team_result_service import TeamResultService
 from src.util.injection import dependency, inject
+from src.util.kickoff import new_york
+
+_NO_KICKOFF = datetime(9999, 12, 31)
+
+
+class SpreadLoadReport(BaseModel):
+    fetched: bool
+    reason: str
+    games_requested: int = 0
+    requests_spent: int = 0
+    bookmakers_changed: int = 0
+    bookmakers_unchanged: int = 0
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    rows_unchanged: int = 0
+
+    @property
+    def quota_per_change(self) -> float | None:
+        changes = self.rows_inserted + self.rows_updated
+        if not changes:
+            return None
+        return self.requests_spent / changes
 
 
 @dependency
 class SpreadService(BaseService):
     @inject
-    def __init__(self, oddsapi_service: OddsApiService):
+    def __init__(
+        self,
+        oddsapi_service: OddsApiService,
+        fetch_planner: OddsFetchPlanner,
+        team_result_service: TeamResultService,
+    ):
         self.oddsapi_service = oddsapi_service
+        self.fetch_planner = fetch_planner
+        self.team_result_service = team_result_service
 
     def get_spread(self, game_id: int, bookmaker: str) -> SpreadModel:
         self.logger.info(f"fetching spread for game {game_id} and book {bookmaker}")
@@ -32,96 +66,299 @@ class SpreadService(BaseService):
             (SpreadModel.game_id == game_id) & (SpreadModel.bookmaker == bookmaker)
         )
 
-    def load_spreads(self, start_date: datetime, end_date: datetime):
+    def load_spreads(
+        self, start_date: datetime, end_date: datetime
+    ) -> SpreadLoadReport:
         season_model = SeasonModel.get(year=2025)
         self.logger.info(f"using season {season_model}")
 
+        # stage 1: resolve the week's games and the team registry once
+        teams = self._resolve_teams()
+        games = self._resolve_games(
+            season=season_model, start_date=start_date, end_date=end_date
+        )
+
+        # stage 2: plan the request before spending any quota
+        plan = self.fetch_planner.plan(games=list(games.values()))
+        self.logger.info(f"odds fetch plan = {plan}")
+        if not plan.fetch:
+            return SpreadLoadReport(fetched=False, reason=plan.reason)
+
         response: list[OddsDto] = self.oddsapi_service.fetch_odds(
-            start_date=start_date, end_date=end_date
+            start_date=start_date,
+            end_date=end_date,
+            bookmakers=plan.bookmakers,
+            event_ids=plan.event_ids,
         )
         self.logger.info(f"found {len(response)} odds marker")
 
-        for item in response:
-            # parse cities and team names
-            home_city, home_team_name = item.home_team.rsplit(" ", 1)
-            away_city, away_team_name = item.away_team.rsplit(" ", 1)
-            self.logger.info(f"found matchup {home_city} vs {away_city}")
-
-            # load team models
-            home_team_model = TeamModel.get(city=home_city, name=home_team_name)
-            away_team_model = TeamModel.get(city=away_city, name=away_team_name)
-            self.logger.info(
-                f"found matchup models {home_team_model} vs {away_team_model}"
-            )
+        report = SpreadLoadReport(
+            fetched=True,
+            reason=plan.reason,
+            games_requested=len(plan.due_game_ids),
+            requests_spent=self.fetch_planner.requests_spent(),
+        )
+
+        # stage 3: flatten the response into incoming lines
+        matched_games, lines = self._collect_lines(
+            response=response,
+            teams=teams,
+            games=games,
+            due_game_ids=set(plan.due_game_ids),
+            report=report,
+        )
+
+        # stage 4: diff against what is stored
+        stored = self._load_stored_lines(game_ids=[game.id for game in games.values()])
+        changes = []
+        for key, spread_value in lines.items():
+            if key not in stored:
+                report.rows_inserted += 1
+            elif stored[key] != spread_value:
+                report.rows_updated += 1
+            else:
+                report.rows_unchanged += 1
+                continue
+            changes.append(key + (spread_value,))
 
-            # parse tz
-            new_york = pytz.timezone("America/New_York")
-            start_time = item.start_time.astimezone(new_york)
-
-            # create the game model
-            try:
-                game = GameModel.get(
-                    season=season_model,
-                    home_team=home_team_model,
-                    away_team=away_team_model,
-                    start_date=start_time.replace(tzinfo=None).date(),
+        # stage 5: apply everything in one transaction, recording line movement
+        now = datetime.now()
+        with SpreadModel._meta.database.atomic():
+            if matched_games:
+                GameModel.bulk_update(matched_games, fields=[GameModel.oddsapi_id])
+            if changes:
+                self._upsert_lines(changes=changes, now=now)
+                self._append_history(
+                    changes=changes,
+                    week_ids={game.id: game.week_id for game in games.values()},
+                    now=now,
                 )
-            except Exception:
+
+        self.fetch_planner.mark_fetched(game_ids=plan.due_game_ids)
+        self.fetch_planner.save_state()
+
+        self.logger.info(
+            f"spread load report = {report}, quota per change = {report.quota_per_change}"
+        )
+        return report
+
+    @staticmethod
+    def _resolve_teams() -> dict[str, TeamModel]:
+        """
+        Maps every team by the full name the Odds API uses, e.g. "Kansas City Chiefs".
+        """
+        return {team.full_name: team for team in TeamModel.select()}
+
+    @staticmethod
+    def _resolve_games(
+        season: SeasonModel, start_date: datetime, end_date: datetime
+    ) -> dict[tuple[int, int, date], GameModel]:
+        """
+        Maps the games in the window by (home team id, away team id, start date).
+        """
+        games = GameModel.select().where(
+            (GameModel.season == season)
+            & (GameModel.start_date >= start_date)
+            & (GameModel.start_date <= end_date)
+        )
+        return {
+            (game.home_team_id, game.away_team_id, game.start_date): game
+            for game in games
+        }
+
+    def _collect_lines(
+        self,
+        response: list[OddsDto],
+        teams: dict[str, TeamModel],
+        games: dict[tuple[int, int, date], GameModel],
+        due_game_ids: set[int],
+        report: SpreadLoadReport,
+    ) -> tuple[list[GameModel], dict[tuple[int, int, str], Decimal]]:
+        """
+        Matches odds items to games and flattens the changed bookmakers into
+        lines keyed by (game id, team id, bookmaker).
+        """
+        matched_games, lines = [], {}
+
+        for item in response:
+            home_team = teams.get(item.home_team)
+            away_team = teams.get(item.away_team)
+            if not home_team or not away_team:
+                self.logger.info(
+                    f"failed to find teams {item.home_team} vs {item.away_team}"
+                )
+                continue
+
+            start_date = item.start_time.astimezone(new_york).date()
+            game = games.get((home_team.id, away_team.id, start_date))
+            if game is None:
                 self.logger.info(
-                    f"failed to find game {season_model.year} {home_team_name} vs {away_team_name}"
+                    f"failed to find game {item.home_team} vs {item.away_team} on {start_date}"
                 )
                 continue
 
-            game.oddsapi_id = item.game_id
-            game.save()
-
-            self.logger.info(f"found {len(item.bookmakers)} bookmakers")
-            for spread in item.bookmakers:
-                self.logger.info(f"spread = {spread}")
-
-                for outcome in spread.markets[0].outcomes:
-                    self.logger.info(f"outcome = {outcome}")
-
-                    if outcome.name == game.home_team.full_name:
-                        self.logger.info(
-                            f"setting home lines for spread, game = {game.oddsapi_id}"
-                        )
-
-                        # home team spread
-                        home_spread_model: SpreadModel
-                        home_spread_model, _ = SpreadModel.get_or_create(
-                            bookmaker=spread.title,
-                            game=game,
-                            team=game.home_team,
-                            defaults={"spread_value": 0},
-                        )
-                        home_spread_model.spread_value = outcome.point
-                        home_spread_model.save()
-
-                        self.logger.info(
-                            f"updated spread for {home_spread_model} {game} {spread}"
-                        )
-                    elif outcome.name == game.away_team.full_name:
-                        self.logger.info(
-                            f"setting away lines for spread, game = {game.oddsapi_id}"
-                        )
-
-                        # away team spread
-                        away_spread_model: SpreadModel
-                        away_spread_model, _ = SpreadModel.get_or_create(
-                            bookmaker=spread.title,
-                            game=game,
-                            team=game.away_team,
-                            defaults={"spread_value": 0},
-                        )
-                        away_spread_model.spread_value = outcome.point
-                        away_spread_model.save()
-
-                        self.logger.info(
-                            f"updated spread for {away_spread_model} {game} {spread}"
-                        )
+            if game.id not in due_game_ids:
+                # discovery requests return every event, only ingest the due ones
+                continue
 
-    async def get_matchup_data(self, year: int, week: int, bookmaker: str):
+            if game.oddsapi_id != item.game_id:
+                game.oddsapi_id = item.game_id
+                matched_games.append(game)
+
+            side_teams = {
+                home_team.full_name: home_team,
+                away_team.full_name: away_team,
+            }
+            for bookmaker in item.bookmakers:
+                if not self.fetch_planner.has_changed(
+                    game_id=game.id,
+                    bookmaker=bookmaker.key,
+                    last_update=bookmaker.last_update,
+                ):
+                    report.bookmakers_unchanged += 1
+                    continue
+                report.bookmakers_changed += 1
+
+                for market in bookmaker.markets:
+                    for outcome in market.outcomes:
+                        team = side_teams.get(outcome.name)
+                        if team is None or outcome.point is None:
+                            continue
+                        key = (game.id, team.id, bookmaker.title)
+                        lines[key] = Decimal(str(outcome.point))
+
+                self.fetch_planner.mark_seen(
+                    game_id=game.id,
+                    bookmaker=bookmaker.key,
+                    last_update=bookmaker.last_update,
+                )
+
+        return matched_games, lines
+
+    @staticmethod
+    def _load_stored_lines(game_ids: list[int]) -> dict[tuple[int, int, str], Decimal]:
+        if not game_ids:
+            return {}
+        query = SpreadModel.select(
+            SpreadModel.game,
+            SpreadModel.team,
+            SpreadModel.bookmaker,
+            SpreadModel.spread_value,
+        ).where(SpreadModel.game << game_ids)
+        return {
+            (row["game"], row["team"], row["bookmaker"]): Decimal(row["spread_value"])
+            for row in query.dicts()
+        }
+
+    @staticmethod
+    def _upsert_lines(
+        changes: list[tuple[int, int, str, Decimal]], now: datetime
+    ) -> None:
+        SpreadModel.insert_many(
+            [
+                {
+                    SpreadModel.game: game_id,
+                    SpreadModel.team: team_id,
+                    SpreadModel.bookmaker: bookmaker,
+                    SpreadModel.spread_value: spread_value,
+                    SpreadModel.created_at: now,
+                    SpreadModel.updated_at: now,
+                }
+                for game_id, team_id, bookmaker, spread_value in changes
+            ]
+        ).on_conflict(
+            conflict_target=[SpreadModel.game, SpreadModel.team, SpreadModel.bookmaker],
+            update={
+                SpreadModel.spread_value: EXCLUDED.spread_value,
+                SpreadModel.updated_at: EXCLUDED.updated_at,
+            },
+        ).execute()
+
+    @staticmethod
+    def _append_history(
+        changes: list[tuple[int, int, str, Decimal]],
+        week_ids: dict[int, int],
+        now: datetime,
+    ) -> None:
+        """
+        Appends the changed lines to the line history, unchanged lines never reach here.
+        """
+        SpreadHistoryModel.insert_many(
+            [
+                {
+                    SpreadHistoryModel.game: game_id,
+                    SpreadHistoryModel.week: week_ids[game_id],
+                    SpreadHistoryModel.team: team_id,
+                    SpreadHistoryModel.bookmaker: bookmaker,
+                    SpreadHistoryModel.spread_value: spread_value,
+                    SpreadHistoryModel.recorded_at: now,
+                    SpreadHistoryModel.created_at: now,
+                    SpreadHistoryModel.updated_at: now,
+                }
+                for game_id, team_id, bookmaker, spread_value in changes
+            ]
+        ).execute()
+
+    def get_line_history(
+        self, year: int, week: int, bookmaker: str
+    ) -> list[LineHistoryDto]:
+        """
+        Returns the line movement of every game in the week for one bookmaker.
+
+        :param year: The season year.
+        :param week: The week number.
+        :param bookmaker: The bookmaker title, e.g. "DraftKings".
+        :return: One LineHistoryDto per game with at least one recorded line.
+        """
+        self.logger.info(f"fetching line history for {year} week {week} {bookmaker}")
+        query = (
+            SpreadHistoryModel.select(
+                SpreadHistoryModel.game.alias("game_id"),
+                SpreadHistoryModel.team.alias("team_id"),
+                SpreadHistoryModel.spread_value,
+                SpreadHistoryModel.recorded_at,
+                GameModel.home_team.alias("home_team_id"),
+                GameModel.away_team.alias("away_team_id"),
+            )
+            .join(WeekModel, on=(SpreadHistoryModel.week == WeekModel.id))
+            .join(SeasonModel, on=(WeekModel.season == SeasonModel.id))
+            .join(GameModel, on=(SpreadHistoryModel.game == GameModel.id))
+            .where(
+                (SeasonModel.year == year)
+                & (WeekModel.week_number == week)
+                & (SpreadHistoryModel.bookmaker == bookmaker)
+            )
+            .order_by(SpreadHistoryModel.game, SpreadHistoryModel.recorded_at)
+        )
+
+        history: dict[int, LineHistoryDto] = {}
+        for row in query.dicts():
+            series = history.get(row["game_id"])
+            if series is None:
+                series = history[row["game_id"]] = LineHistoryDto(
+                    game_id=row["game_id"],
+                    home_team_id=row["home_team_id"],
+                    away_team_id=row["away_team_id"],
+                )
+
+            # both sides of a snapshot share recorded_at, a side that did not
+            # move carries its previous value forward
+            if not series.timestamps or series.timestamps[-1] != row["recorded_at"]:
+                series.timestamps.append(row["recorded_at"])
+                series.home.append(series.home[-1] if series.home else None)
+                series.away.append(series.away[-1] if series.away else None)
+
+            side = series.home if row["team_id"] == row["home_team_id"] else series.away
+            side[-1] = float(row["spread_value"])
+
+        return list(history.values())
+
+    @staticmethod
+    def _matchup_query(year: int, week: int, bookmaker: str):
+        """
+        One row per game of the week, with both teams, their results and the
+        bookmaker's lines. Games the bookmaker has no line for are kept.
+        """
         # define aliased
         home_team_alias = TeamModel.alias("home_team")
         away_team_alias = TeamModel.alias("away_team")
@@ -148,14 +385,6 @@ class SpreadService(BaseService):
                 away_team_alias.thumbnail.alias("away_team_thumbnail"),
                 away_team_alias.primary_color.alias("away_team_primary"),
                 away_team_alias.secondary_color.alias("away_team_secondary"),
-                fn.COUNT(home_result_alias.team_id).alias("home_team_games_played"),
-                fn.SUM(Case(None, [(home_result_alias.win, 1)], 0)).alias(
-                    "home_team_wins"
-                ),
-                fn.COUNT(away_result_alias.team_id).alias("away_team_games_played"),
-                fn.SUM(Case(None, [(away_result_alias.win, 1)], 0)).alias(
-                    "away_team_wins"
-                ),
                 home_result_alias.points_scored.alias("home_team_points_scored"),
                 home_result_alias.points_allowed.alias("home_team_points_allowed"),
                 home_result_alias.home.alias("home_team_is_home"),
@@ -209,13 +438,15 @@ class SpreadService(BaseService):
                     & (away_result_alias.team == away_team_alias.id)
                 ),
             )
-            .join(SpreadModel, JOIN.LEFT_OUTER, on=(GameModel.id == SpreadModel.game))
-            .where(
-                WeekModel.week_number == week,
-                SeasonModel.year == year,
-                (SpreadModel.bookmaker == bookmaker)
-                | (SpreadModel.bookmaker.is_null(True)),
+            .join(
+                SpreadModel,
+                JOIN.LEFT_OUTER,
+                on=(
+                    (GameModel.id == SpreadModel.game)
+                    & (SpreadModel.bookmaker == bookmaker)
+                ),
             )
+            .where(WeekModel.week_number == week, SeasonModel.year == year)
             .group_by(
                 GameModel.id,
                 GameModel.start_date,
@@ -242,11 +473,75 @@ class SpreadService(BaseService):
                 away_result_alias.home,
                 WeekModel.week_number,
             )
-            .order_by(GameModel.start_date, GameModel.start_time)
         )
+        return games
 
-        # Return as dictionary list for further processing
-        return self._convert_to_dtos(list(games.dicts()))
+    def _with_records(self, games: list[dict], year: int, week: int) -> list[dict]:
+        # records only count the weeks before this one, aggregated in one query
+        records = self.team_result_service.get_records(year=year, before_week=week)
+        for game in games:
+            for side in ("home", "away"):
+                record = records.get(game[f"{side}_team_id"], {})
+                for key in (
+                    "games_played",
+                    "wins",
+                    "covers",
+                    "home_wins",
+                    "home_losses",
+                    "away_wins",
+                    "away_losses",
+                ):
+                    game[f"{side}_team_{key}"] = record.get(key) or 0
+        return games
+
+    async def get_matchup_data(self, year: int, week: int, bookmaker: str):
+        games = self._matchup_query(year=year, week=week, bookmaker=bookmaker)
+        games = list(games.order_by(GameModel.start_date, GameModel.start_time).dicts())
+        return self._convert_to_dtos(self._with_records(games, year=year, week=week))
+
+    async def get_matchup_page(
+        self,
+        year: int,
+        week: int,
+        bookmaker: str,
+        page_size: int,
+        cursor: MatchupCursor | None = None,
+        page: int = 1,
+    ) -> tuple[list[MatchupDto], MatchupCursor | None]:
+        """
+        A page of the week's matchups, ordered by kickoff then game id. Pages are read
+        with a keyset on that order, one row per game whatever the size of the league.
+
+        :param page_size: The maximum number of matchups returned.
+        :param cursor: The cursor returned with the previous page.
+        :param page: Without a cursor, the page to start from.
+        :return: The matchups and the cursor of the next page, None on the last page.
+        """
+        # games without a kickoff yet sort last
+        kickoff = fn.COALESCE(GameModel.kickoff, _NO_KICKOFF)
+        games = self._matchup_query(
+            year=year, week=week, bookmaker=bookmaker
+        ).select_extend(GameModel.kickoff)
+        if cursor is not None:
+            games = games.where(
+                Tuple(kickoff, GameModel.id)
+                > Tuple(cursor.kickoff or _NO_KICKOFF, cursor.game_id)
+            )
+        else:
+            # a week has at most 16 games, skipping ahead is cheap
+            games = games.offset((page - 1) * page_size)
+        games = list(games.order_by(kickoff, GameModel.id).limit(page_size + 1).dicts())
+
+        next_cursor = None
+        if len(games) > page_size:
+            games = games[:page_size]
+            next_cursor = MatchupCursor(
+                kickoff=games[-1]["kickoff"], game_id=games[-1]["game_id"]
+            )
+        matchups = self._convert_to_dtos(
+            self._with_records(games, year=year, week=week)
+        )
+        return matchups, next_cursor
 
     @classmethod
     def calculate_losses(cls, team_results):
@@ -295,20 +590,20 @@ class SpreadService(BaseService):
                     ats={
                         game[
                             "home_team_name"
-                        ]: f"{game.get('home_team_cover', 0)}-{game.get('home_team_not_cover', 0)}",
+                        ]: f"{game['home_team_covers']}-{game['home_team_games_played'] - game['home_team_covers']}",
                         game[
                             "away_team_name"
-                        ]: f"{game.get('away_team_cover', 0)}-{game.get('away_team_not_cover', 0)}",
+                        ]: f"{game['away_team_covers']}-{game['away_team_games_played'] - game['away_team_covers']}",
                     },
                     home_record={
                         game[
                             "home_team_name"
-                        ]: f"{game.get('home_team_home_wins', 0)}-{game.get('home_team_home_losses', 0)}"
+                        ]: f"{game['home_team_home_wins']}-{game['home_team_home_losses']}"
                     },
                     away_record={
                         game[
                             "away_team_name"
-                        ]: f"{game.get('away_team_home_wins', 0)}-{game.get('away_team_home_losses', 0)}"
+                        ]: f"{game['away_team_away_wins']}-{game['away_team_away_losses']}"
                     },
                     lines=(
                         {
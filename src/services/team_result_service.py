@@ -0,0 +1,167 @@
+from datetime import datetime
+
+from peewee import EXCLUDED, JOIN, Case, Value, fn
+
+from src.config.base_service import BaseService
+from src.models.new_db_models import (
+    GameModel,
+    GameResultModel,
+    SeasonModel,
+    SpreadModel,
+    TeamResultModel,
+    WeekModel,
+)
+from src.util.injection import dependency, inject
+
+
+@dependency
+class TeamResultService(BaseService):
+    """
+    Derives both teams' TeamResultModel rows from the game results and the closing
+    lines, entirely in SQL: one INSERT ... SELECT ... ON CONFLICT per side.
+    """
+
+    @inject
+    def __init__(self):
+        """
+        Initializes the TeamResultService.
+        """
+        self.bookmaker = self.settings.closing_line_bookmaker
+
+    def _side_query(self, home: bool, where, now: datetime):
+        """
+        Selects one TeamResultModel row per finished game for the home or away side.
+        Without a line for the bookmaker, cover falls back to the straight up result.
+        """
+        team = GameModel.home_team if home else GameModel.away_team
+        scored = GameResultModel.home_score if home else GameResultModel.away_score
+        allowed = GameResultModel.away_score if home else GameResultModel.home_score
+        spread = fn.COALESCE(SpreadModel.spread_value, 0)
+
+        return (
+            GameModel.select(
+                GameModel.id,
+                GameModel.season,
+                team,
+                Value(home),
+                Case(None, [(scored > allowed, True)], False),
+                Case(None, [(scored + spread > allowed, True)], False),
+                scored,
+                allowed,
+                Value(now),
+                Value(TeamResultModel.system_user),
+                Value(now),
+                Value(TeamResultModel.system_user),
+            )
+            .join(GameResultModel, on=(GameResultModel.game == GameModel.id))
+            .join(
+                SpreadModel,
+                JOIN.LEFT_OUTER,
+                on=(
+                    (SpreadModel.game == GameModel.id)
+                    & (SpreadModel.team == team)
+                    & (SpreadModel.bookmaker == self.bookmaker)
+                ),
+            )
+            .where(where)
+        )
+
+    def _derive(self, where) -> int:
+        now = datetime.now()
+        rows = 0
+        with TeamResultModel._meta.database.atomic():
+            for home in (True, False):
+                rows += (
+                    TeamResultModel.insert_from(
+                        self._side_query(home=home, where=where, now=now),
+                        fields=[
+                            TeamResultModel.game,
+                            TeamResultModel.season,
+                            TeamResultModel.team,
+                            TeamResultModel.home,
+                            TeamResultModel.win,
+                            TeamResultModel.cover,
+                            TeamResultModel.points_scored,
+                            TeamResultModel.points_allowed,
+                            TeamResultModel.created_at,
+                            TeamResultModel.created_by,
+                            TeamResultModel.updated_at,
+                            TeamResultModel.updated_by,
+                        ],
+                    )
+                    .on_conflict(
+                        conflict_target=[TeamResultModel.game, TeamResultModel.team],
+                        update={
+                            TeamResultModel.home: EXCLUDED.home,
+                            TeamResultModel.win: EXCLUDED.win,
+                            TeamResultModel.cover: EXCLUDED.cover,
+                            TeamResultModel.points_scored: EXCLUDED.points_scored,
+                            TeamResultModel.points_allowed: EXCLUDED.points_allowed,
+                            TeamResultModel.updated_at: EXCLUDED.updated_at,
+                        },
+                    )
+                    .as_rowcount()
+                    .execute()
+                )
+        return rows
+
+    def derive_for_games(self, game_ids: list[int]) -> int:
+        """
+        Derives the team results of the given games, call after their results land.
+
+        :param game_ids: The games whose results were created or updated.
+        :return: The number of team result rows written.
+        """
+        if not game_ids:
+            return 0
+        rows = self._derive(where=GameModel.id << game_ids)
+        self.logger.info(f"derived {rows} team results for {len(game_ids)} games")
+        return rows
+
+    def backfill_season(self, year: int) -> int:
+        """
+        Derives the team results of every finished game in a season.
+
+        :param year: The season year.
+        :return: The number of team result rows written.
+        """
+        season = SeasonModel.select(SeasonModel.id).where(SeasonModel.year == year)
+        rows = self._derive(where=GameModel.season << season)
+        self.logger.info(f"derived {rows} team results for season {year}")
+        return rows
+
+    @staticmethod
+    def get_records(year: int, before_week: int) -> dict[int, dict]:
+        """
+        Aggregates every team's record, ATS record and home / away splits over the
+        weeks of a season before the given week, in a single grouped query.
+
+        :param year: The season year.
+        :param before_week: Only games of earlier weeks are counted.
+        :return: Counters keyed by team id.
+        """
+
+        def count(condition):
+            return fn.SUM(Case(None, [(condition, 1)], 0))
+
+        won, home = TeamResultModel.win == True, TeamResultModel.home == True
+        query = (
+            TeamResultModel.select(
+                TeamResultModel.team.alias("team_id"),
+                fn.COUNT(TeamResultModel.id).alias("games_played"),
+                count(won).alias("wins"),
+                count(TeamResultModel.cover == True).alias("covers"),
+                count(home & won).alias("home_wins"),
+                count(home & (TeamResultModel.win == False)).alias("home_losses"),
+                count((TeamResultModel.home == False) & won).alias("away_wins"),
+                count(
+                    (TeamResultModel.home == False) & (TeamResultModel.win == False)
+                ).alias("away_losses"),
+            )
+            .join(GameModel, on=(TeamResultModel.game == GameModel.id))
+            .join(WeekModel, on=(GameModel.week == WeekModel.id))
+            .join(SeasonModel, on=(TeamResultModel.season == SeasonModel.id))
+            .where((SeasonModel.year == year) & (WeekModel.week_number < before_week))
+            .group_by(TeamResultModel.team)
+        )
+        return {row["team_id"]: row for row in query.dicts()}
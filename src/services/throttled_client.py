@@ -1,43 +1,379 @@
-from typing import Optional
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import cached_property
 
 import httpx
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.config.base_service import BaseService
+from src.config.settings import Settings
 from src.util.injection import dependency, inject
-from queue import Queue
+from src.util.metrics import OUTBOUND_ERRORS, OUTBOUND_SECONDS, outbound_service
 
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
 
-class Request(BaseModel):
-    method: str
-    url: str
-    params: Optional[dict] = None
-    data: Optional[dict] = None
-    headers: Optional[dict] = None
+
+class HostPolicy(BaseModel):
+    requests_per_second: float
+    burst: int = 1
+    max_in_flight: int
+
+
+class HostMetrics(BaseModel):
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    throttled_seconds: float = 0
+    request_seconds: float = 0
+    statuses: dict[int, int] = Field(default_factory=dict)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at rate tokens per second, holding at most burst tokens.
+    Tokens are reserved up front, so callers sleep for their own slot without
+    holding the lock, from threads or coroutines alike.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token.
+        :return: seconds to wait before the token may be used
+        """
+        if self.rate <= 0:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+class _Host:
+    def __init__(self, policy: HostPolicy, service: str):
+        self.policy = policy
+        self.service = (service,)
+        self.bucket = TokenBucket(rate=policy.requests_per_second, burst=policy.burst)
+        self.slots = threading.BoundedSemaphore(policy.max_in_flight)
+        self.metrics = HostMetrics()
+        self._lock = threading.Lock()
+
+    def track(self, **deltas) -> None:
+        with self._lock:
+            for field, delta in deltas.items():
+                setattr(self.metrics, field, getattr(self.metrics, field) + delta)
+
+    def track_failure(self) -> None:
+        self.track(failures=1)
+        OUTBOUND_ERRORS.inc(self.service)
+
+    def track_response(self, response: httpx.Response, elapsed: float) -> None:
+        OUTBOUND_SECONDS.observe(elapsed, self.service)
+        if response.status_code >= 500:
+            OUTBOUND_ERRORS.inc(self.service)
+        with self._lock:
+            metrics = self.metrics
+            metrics.requests += 1
+            metrics.request_seconds += elapsed
+            metrics.statuses[response.status_code] = (
+                metrics.statuses.get(response.status_code, 0) + 1
+            )
 
 
 @dependency
-class BufferedClient(BaseService):
+class ThrottledClient(BaseService):
+    """
+    Shared HTTP client for every outbound integration. Requests are throttled per
+    host by a token bucket and a cap on requests in flight, retried with exponential
+    backoff on transport errors and retryable statuses, and sent over one pooled
+    connection per host. Per host metrics are kept for every request.
+    """
+
     @inject
-    def __init__(self, base_url: str):
-        self.request_queue = Queue()
-        self.base_url = base_url
+    def __init__(
+        self,
+        settings: Settings,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """
+        Initializes the ThrottledClient.
+
+        :param settings: Provides the default host policy, retry and timeout settings.
+        :param transport: Replaces the network transport of the sync client.
+        :param async_transport: Replaces the network transport of async sessions.
+        """
+        self.default_policy = HostPolicy(
+            requests_per_second=settings.http_requests_per_second,
+            burst=settings.http_burst,
+            max_in_flight=settings.http_max_in_flight,
+        )
+        self.timeout = settings.http_timeout_seconds
+        self.max_retries = settings.http_max_retries
+        self.backoff = settings.http_backoff_seconds
+        self.max_backoff = settings.http_max_backoff_seconds
+        self.queue_workers = settings.http_queue_workers
+        self.transport = transport
+        self.async_transport = async_transport
+        self._hosts: dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    @cached_property
+    def client(self) -> httpx.Client:
+        return httpx.Client(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=20),
+            transport=self.transport,
+        )
+
+    @cached_property
+    def _executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.queue_workers, thread_name_prefix="throttled-client"
+        )
+
+    def configure_host(
+        self,
+        host: str,
+        requests_per_second: float | None = None,
+        burst: int | None = None,
+        max_in_flight: int | None = None,
+    ) -> HostPolicy:
+        """
+        Overrides the default policy for a host, keeping its metrics.
+        :param host: the host name, e.g. www.espn.com
+        :return: the policy now applied to the host
+        """
+        with self._lock:
+            current = self._hosts.get(host)
+            policy = (current.policy if current else self.default_policy).model_copy(
+                update={
+                    key: value
+                    for key, value in {
+                        "requests_per_second": requests_per_second,
+                        "burst": burst,
+                        "max_in_flight": max_in_flight,
+                    }.items()
+                    if value is not None
+                }
+            )
+            if current is None or policy != current.policy:
+                host_state = _Host(policy=policy, service=outbound_service(host))
+                if current is not None:
+                    host_state.metrics = current.metrics
+                self._hosts[host] = host_state
+            return policy
+
+    def _host(self, url: str) -> _Host:
+        host = httpx.URL(url).host
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _Host(
+                    policy=self.default_policy, service=outbound_service(host)
+                )
+            return self._hosts[host]
+
+    def _retry_delay(
+        self,
+        method: str,
+        attempt: int,
+        retry: bool | None,
+        response: httpx.Response | None = None,
+    ) -> float | None:
+        """
+        Decides whether a failed attempt is retried.
+        :return: seconds to wait before the next attempt, None to give up
+        """
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        if not retry or attempt >= self.max_retries:
+            return None
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            return None
+
+        delay = self.backoff * 2**attempt
+        if response is not None and (
+            retry_after := response.headers.get("retry-after")
+        ):
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return min(self.max_backoff, delay) * random.uniform(0.8, 1.2)
+
+    def request(
+        self, method: str, url: str, retry: bool | None = None, **kwargs
+    ) -> httpx.Response:
+        """
+        Sends a request through the host's throttle, retrying failed attempts.
+        :param method: the http method
+        :param url: the full url
+        :param retry: whether to retry, defaults to retrying idempotent methods
+        :param kwargs: passed on to httpx, e.g. params, headers or json
+        :return: the last response, errors are left to the caller
+        """
+        host = self._host(url)
+        attempt = 0
+        while True:
+            with host.slots:
+                if delay := host.bucket.reserve():
+                    host.track(throttled_seconds=delay)
+                    time.sleep(delay)
+
+                host.track(in_flight=1)
+                start = time.perf_counter()
+                try:
+                    response = self.client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    host.track_failure()
+                    if (delay := self._retry_delay(method, attempt, retry)) is None:
+                        raise e
+                    response = None
+                    self.logger.info(f"{method} {url} failed, retrying : {e}")
+                else:
+                    host.track_response(response, time.perf_counter() - start)
+                    delay = self._retry_delay(method, attempt, retry, response)
+                    if delay is None:
+                        return response
+                    self.logger.info(
+                        f"{method} {url} returned {response.status_code}, retrying"
+                    )
+                finally:
+                    host.track(in_flight=-1)
+
+            if response is not None:
+                response.close()
+            host.track(retries=1)
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def submit(self, method: str, url: str, **kwargs) -> Future:
+        """
+        Queues a request for a worker thread, for callers that fan out without an
+        event loop. The host throttle still applies, so queued requests wait their turn.
+        :return: Future resolving to the response
+        """
+        host = self._host(url)
+        host.track(queued=1)
+
+        def send() -> httpx.Response:
+            host.track(queued=-1)
+            return self.request(method, url, **kwargs)
+
+        return self._executor.submit(send)
+
+    @asynccontextmanager
+    async def async_session(self):
+        """
+        Opens an async session sharing this client's throttles and metrics. Async
+        connections are bound to the running event loop, so they are pooled per session.
+        """
+        async with httpx.AsyncClient(
+            timeout=self.timeout, transport=self.async_transport
+        ) as client:
+            yield AsyncThrottledSession(throttled_client=self, client=client)
+
+    def metrics(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                host: {
+                    **state.policy.model_dump(),
+                    **state.metrics.model_copy(deep=True).model_dump(),
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+class AsyncThrottledSession:
+    def __init__(self, throttled_client: ThrottledClient, client: httpx.AsyncClient):
+        self.throttled_client = throttled_client
+        self.client = client
+        self._slots: dict[str, asyncio.Semaphore] = {}
 
-    @property
-    def _client(self):
-        return httpx.Client(base_url=self.base_url)
+    def _slot(self, url: str, host: _Host) -> asyncio.Semaphore:
+        key = httpx.URL(url).host
+        if key not in self._slots:
+            self._slots[key] = asyncio.Semaphore(host.policy.max_in_flight)
+        return self._slots[key]
 
-    def _request(self, request: Request):
-        self.request_queue.put(request)
+    async def request(
+        self, method: str, url: str, retry: bool | None = None, **kwargs
+    ) -> httpx.Response:
+        """
+        Async counterpart of ThrottledClient.request.
+        """
+        throttled_client = self.throttled_client
+        host = throttled_client._host(url)
+        attempt = 0
+        while True:
+            async with self._slot(url, host):
+                if delay := host.bucket.reserve():
+                    host.track(throttled_seconds=delay)
+                    await asyncio.sleep(delay)
 
-    def get(self, *args, **kwargs):
-        return self._request()
+                host.track(in_flight=1)
+                start = time.perf_counter()
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    host.track_failure()
+                    delay = throttled_client._retry_delay(method, attempt, retry)
+                    if delay is None:
+                        raise e
+                    response = None
+                    throttled_client.logger.info(
+                        f"{method} {url} failed, retrying : {e}"
+                    )
+                else:
+                    host.track_response(response, time.perf_counter() - start)
+                    delay = throttled_client._retry_delay(
+                        method, attempt, retry, response
+                    )
+                    if delay is None:
+                        return response
+                    throttled_client.logger.info(
+                        f"{method} {url} returned {response.status_code}, retrying"
+                    )
+                finally:
+                    host.track(in_flight=-1)
 
-    def post(self):
-        return self._request()
+            if response is not None:
+                await response.aclose()
+            host.track(retries=1)
+            attempt += 1
+            await asyncio.sleep(delay)
 
-    def put(self):
-        return self._request()
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
 
-    def delete(self):
-        return self._request()
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
@@ -0,0 +1,78 @@
+import time
+
+from peewee import JOIN, fn
+
+from src.config.base_service import BaseService
+from src.models.new_db_models import (
+    GameModel,
+    GameResultModel,
+    SeasonModel,
+    WeekModel,
+)
+from src.util.injection import dependency, inject
+from src.util.metrics import CACHE_LOOKUPS
+
+
+@dependency
+class WeekFinalityService(BaseService):
+    """
+    Tells whether a week is over: it has games and every one has a final result.
+    Standings, pick history and matchup records of a week are built from all the
+    weeks before it, so a week only counts as final once every week up to it is.
+
+    Final weeks are remembered for the life of the process, open weeks are
+    checked again after open_ttl_seconds.
+    """
+
+    @inject
+    def __init__(self):
+        """
+        Initializes the WeekFinalityService.
+        """
+        self.open_ttl_seconds = self.settings.cache_open_max_age_seconds
+        self._final: set[tuple[int, int]] = set()
+        self._open: dict[tuple[int, int], float] = {}
+
+    @staticmethod
+    def _query_final_through(year: int, week: int) -> bool:
+        games, results, weeks = (
+            GameModel.select(
+                fn.COUNT(GameModel.id),
+                fn.COUNT(GameResultModel.id),
+                fn.COUNT(WeekModel.id.distinct()),
+            )
+            .join(WeekModel, on=(GameModel.week == WeekModel.id))
+            .join(SeasonModel, on=(GameModel.season == SeasonModel.id))
+            .join(
+                GameResultModel,
+                JOIN.LEFT_OUTER,
+                on=(GameResultModel.game == GameModel.id),
+            )
+            .where((SeasonModel.year == year) & (WeekModel.week_number <= week))
+            .tuples()
+            .get()
+        )
+        return games > 0 and games == results and weeks == week
+
+    def is_final_through(self, year: int, week: int) -> bool:
+        """
+        :param year: The season year.
+        :param week: The week number.
+        :return: True when every game of weeks 1 through week has a result.
+        """
+        key = (year, week)
+        if key in self._final:
+            CACHE_LOOKUPS.inc(("week_finality", "hit"))
+            return True
+        if self._open.get(key, 0) > time.monotonic():
+            CACHE_LOOKUPS.inc(("week_finality", "hit"))
+            return False
+
+        CACHE_LOOKUPS.inc(("week_finality", "miss"))
+        if self._query_final_through(year=year, week=week):
+            # every earlier week is final too
+            self._final.update((year, earlier) for earlier in range(1, week + 1))
+            self._open.pop(key, None)
+            return True
+        self._open[key] = time.monotonic() + self.open_ttl_seconds
+        return False
@@ -9,3 +9,11 @@ class DependencyCache:
         instance = dep()
         cls._cache[dep.__name__] = instance
         return instance
+
+    @classmethod
+    def register(cls, dep, instance):
+        """
+        Makes instance the one injected wherever dep is, e.g. a stand-in for a
+        service that reaches out to AWS. Register before anything resolves dep.
+        """
+        cls._cache[dep.__name__] = instance
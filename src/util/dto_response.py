@@ -0,0 +1,19 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class DtoResponse(JSONResponse):
+    """
+    Serializes DTOs built and validated by our own services straight to JSON with
+    pydantic's serializer, camelCase aliases included.
+
+    Returning a Response from a route skips FastAPI's response_model handling, which
+    would otherwise dump every DTO to python objects, validate them again against the
+    response_model and encode the result. Keep response_model on the route so the
+    OpenAPI schema still describes the body.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content, by_alias=True)
@@ -0,0 +1,31 @@
+from datetime import date, datetime, time
+
+import pytz
+
+# game start dates and times are stored as New York wall clock values
+new_york = pytz.timezone("America/New_York")
+
+
+def kickoff_utc(start_date: date | None, start_time: time | None) -> datetime | None:
+    """
+    Kickoff of a game starting at the given New York date and time, as a naive UTC
+    datetime, the way GameModel.kickoff stores it.
+    """
+    if not start_date or not start_time:
+        return None
+    kickoff = new_york.localize(datetime.combine(start_date, start_time))
+    return kickoff.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def game_kickoff(game) -> datetime | None:
+    """
+    Kickoff of a game as naive UTC. Pick locking, the odds planner and live score
+    polling all go through here, so they agree on when a game has started.
+    :param game: a GameModel, games saved before kickoff existed fall back to
+        their start date and time
+    """
+    return game.kickoff or kickoff_utc(game.start_date, game.start_time)
+
+
+def utc_now() -> datetime:
+    return datetime.now(tz=pytz.utc).replace(tzinfo=None)
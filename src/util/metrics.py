@@ -0,0 +1,431 @@
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+STATEMENTS = ("select", "insert", "update", "delete", "other")
+CACHES = ("kickoff_index", "week_finality", "week_response", "scraper_response")
+OUTBOUND_SERVICES = (
+    "odds_api",
+    "espn",
+    "nfl",
+    "pfr",
+    "secrets_manager",
+    "step_functions",
+    "other",
+)
+# the counters and histograms of exited workers, folded together
+EXITED_SNAPSHOT = "exited.json"
+
+# outbound hosts by domain, anything else is other
+OUTBOUND_DOMAINS = {
+    "the-odds-api.com": "odds_api",
+    "espn.com": "espn",
+    "nfl.com": "nfl",
+    "pro-football-reference.com": "pfr",
+}
+
+
+class Metric:
+    """
+    A metric with a fixed set of label names. Series are allocated up front for the
+    label values we know about, so recording is a dict lookup and an update of a
+    list, under a lock shared by the metric's series.
+    """
+
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        values: list[tuple] = (),
+        aggregate: str = "sum",
+    ):
+        """
+        :param labels: The label names.
+        :param values: The label value tuples to allocate series for.
+        :param aggregate: How the values of workers combine, sum, max or min.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.aggregate = aggregate
+        self._lock = threading.Lock()
+        self._series: dict[tuple, list] = {}
+        self.preallocate(values if labels else [()])
+
+    def _new_series(self) -> list:
+        return [0]
+
+    def preallocate(self, values: list[tuple]) -> None:
+        with self._lock:
+            for label_values in values:
+                self._series.setdefault(tuple(label_values), self._new_series())
+
+    def _get(self, labels: tuple) -> list:
+        if (series := self._series.get(labels)) is None:
+            with self._lock:
+                series = self._series.setdefault(labels, self._new_series())
+        return series
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            series = [[list(labels), data[:]] for labels, data in self._series.items()]
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "help": self.documentation,
+            "labels": list(self.labels),
+            "aggregate": self.aggregate,
+            "series": series,
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        series = self._get(labels)
+        with self._lock:
+            series[0] += amount
+
+
+class Gauge(Metric):
+    """
+    Gauges start unset, so a worker that never set one leaves it out of the merge.
+    """
+
+    kind = "gauge"
+
+    def _new_series(self) -> list:
+        return [None]
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        series = self._get(labels)
+        with self._lock:
+            series[0] = value
+
+
+class Histogram(Metric):
+    """
+    Series hold the count of each bucket, the +Inf one included, then the sum and
+    the count of every observation.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = buckets
+        super().__init__(*args, **kwargs)
+
+    def _new_series(self) -> list:
+        return [0] * (len(self.buckets) + 3)
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        series = self._get(labels)
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series[bucket] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, labels: tuple = (), errors: Counter | None = None):
+        """
+        Observes the duration of the block, counting it in errors if it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if errors is not None:
+                errors.inc(labels)
+            raise
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """
+    Holds our metrics and renders them in the Prometheus text format. Every worker
+    process has its own registry, so with several workers each one writes its
+    snapshot to a shared directory and the one answering a scrape merges them.
+
+    A worker holds an exclusive lock on worker-<id>.lock for as long as it runs,
+    which the system releases when it exits, however it exits. Ids are random,
+    so a restarted worker that gets the pid of an exited one is not mistaken for
+    it. The counters and histograms of exited workers are folded into
+    exited.json, so totals never go down, their gauges are dropped.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors = []
+        self._worker: tuple[int, str, int] | None = None
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def collector(self, collect):
+        """
+        Registers a function run before every snapshot, for gauges read on demand.
+        """
+        self._collectors.append(collect)
+        return collect
+
+    def snapshot(self) -> list[dict]:
+        for collect in self._collectors:
+            collect()
+        return [metric.snapshot() for metric in self._metrics.values()]
+
+    def _worker_id(self, directory: Path) -> str:
+        # checked against the pid, a registry inherited through fork is a new worker
+        if self._worker is None or self._worker[0] != os.getpid():
+            if self._worker is not None:
+                # the parent's lock, it must not outlive the parent in us
+                os.close(self._worker[2])
+            worker_id = uuid.uuid4().hex
+            lock = os.open(
+                directory / f"worker-{worker_id}.lock", os.O_CREAT | os.O_RDWR
+            )
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._worker = (os.getpid(), worker_id, lock)
+        return self._worker[1]
+
+    def write_snapshot(self, directory: str) -> None:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        worker_id = self._worker_id(path)
+        _write_json(path / f"worker-{worker_id}.json", self.snapshot())
+
+    @staticmethod
+    def read_snapshots(directory: str) -> list[list[dict]]:
+        """
+        Reads the snapshots of every worker, first folding those of exited workers
+        into exited.json. Scrapes take turns, so none is counted twice.
+        """
+        path = Path(directory)
+        with open(path / "fold.lock", "a") as fold_lock:
+            fcntl.flock(fold_lock, fcntl.LOCK_EX)
+
+            running, exited, exited_paths = [], [], []
+            for snapshot_path in path.glob("worker-*.json"):
+                if (snapshot := _read_json(snapshot_path)) is None:
+                    continue
+                if _locked(snapshot_path.with_suffix(".lock")):
+                    running.append(snapshot)
+                    continue
+                exited.append(
+                    [metric for metric in snapshot if metric["kind"] != "gauge"]
+                )
+                exited_paths.append(snapshot_path)
+
+            folded = _read_json(path / EXITED_SNAPSHOT)
+            if exited:
+                folded = MetricsRegistry.merge([*exited, *([folded] if folded else [])])
+                _write_json(path / EXITED_SNAPSHOT, folded)
+                for snapshot_path in exited_paths:
+                    snapshot_path.unlink(missing_ok=True)
+                    snapshot_path.with_suffix(".lock").unlink(missing_ok=True)
+
+        return [*running, *([folded] if folded else [])]
+
+    @staticmethod
+    def merge(snapshots: list[list[dict]]) -> list[dict]:
+        merged: dict[str, dict] = {}
+        for snapshot in snapshots:
+            for metric in snapshot:
+                target = merged.setdefault(metric["name"], {**metric, "series": {}})
+                combine = {"sum": lambda a, b: a + b, "max": max, "min": min}[
+                    metric["aggregate"]
+                ]
+                for labels, data in metric["series"]:
+                    key = tuple(labels)
+                    if (current := target["series"].get(key)) is None:
+                        target["series"][key] = data
+                    else:
+                        target["series"][key] = [
+                            b if a is None else a if b is None else combine(a, b)
+                            for a, b in zip(current, data)
+                        ]
+        return [
+            {**metric, "series": [[list(k), v] for k, v in metric["series"].items()]}
+            for metric in merged.values()
+        ]
+
+    @staticmethod
+    def render(snapshot: list[dict]) -> str:
+        lines = []
+        for metric in snapshot:
+            name, names = metric["name"], metric["labels"]
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            for labels, data in metric["series"]:
+                if data[0] is None:
+                    continue
+                pairs = [
+                    f'{label}="{_escape(value)}"' for label, value in zip(names, labels)
+                ]
+                if metric["kind"] != "histogram":
+                    lines.append(f"{name}{_labels(pairs)} {_number(data[0])}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip([*metric["buckets"], "+Inf"], data[:-2]):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(
+                        f"{name}_bucket{_labels([*pairs, le])} {_number(cumulative)}"
+                    )
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(data[-2])}")
+                lines.append(f"{name}_count{_labels(pairs)} {_number(data[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def _locked(path: Path) -> bool:
+    """
+    Whether a running worker holds the lock at path.
+    """
+    try:
+        lock = os.open(path, os.O_RDWR)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        # closing releases the lock when we got it
+        os.close(lock)
+    return False
+
+
+def _read_json(path: Path) -> list | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, content: list) -> None:
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(content))
+    os.replace(temporary, path)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(pairs: list[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def outbound_service(host: str) -> str:
+    for domain, service in OUTBOUND_DOMAINS.items():
+        if host == domain or host.endswith(f".{domain}"):
+            return service
+    return "other"
+
+
+def statement(sql: str) -> str:
+    verb = sql.lstrip()[:6].lower()
+    return verb if verb in STATEMENTS else "other"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.register(
+    Histogram(
+        "pickem_http_request_duration_seconds",
+        "Time to answer a request, by route template.",
+        labels=("route", "method"),
+    )
+)
+HTTP_RESPONSES = registry.register(
+    Counter(
+        "pickem_http_responses_total",
+        "Responses sent, by route template and status class.",
+        labels=("route", "method", "status"),
+    )
+)
+DB_QUERY_SECONDS = registry.register(
+    Histogram(
+        "pickem_db_query_duration_seconds",
+        "Time to execute a query, up to the cursor being returned.",
+        labels=("statement",),
+        values=[(verb,) for verb in STATEMENTS],
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    )
+)
+DB_QUERY_ERRORS = registry.register(
+    Counter(
+        "pickem_db_query_errors_total",
+        "Queries that raised.",
+        labels=("statement",),
+        values=[(verb,) for verb in STATEMENTS],
+    )
+)
+DB_POOL_CONNECTIONS = registry.register(
+    Gauge(
+        "pickem_db_pool_connections",
+        "Connections of the database pool, by state.",
+        labels=("state",),
+        values=[("in_use",), ("idle",), ("max",)],
+    )
+)
+CACHE_LOOKUPS = registry.register(
+    Counter(
+        "pickem_cache_lookups_total",
+        "Cache lookups, by cache and result.",
+        labels=("cache", "result"),
+        values=[(cache, result) for cache in CACHES for result in ("hit", "miss")],
+    )
+)
+OUTBOUND_SECONDS = registry.register(
+    Histogram(
+        "pickem_outbound_request_duration_seconds",
+        "Time of calls to the services we depend on, by service.",
+        labels=("service",),
+        values=[(service,) for service in OUTBOUND_SERVICES],
+    )
+)
+OUTBOUND_ERRORS = registry.register(
+    Counter(
+        "pickem_outbound_errors_total",
+        "Calls to the services we depend on that failed, by service.",
+        labels=("service",),
+        values=[(service,) for service in OUTBOUND_SERVICES],
+    )
+)
+ODDS_API_USED = registry.register(
+    Gauge(
+        "pickem_odds_api_quota_used_requests",
+        "Odds API requests used, as of its last response.",
+        aggregate="max",
+    )
+)
+ODDS_API_REMAINING = registry.register(
+    Gauge(
+        "pickem_odds_api_quota_remaining_requests",
+        "Odds API requests remaining, as of its last response.",
+        aggregate="min",
+    )
+)
@@ -0,0 +1,66 @@
+import time
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.components.metrics.metrics_service import MetricsService
+from src.util.metrics import HTTP_REQUEST_SECONDS, HTTP_RESPONSES, STATUS_CLASSES
+
+METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+# requests no route matched, so scanners probing random paths add no series
+UNMATCHED = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records the latency and status class of every request by route template, so
+    /picks/{year}/{week} is one series and not one per week. The series of every
+    route are allocated on the first request, recording one is then a dict lookup.
+
+    The router leaves the matched endpoint in the scope, it is mapped back to its
+    route template after the response. Streams are timed until they end.
+    """
+
+    def __init__(self, app: ASGIApp, metrics_service: MetricsService | None = None):
+        self.app = app
+        self.metrics_service = metrics_service or MetricsService()
+        self._templates: dict | None = None
+
+    def _route_templates(self, routes: list[BaseRoute]) -> dict:
+        templates = {}
+        for route in routes:
+            if (endpoint := getattr(route, "endpoint", None)) is None:
+                continue
+            templates.setdefault(endpoint, route.path)
+            for method in getattr(route, "methods", None) or METHODS:
+                labels = (route.path, method)
+                HTTP_REQUEST_SECONDS.preallocate([labels])
+                HTTP_RESPONSES.preallocate(
+                    [(*labels, status) for status in STATUS_CLASSES]
+                )
+        return templates
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self._templates is None:
+            self._templates = self._route_templates(scope["app"].routes)
+
+        status = 500
+
+        async def record_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            route = self._templates.get(scope.get("endpoint"), UNMATCHED)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, (route, method))
+            HTTP_RESPONSES.inc((route, method, STATUS_CLASSES[status // 100 - 1]))
+            self.metrics_service.flush()
@@ -0,0 +1,192 @@
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from peewee import Database
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.components.auth.auth_exceptions import InvalidTokenException
+from src.components.auth.permission_checker import PermissionChecker
+from src.config.logger import Logger
+from src.services.oauth_service import OAuthService
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = b"profile"
+
+# the queries of the request being profiled in this context, None otherwise
+_queries: ContextVar[list | None] = ContextVar("profiled_queries", default=None)
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread at a fixed interval from a background thread,
+    counting the stacks in the folded format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+
+class QueryTimer:
+    """
+    Times the queries of profiled requests, up to the cursor being returned, rows
+    fetched afterwards are not included. The timing execute_sql is only set on the
+    database while a profile runs, otherwise its own execute_sql is untouched.
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self._active = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def record(self):
+        queries = []
+        token = _queries.set(queries)
+        with self._lock:
+            self._active += 1
+            if self._active == 1:
+                self.database.execute_sql = self._execute_sql
+        try:
+            yield queries
+        finally:
+            _queries.reset(token)
+            with self._lock:
+                self._active -= 1
+                if self._active == 0:
+                    del self.database.execute_sql
+
+    def _execute_sql(self, sql, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return type(self.database).execute_sql(
+                self.database, sql, params, *args, **kwargs
+            )
+        finally:
+            if (queries := _queries.get()) is not None:
+                queries.append(
+                    {"sql": sql, "ms": round((time.perf_counter() - start) * 1000, 3)}
+                )
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request on demand, for admins only. A request with an X-Profile
+    header or a profile query parameter is sampled and its queries are timed, and
+    the profile replaces the response: its status, the timings of every query and
+    the sampled stacks in folded format, ready for a flamegraph.
+
+    The sampler follows the event loop thread, so concurrent requests show up in
+    the stacks too, and work handed to the thread pool does not. Requests without
+    the flag only pay for looking it up.
+    """
+
+    def __init__(self, app: ASGIApp, database: Database, interval: float):
+        self.app = app
+        self.query_timer = QueryTimer(database)
+        self.interval = interval
+        self.logger = Logger()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            user = self._admin(Headers(scope=scope))
+        except HTTPException as exc:
+            response = JSONResponse(
+                status_code=exc.status_code, content={"detail": exc.detail}
+            )
+            await response(scope, receive, send)
+            return
+
+        status = None
+
+        async def discard(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        sampler = StackSampler(thread_id=threading.get_ident(), interval=self.interval)
+        start = time.perf_counter()
+        with self.query_timer.record() as queries, sampler:
+            await self.app(scope, receive, discard)
+        duration = (time.perf_counter() - start) * 1000
+
+        db_ms = sum(query["ms"] for query in queries)
+        self.logger.info(
+            f"profiled {scope['method']} {scope['path']} for {user.sub}: "
+            f"{duration:.1f}ms, {len(queries)} queries taking {db_ms:.1f}ms"
+        )
+        response = JSONResponse(
+            content={
+                "status": status,
+                "duration_ms": round(duration, 3),
+                "db_ms": round(db_ms, 3),
+                "queries": queries,
+                "interval_ms": self.interval * 1000,
+                "samples": sum(sampler.stacks.values()),
+                "folded": sampler.folded(),
+            },
+            headers={"Cache-Control": "no-store"},
+        )
+        await response(scope, receive, send)
+
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        if PROFILE_QUERY in scope["query_string"] and "profile" in parse_qs(
+            scope["query_string"].decode(), keep_blank_values=True
+        ):
+            return True
+        return any(name == PROFILE_HEADER for name, _ in scope["headers"])
+
+    @staticmethod
+    def _admin(headers: Headers):
+        scheme, _, credentials = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not credentials:
+            raise InvalidTokenException()
+        return PermissionChecker.admin(
+            current_user=PermissionChecker._get_current_user(
+                token=HTTPAuthorizationCredentials(
+                    scheme=scheme, credentials=credentials
+                ),
+                oauth_service=OAuthService.create(),
+            )
+        )
@@ -0,0 +1,107 @@
+import hashlib
+import re
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config.logger import Logger
+from src.services.week_finality_service import WeekFinalityService
+from src.util.metrics import CACHE_LOOKUPS
+
+# GET routes whose response only depends on the season and week in their path
+CACHEABLE_PATH = re.compile(r"/(?:results|standings|spreads)/(\d{4})/(\d{1,2})(?:/|$)")
+
+
+class WeekCacheMiddleware:
+    """
+    Adds a strong ETag and Cache-Control to the week scoped GET routes, answering
+    a matching If-None-Match with 304 Not Modified.
+
+    Weeks that are final through their week number get a long max-age, so API
+    Gateway and browsers serve them without reaching us, open weeks a short one.
+    Responses to requests carrying an Authorization header are only cacheable by
+    the client, shared caches would hand them out without checking the token.
+    """
+
+    def __init__(
+        self, app: ASGIApp, finality_service: WeekFinalityService | None = None
+    ):
+        self.app = app
+        self.finality_service = finality_service or WeekFinalityService()
+        self.final_max_age = self.finality_service.settings.cache_final_max_age_seconds
+        self.open_max_age = self.finality_service.settings.cache_open_max_age_seconds
+        self.logger = Logger()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        if (match := CACHEABLE_PATH.search(scope["path"])) is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message = {}
+        body = bytearray()
+
+        async def buffer(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+
+        await self.app(scope, receive, buffer)
+
+        request_headers = Headers(scope=scope)
+        if start.get("status") == 200:
+            try:
+                cache_control = self._cache_control(
+                    year=int(match.group(1)),
+                    week=int(match.group(2)),
+                    private="authorization" in request_headers,
+                )
+            except Exception as e:
+                # headers are an optimization, the response still goes out
+                self.logger.exception(f"failed to resolve week cache headers : {e}")
+            else:
+                etag = f'"{hashlib.sha256(body).hexdigest()}"'
+                headers = MutableHeaders(raw=start["headers"])
+                headers["ETag"] = etag
+                headers["Cache-Control"] = cache_control
+                headers.add_vary_header("Authorization")
+
+                if etag in self._if_none_match(request_headers):
+                    CACHE_LOOKUPS.inc(("week_response", "hit"))
+                    await self._not_modified(send, headers)
+                    return
+                CACHE_LOOKUPS.inc(("week_response", "miss"))
+
+        await send(start)
+        await send({"type": "http.response.body", "body": bytes(body)})
+
+    def _cache_control(self, year: int, week: int, private: bool) -> str:
+        scope = "private" if private else "public"
+        if self.finality_service.is_final_through(year=year, week=week):
+            return f"{scope}, max-age={self.final_max_age}, immutable"
+        return f"{scope}, max-age={self.open_max_age}, must-revalidate"
+
+    @staticmethod
+    def _if_none_match(headers: Headers) -> set[str]:
+        return {
+            tag.strip().removeprefix("W/")
+            for tag in headers.get("if-none-match", "").split(",")
+        }
+
+    @staticmethod
+    async def _not_modified(send: Send, headers: MutableHeaders) -> None:
+        keep = {"etag", "cache-control", "vary", "date", "expires"}
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [
+                    (key, value) for key, value in headers.raw if key.decode() in keep
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from datetime import date, time
+
+import pytest
+
+from src.components.pick.pick_service import PickService
+from src.models.new_db_models import (
+    GameModel,
+    PickModel,
+    SeasonModel,
+    TeamModel,
+    UserModel,
+    WeekModel,
+    database,
+)
+
+YEAR, WEEK = 2024, 3
+
+
+@contextmanager
+def count_queries():
+    queries = []
+    execute_sql = type(database).execute_sql
+
+    def counting(sql, *args, **kwargs):
+        queries.append(sql)
+        return execute_sql(database, sql, *args, **kwargs)
+
+    database.execute_sql = counting
+    try:
+        yield queries
+    finally:
+        del database.execute_sql
+
+
+@pytest.fixture
+def week_games():
+    with database.atomic() as transaction:
+        season = SeasonModel.create(year=YEAR)
+        week = WeekModel.create(season=season, week_number=WEEK)
+        games = []
+        for number in range(4):
+            home = TeamModel.create(
+                name=f"Home{number}",
+                city="Home",
+                abbreviation=f"H{number}",
+                thumbnail="home.png",
+            )
+            away = TeamModel.create(
+                name=f"Away{number}",
+                city="Away",
+                abbreviation=f"A{number}",
+                thumbnail="away.png",
+            )
+            games.append(
+                GameModel.create(
+                    season=season,
+                    week=week,
+                    home_team=home,
+                    away_team=away,
+                    start_date=date(YEAR, 9, 22),
+                    start_time=time(13),
+                )
+            )
+        yield games
+        transaction.rollback()
+
+
+def make_user(username: str) -> UserModel:
+    return UserModel.create(
+        username=username,
+        email=f"{username}@example.com",
+        first_name=username,
+        last_name="Player",
+        password_hash="-",
+    )
+
+
+def test_get_user_picks_for_week_query_count_is_constant(week_games):
+    one_pick, many_picks = make_user("one"), make_user("many")
+    for user, count in ((one_pick, 1), (many_picks, len(week_games))):
+        for game in week_games[:count]:
+            PickModel.create(
+                user=user,
+                game=game,
+                team=game.home_team,
+                confidence=1,
+                spread_value=-3.5,
+            )
+
+    pick_service = PickService()
+    with count_queries() as baseline:
+        pick_service.get_user_picks_for_week(user=one_pick, year=YEAR, week_number=WEEK)
+    with count_queries() as queries:
+        result = pick_service.get_user_picks_for_week(
+            user=many_picks, year=YEAR, week_number=WEEK
+        )
+
+    assert len(result.picks) == len(week_games)
+    assert len(queries) == len(baseline) == 1
@@ -0,0 +1,6 @@
+import os
+
+# the suite runs offline, on a memory database and the local secrets file
+os.environ.setdefault("DB_BACKEND", "sqlite-memory")
+os.environ.setdefault("SECRET_BACKEND", "local")
+os.environ.setdefault("DB_NAME", "pickem-test")